@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Batch scheduling of many wards in one invocation: reads ward configurations from a
+manifest file or a directory (JSON, TOML or YAML), solves them concurrently as
+background jobs (see jobs.JobManager), writes one schedule per ward and a summary
+report of statuses and timings. A ward failing or timing out does not stop the others.
+
+A ward is a mapping such as:
+
+    name = "cardiology"
+    agent_type = "nurse"            # or "caregiver"
+    nb_agents = 12
+    nb_part_time_agents = 3
+    nb_weeks = 12
+    staffing_week = [3, 2, 1]       # nurses only
+    staffing_weekend = [3, 2, 0]
+    timeout = 600                   # seconds, optional
+    solver = {name = "HiGHS", time_limit = 300}
+    options = {base_pattern = true}
+
+A manifest holds a list of wards under `wards`, and optional `defaults` shared by all
+of them; a file holding a single ward is named after the file by default.
+"""
+
+import argparse
+import json
+import os
+import time
+
+
+WARD_KEYS = {'name', 'agent_type', 'nb_agents', 'nb_part_time_agents', 'nb_weeks', 'staffing_week',
+             'staffing_weekend', 'timeout', 'solver', 'options'}
+FORMATS = ('.json', '.toml', '.yaml', '.yml')
+SUMMARY_COLUMNS = ['ward', 'agent_type', 'status', 'objective', 'gap', 'solve_time', 'output', 'error']
+TIMEOUT = 'Timeout'
+
+
+def load_file(path):
+    """Contents of a JSON, TOML or YAML file (YAML needs `pip install pyyaml`)."""
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix == '.json':
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    if suffix == '.toml':
+        import tomllib
+        with open(path, 'rb') as f:
+            return tomllib.load(f)
+    if suffix in ('.yaml', '.yml'):
+        try:
+            import yaml
+        except ImportError:
+            raise ImportError("Reading YAML ward files needs PyYAML: pip install pyyaml") from None
+        with open(path, encoding='utf-8') as f:
+            return yaml.safe_load(f)
+    raise ValueError(f"Unsupported ward file {path}, expected one of {', '.join(FORMATS)}")
+
+
+def load_wards(path):
+    """Ward configurations from a manifest file or from every ward file of a directory."""
+    if os.path.isdir(path):
+        files = sorted(os.path.join(path, name) for name in os.listdir(path)
+                       if os.path.splitext(name)[1].lower() in FORMATS)
+    else:
+        files = [path]
+    wards = []
+    for file in files:
+        data = load_file(file) or {}
+        stem = os.path.splitext(os.path.basename(file))[0]
+        defaults = data.get('defaults', {})
+        if 'wards' in data:
+            entries = [(entry.get('name', f"{stem}-{n}"), entry) for n, entry in enumerate(data['wards'], 1)]
+        else:
+            entries = [(data.get('name', stem), data)]
+        for name, entry in entries:
+            ward = {**defaults, **entry, 'name': str(name)}
+            ward['solver'] = {**defaults.get('solver', {}), **entry.get('solver', {})}
+            ward['options'] = {**defaults.get('options', {}), **entry.get('options', {})}
+            wards.append(ward)
+    names = [ward['name'] for ward in wards]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate ward names: {', '.join(duplicates)}")
+    return wards
+
+
+def ward_config(ward, solver=None, out_dir="batch"):
+    """Scheduling configuration of a ward; its schedule goes to output/<out_dir>/<name>.xlsx.
+
+    `solver` holds solver settings applied to every ward, the ward's own taking precedence.
+    """
+    from config_manager import get_caregiver_config, get_nurse_config, resize_config
+
+    unknown = set(ward) - WARD_KEYS
+    if unknown:
+        raise ValueError(f"Ward {ward['name']}: unknown keys {', '.join(sorted(unknown))}")
+    agent_type = ward.get('agent_type', 'nurse')
+    if agent_type not in ('nurse', 'caregiver'):
+        raise ValueError(f"Ward {ward['name']}: agent_type must be 'nurse' or 'caregiver', not {agent_type!r}")
+    if agent_type == 'caregiver' and ('staffing_week' in ward or 'staffing_weekend' in ward):
+        raise ValueError(f"Ward {ward['name']}: caregiver staffing rules are not configurable")
+    solver = {**(solver or {}), **ward.get('solver', {})}
+    get_config = get_nurse_config if agent_type == 'nurse' else get_caregiver_config
+    config = get_config(solver, **ward.get('options', {}))
+    config = resize_config(config, ward.get('nb_agents'), ward.get('nb_part_time_agents'), ward.get('nb_weeks'),
+                           ward.get('staffing_week'), ward.get('staffing_weekend'))
+    config['dest_file'] = os.path.join(out_dir, f"{ward['name']}.xlsx")
+    return agent_type, config
+
+
+def summary_row(ward, job):
+    """Summary report line of a finished ward job."""
+    from jobs import CANCELLED, DONE
+
+    row = dict.fromkeys(SUMMARY_COLUMNS)
+    row.update(ward=ward['name'], agent_type=ward.get('agent_type', 'nurse'), solve_time=round(job.elapsed, 2))
+    if job.status == DONE:
+        row.update(status=job.result['status'], objective=job.result['objective'], gap=job.result['gap'],
+                   output=job.result.get('dest_path'))
+        if job.result.get('diagnosis'):
+            from feasibility import format_issues
+            row['error'] = format_issues(job.result['diagnosis'])
+    elif job.status == CANCELLED:
+        row['status'] = TIMEOUT
+    else:
+        row.update(status='Failed', error=job.error.strip().splitlines()[-1] if job.error else None)
+    return row
+
+
+def run_batch(wards, workers=2, timeout=None, solver=None, out_dir="batch", cache=None):
+    """Solve the wards on `workers` worker processes and return the summary rows.
+
+    A ward running longer than its `timeout` (or the batch one) is cancelled. Wards
+    whose configuration is invalid are reported as failed without being solved.
+    """
+    from jobs import FINISHED, RUNNING, JobManager
+
+    manager = JobManager(max_workers=workers, max_queued=max(len(wards), 1), cache=cache)
+    jobs, rows = {}, {}
+    for ward in wards:
+        try:
+            agent_type, config = ward_config(ward, solver, out_dir)
+            jobs[ward['name']] = manager.submit(agent_type, config)
+        except Exception as error:
+            rows[ward['name']] = {**dict.fromkeys(SUMMARY_COLUMNS), 'ward': ward['name'],
+                                  'agent_type': ward.get('agent_type', 'nurse'), 'status': 'Failed',
+                                  'error': f"{type(error).__name__}: {error}"}
+    print(f"Scheduling {len(jobs)} wards on {workers} workers")
+
+    wards_by_name = {ward['name']: ward for ward in wards}
+    while len(rows) < len(wards):
+        for name, job_id in jobs.items():
+            if name in rows:
+                continue
+            job = manager.get(job_id)
+            limit = wards_by_name[name].get('timeout', timeout)
+            if job.status == RUNNING and limit is not None and job.elapsed > limit:
+                manager.cancel(job_id)
+            if job.status in FINISHED:
+                rows[name] = summary_row(wards_by_name[name], job)
+                print(f"{name}: {rows[name]['status']} ({rows[name]['solve_time']:.1f}s)")
+        time.sleep(manager.poll_interval)
+    return [rows[ward['name']] for ward in wards]
+
+
+def write_summary(rows, path):
+    """Write the summary report as CSV, or JSON for a .json path."""
+    import pandas as pd
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if path.endswith('.json'):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(rows, f, indent=2, ensure_ascii=False, default=lambda val: val.item())
+    else:
+        pd.DataFrame(rows, columns=SUMMARY_COLUMNS).to_csv(path, index=False)
+
+
+def parse_args(argv=None):
+    """Parse the command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Schedule many wards from a manifest or a directory of ward files (JSON, TOML or YAML)."
+    )
+    parser.add_argument('manifest', help="Manifest file, or directory holding one file per ward")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Number of wards solved at the same time (default: number of cores)")
+    parser.add_argument('--timeout', type=float, help="Cancel a ward after this many seconds")
+    parser.add_argument('--solver', dest='name', help="Solver backend for every ward, e.g. CBC or HiGHS")
+    parser.add_argument('--threads', type=int, help="Solver threads per ward")
+    parser.add_argument('--time-limit', type=float, help="Solver time limit per ward, in seconds")
+    parser.add_argument('--out-dir', default="batch", help="Schedules go to output/OUT_DIR/<ward>.xlsx (default: batch)")
+    parser.add_argument('--summary', help="Summary report, .csv or .json (default: output/OUT_DIR/summary.csv)")
+    parser.add_argument('--cache', nargs='?', const=True, metavar='PATH',
+                        help="Reuse solutions of identical wards from a SQLite cache")
+    return parser.parse_args(argv)
+
+
+def main():
+    """Main function with command line interface."""
+    import pandas as pd
+    from solution_cache import get_cache
+
+    args = parse_args()
+    solver = {key: val for key, val in (('name', args.name), ('threads', args.threads),
+                                        ('time_limit', args.time_limit), ('msg', False)) if val is not None}
+    wards = load_wards(args.manifest)
+    rows = run_batch(wards, args.workers, args.timeout, solver, args.out_dir, get_cache(args.cache))
+
+    summary = args.summary or os.path.join("output", args.out_dir, "summary.csv")
+    write_summary(rows, summary)
+    print(pd.DataFrame(rows, columns=SUMMARY_COLUMNS).drop(columns='error').to_string(index=False))
+    print(f"Summary written to {summary}")
+    failed = sum(row['status'] in ('Failed', TIMEOUT) for row in rows)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,4 @@
+"""
+Benchmarks of the model building and solving options, run from the repository root,
+e.g. `python -m benchmarks.lazy_constraints`.
+"""
@@ -0,0 +1,190 @@
+"""
+Import-time benchmark of the entry points: the time spent importing modules by each
+entry point (from `python -X importtime`, in a fresh interpreter, interpreter startup
+left out), and whether it loads the heavy optional stack. The solve path, batch and
+sweep workers must not load openpyxl or pandas: only the Excel export and the web
+interface need them.
+
+    python -m benchmarks.import_time run --output imports.json
+    python -m benchmarks.import_time compare before.json after.json --threshold 0.2
+
+`run` exits with status 1 when an entry point loads a module it must not load, and
+`compare` when an import time grew past the threshold.
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+from benchmarks.suite import git_commit
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+# Modules too heavy for the solve path, only needed for the Excel export and the web interface
+HEAVY_MODULES = ['openpyxl', 'pandas', 'streamlit', 'scipy']
+
+# Modules the solve path must not load
+SOLVE_PATH_EXCLUDED = ['openpyxl', 'pandas', 'streamlit']
+
+# Entry point name -> (Python code run in a fresh interpreter, heavy modules it must not load)
+ENTRY_POINTS = {
+    'config_manager': ("import config_manager", SOLVE_PATH_EXCLUDED),
+    'scheduler_core': ("import scheduler_core", SOLVE_PATH_EXCLUDED),
+    'unified_scheduler': ("import unified_scheduler", SOLVE_PATH_EXCLUDED),
+    'jobs': ("import jobs", SOLVE_PATH_EXCLUDED),
+    'batch': ("import batch", SOLVE_PATH_EXCLUDED),
+    'sweep-worker': ("import config_manager, jobs, sweep\n"
+                     "jobs.make_scheduler('nurse', config_manager.get_nurse_config())", SOLVE_PATH_EXCLUDED),
+    'solve-only': ("from unified_scheduler import UnifiedScheduler\n"
+                   "UnifiedScheduler.schedule_nurses({'msg': False}, export=False)", SOLVE_PATH_EXCLUDED),
+    'excel_export': ("import excel_export", []),
+}
+
+IMPORT_LINE = re.compile(r"^import time:\s+\d+ \|\s+(\d+) \| (\S.*)$")
+
+# Differences below this are noise, whatever the ratio
+MIN_SECONDS = 0.01
+
+
+def _top_level_imports(code):
+    """Cumulative microseconds of each top-level import made while running `code`, and the loaded modules."""
+    with tempfile.TemporaryDirectory() as cwd:
+        env = {**os.environ, 'PYTHONPATH': ROOT + os.pathsep + os.environ.get('PYTHONPATH', '')}
+        script = code + "\nimport sys\nprint(' '.join(sorted(sys.modules)))"
+        completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', script], cwd=cwd, env=env,
+                                   capture_output=True, text=True, check=True)
+    imports = {}
+    for line in completed.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        # Nested imports are indented under their parent
+        if match and not match.group(2).startswith(" "):
+            imports[match.group(2)] = imports.get(match.group(2), 0) + int(match.group(1))
+    return imports, set(completed.stdout.strip().splitlines()[-1].split())
+
+
+def measure(name, repeat=5):
+    """Import time of an entry point (median over `repeat` fresh interpreters) and the heavy modules it loads."""
+    code, forbidden = ENTRY_POINTS[name]
+    # Modules imported by the interpreter startup are not the entry point's
+    startup, _ = _top_level_imports("pass")
+    times = []
+    for _ in range(repeat):
+        imports, modules = _top_level_imports(code)
+        times.append(sum(micros for module, micros in imports.items() if module not in startup) / 1e6)
+    heavy = [module for module in HEAVY_MODULES if module in modules]
+    return {
+        'entry_point': name,
+        'import_time': statistics.median(times),
+        'heavy_modules': heavy,
+        'forbidden': [module for module in heavy if module in forbidden],
+    }
+
+
+def run_benchmark(entry_points, repeat=5):
+    """Measure the entry points; returns the JSON document (meta and results)."""
+    results = []
+    for name in entry_points:
+        row = measure(name, repeat)
+        results.append(row)
+        print(f"{name}: {row['import_time']:.3f}s")
+    return {
+        'meta': {
+            'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def format_table(results):
+    """Text table of import-time results."""
+    lines = [f"{'entry point':<20}{'imports':>10}  heavy modules"]
+    for row in results:
+        heavy = ", ".join(f"{module} (forbidden)" if module in row['forbidden'] else module
+                          for module in row['heavy_modules'])
+        lines.append(f"{row['entry_point']:<20}{row['import_time']:>9.3f}s  {heavy or '-'}")
+    return "\n".join(lines)
+
+
+def compare(old, new, threshold=0.2):
+    """Differences between two documents; returns (regressions, improvements) as lists of strings.
+
+    An import time is a regression when it grew by more than `threshold` (relative) and
+    by more than MIN_SECONDS; a heavy module newly loaded is one too.
+    """
+    old_rows = {row['entry_point']: row for row in old['results']}
+    regressions, improvements = [], []
+    for row in new['results']:
+        before = old_rows.get(row['entry_point'])
+        if before is None:
+            continue
+        old_value, new_value = before['import_time'], row['import_time']
+        if abs(new_value - old_value) > MIN_SECONDS:
+            change = f"{row['entry_point']}: {old_value:.3f}s -> {new_value:.3f}s"
+            if new_value > old_value * (1 + threshold):
+                regressions.append(f"{change} (+{new_value / old_value - 1:.0%})")
+            elif new_value < old_value / (1 + threshold):
+                improvements.append(f"{change} (-{1 - new_value / old_value:.0%})")
+        for module in sorted(set(row['heavy_modules']) - set(before['heavy_modules'])):
+            regressions.append(f"{row['entry_point']} now loads {module}")
+    return regressions, improvements
+
+
+def parse_args(argv=None):
+    """Parse the command line arguments."""
+    parser = argparse.ArgumentParser(description="Import-time benchmark of the entry points.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run', help="Measure the entry points and store the results as JSON")
+    run_parser.add_argument('--entry-points', nargs='+', choices=list(ENTRY_POINTS), default=list(ENTRY_POINTS),
+                            help="Entry points to measure (default: all)")
+    run_parser.add_argument('--repeat', type=int, default=5, help="Interpreters per entry point, times are medians")
+    run_parser.add_argument('--output', '-o', help="JSON file to write")
+    compare_parser = commands.add_parser('compare', help="Flag regressions between two runs")
+    compare_parser.add_argument('old', help="JSON results of the reference run")
+    compare_parser.add_argument('new', help="JSON results of the run to check")
+    compare_parser.add_argument('--threshold', type=float, default=0.2,
+                                help="Relative growth flagged as a regression (default: 0.2)")
+    return parser.parse_args(argv)
+
+
+def main():
+    """Main function with command line interface."""
+    args = parse_args()
+    if args.command == 'run':
+        document = run_benchmark(args.entry_points, args.repeat)
+        print(format_table(document['results']))
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(document, f, indent=2)
+            print("Results written to", args.output)
+        forbidden = [row['entry_point'] for row in document['results'] if row['forbidden']]
+        if forbidden:
+            print("Heavy modules loaded by:", ", ".join(forbidden))
+        sys.exit(1 if forbidden else 0)
+    with open(args.old) as f:
+        old = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    print(f"{old['meta']['commit']} ({old['meta']['date']}) -> {new['meta']['commit']} ({new['meta']['date']})")
+    regressions, improvements = compare(old, new, args.threshold)
+    for line in improvements:
+        print("Improved:", line)
+    for line in regressions:
+        print("REGRESSION:", line)
+    print(f"{len(regressions)} regression(s), {len(improvements)} improvement(s)")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
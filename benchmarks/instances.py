@@ -0,0 +1,88 @@
+"""
+Benchmark instances: the shipped nurse and caregiver configurations, larger
+synthetic wards (more agents, longer horizons, higher staffing levels) known to be feasible,
+and wards generated at any size by scaling the shipped parameter files.
+"""
+
+import math
+import re
+
+from config_manager import get_caregiver_config, get_nurse_config, resize_config
+
+
+# Name -> (agent type, resize_config arguments); empty arguments keep the parameter files
+INSTANCES = {
+    'nurses': ('nurse', {}),
+    'caregivers': ('caregiver', {}),
+    'nurses-22x20': ('nurse', {'nb_agents': 22, 'nb_part_time_agents': 6, 'nb_weeks': 20,
+                               'staffing_week': (6, 4, 2), 'staffing_weekend': (6, 4, 0)}),
+    'nurses-33x30': ('nurse', {'nb_agents': 33, 'nb_part_time_agents': 9, 'nb_weeks': 30,
+                               'staffing_week': (9, 6, 3), 'staffing_weekend': (9, 6, 0)}),
+    'caregivers-18x20': ('caregiver', {'nb_agents': 18, 'nb_part_time_agents': 2, 'nb_weeks': 20}),
+    # Year-long horizons, for the rolling-horizon mode
+    'nurses-11x50': ('nurse', {'nb_weeks': 50}),
+    'caregivers-11x52': ('caregiver', {'nb_weeks': 52}),
+}
+
+# Generated names: '<nurses|caregivers>-<agents>x<weeks>'
+GENERATED_NAME = re.compile(r'(nurses|caregivers)-(\d+)x(\d+)$')
+
+# Scale ladders of the benchmark suite, from the shipped sizes up to 200 agents over a year
+SCALES = {
+    'small': ['nurses', 'caregivers', 'nurses-22x20', 'caregivers-18x20'],
+    'medium': ['nurses-50x26', 'caregivers-50x26', 'nurses-100x26'],
+    'large': ['nurses-100x52', 'caregivers-100x52', 'nurses-200x52', 'caregivers-200x52'],
+}
+
+
+def scale_rules(rules, factor):
+    """Staffing rules with their levels scaled, rounded down for minimums and up for maximums."""
+    scaled = []
+    for day_type, shifts, sense, rhs, overlay in rules:
+        rhs = math.ceil(rhs * factor) if sense == '<=' else math.floor(rhs * factor)
+        scaled.append((day_type, tuple(shifts), sense, rhs, overlay))
+    return scaled
+
+
+def generate_config(agent_type, nb_agents, nb_weeks, part_time_ratio=None, staffing=None, solver=None,
+                    **options):
+    """Configuration of a synthetic ward scaled from the shipped parameter files.
+
+    The same arguments always give the same ward. The part-time ratio defaults to the
+    shipped one. `staffing` is a (week, weekend) pair of levels per shift for nurses, or a
+    list of staffing rules for caregivers; by default, the shipped levels are scaled by
+    the ratio of `nb_agents` to the shipped headcount (see scale_rules).
+    """
+    get_config = get_nurse_config if agent_type == 'nurse' else get_caregiver_config
+    config = get_config(solver, **options)
+    factor = nb_agents / len(config['I'])
+    if part_time_ratio is None:
+        part_time_ratio = len(config['part_time_I']) / len(config['I'])
+    dimensions = {'nb_agents': nb_agents, 'nb_part_time_agents': round(nb_agents * part_time_ratio),
+                  'nb_weeks': nb_weeks}
+    if agent_type == 'nurse':
+        week, weekend = staffing or ([math.floor(level * factor) for level in config['staffing_constraints_week']],
+                                     [math.floor(level * factor) for level in config['staffing_constraints_weekend']])
+        dimensions.update(staffing_week=week, staffing_weekend=weekend)
+    config = resize_config(config, **dimensions)
+    if agent_type == 'caregiver':
+        config['staffing_rules'] = [tuple(rule) for rule in staffing] if staffing else scale_rules(
+            config['staffing_rules'], factor)
+    return config
+
+
+def instance_config(name, solver=None, **options):
+    """(agent type, scheduling configuration) of a benchmark instance, listed or generated."""
+    if name in INSTANCES:
+        agent_type, dimensions = INSTANCES[name]
+        get_config = get_nurse_config if agent_type == 'nurse' else get_caregiver_config
+        config = resize_config(get_config(solver, **options), **dimensions)
+    else:
+        match = GENERATED_NAME.match(name)
+        if match is None:
+            raise ValueError(f"Unknown benchmark instance {name!r}: expected one of {sorted(INSTANCES)} "
+                             f"or '<nurses|caregivers>-<agents>x<weeks>'")
+        agent_type = match.group(1)[:-1]
+        config = generate_config(agent_type, int(match.group(2)), int(match.group(3)), solver=solver, **options)
+    config['dest_file'] = f"benchmark_{name}.xlsx"
+    return agent_type, config
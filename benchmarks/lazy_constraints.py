@@ -0,0 +1,102 @@
+"""
+Eager vs lazy generation of the sliding-window families (C8, C9, C11, C17): model
+size, build time, solve time and rounds on the benchmark instances.
+
+    python -m benchmarks.lazy_constraints --builder matrix
+    python -m benchmarks.lazy_constraints --builder pulp --solver CBC --base-pattern --json lazy.json
+"""
+
+import argparse
+import json
+import time
+
+from benchmarks.instances import INSTANCES, instance_config
+
+
+def run(name, lazy, solver=None, builder='matrix', base_pattern=False):
+    """Build and solve one instance, eagerly or lazily; returns the measures as a dict."""
+    from constraints import eager_families, lazy_families
+    from jobs import make_scheduler
+
+    agent_type, config = instance_config(name, {**(solver or {}), 'msg': False}, lazy=lazy, builder=builder,
+                                         base_pattern=base_pattern)
+    scheduler = make_scheduler(agent_type, config)
+    start_time = time.perf_counter()
+    if builder == 'matrix':
+        from matrix_model import (base_pattern_map, build_matrix_model, reduce_model, solve_matrix_model,
+                                  solve_matrix_model_lazy)
+        model = build_matrix_model(scheduler, eager_families(config))
+        P = base_pattern_map(scheduler) if base_pattern else None
+        if P is not None:
+            model = reduce_model(model, P)
+        build_time = time.perf_counter() - start_time
+        rows = model.num_row
+        if lazy:
+            pool = build_matrix_model(scheduler, lazy_families(config))
+            result, _ = solve_matrix_model_lazy(model, pool if P is None else reduce_model(pool, P),
+                                                scheduler.solver_config)
+        else:
+            result, _ = solve_matrix_model(model, solver_config=scheduler.solver_config)
+    else:
+        prob, x = scheduler.build_model()
+        build_time = time.perf_counter() - start_time
+        rows = len(prob.constraints)
+        result = scheduler.solve(prob, x)
+    return {
+        'instance': name,
+        'mode': 'lazy' if lazy else 'eager',
+        'initial_rows': rows,
+        'lazy_rows': result.get('lazy_rows', 0),
+        'rounds': result.get('lazy_rounds', 1),
+        'build_time': build_time,
+        'solve_time': result['wall_time'],
+        'total_time': time.perf_counter() - start_time,
+        'status': result['status'],
+        'objective': result['objective'],
+    }
+
+
+def format_table(rows):
+    """Text table of benchmark rows."""
+    header = (f"{'instance':<18}{'mode':<7}{'rows':>8}{'+lazy':>7}{'rounds':>8}"
+              f"{'build':>9}{'solve':>9}{'total':>9}  status      objective")
+    lines = [header]
+    for row in rows:
+        objective = '' if row['objective'] is None else f"{row['objective']:g}"
+        lines.append(f"{row['instance']:<18}{row['mode']:<7}{row['initial_rows']:>8}{row['lazy_rows']:>7}"
+                     f"{row['rounds']:>8}{row['build_time']:>8.2f}s{row['solve_time']:>8.2f}s"
+                     f"{row['total_time']:>8.2f}s  {row['status']:<12}{objective}")
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    """Parse the command line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark eager vs lazy sliding-window constraints.")
+    parser.add_argument('--instances', nargs='+', choices=sorted(INSTANCES), default=list(INSTANCES),
+                        help="Instances to run (default: all)")
+    parser.add_argument('--builder', choices=['pulp', 'matrix'], default='matrix',
+                        help="Model builder (default: matrix, with HiGHS)")
+    parser.add_argument('--base-pattern', action='store_true', help="Use the base pattern model (PuLP builder)")
+    parser.add_argument('--solver', dest='name', default='HiGHS', help="Solver of the PuLP builder (default: HiGHS)")
+    parser.add_argument('--time-limit', type=float, help="Solver time limit in seconds, per solve")
+    parser.add_argument('--json', metavar='PATH', help="Also write the measures to a JSON file")
+    return parser.parse_args(argv)
+
+
+def main():
+    """Main function with command line interface."""
+    args = parse_args()
+    solver = {'name': 'HiGHS' if args.builder == 'matrix' else args.name, 'time_limit': args.time_limit}
+    rows = []
+    for name in args.instances:
+        for lazy in (False, True):
+            rows.append(run(name, lazy, solver, args.builder, args.base_pattern))
+            print(f"{name} {rows[-1]['mode']}: {rows[-1]['status']} in {rows[-1]['total_time']:.2f}s")
+    print(format_table(rows))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+File-based vs in-process solver paths on the benchmark instances: PuLP with the CBC
+binary (model written to an MPS file, solution file parsed back), PuLP with HiGHS
+in-process (one call per column and row, or HiGHS_DIRECT in bulk), and the matrix
+builder without PuLP. The overhead is the wall time of the solve call minus the time
+reported by the solver itself: writing and reading files, spawning the process, or
+passing the model from Python.
+
+    python -m benchmarks.solver_paths
+    python -m benchmarks.solver_paths --instances nurses nurses-22x20 --repeat 5 --json paths.json
+"""
+
+import argparse
+import json
+import statistics
+import time
+
+from benchmarks.instances import INSTANCES, instance_config
+
+
+# Path name -> (builder, solver name)
+PATHS = {
+    'cbc-file': ('pulp', 'CBC'),
+    'highs-cmd-file': ('pulp', 'HiGHS_CMD'),
+    'highs-pulp-api': ('pulp', 'HiGHS'),
+    'highs-direct': ('pulp', 'HiGHS_DIRECT'),
+    'highs-matrix': ('matrix', 'HiGHS'),
+}
+
+
+def available_paths():
+    """Paths whose solver is installed."""
+    from solver_config import available_solvers
+
+    solvers = available_solvers()
+    return [path for path, (builder, solver) in PATHS.items() if solver in solvers]
+
+
+def run(name, path, time_limit=None):
+    """Build and solve one instance on one path; returns the measures as a dict."""
+    from jobs import make_scheduler
+
+    builder, solver = PATHS[path]
+    agent_type, config = instance_config(name, {'name': solver, 'msg': False, 'time_limit': time_limit},
+                                         builder=builder)
+    scheduler = make_scheduler(agent_type, config)
+    start_time = time.perf_counter()
+    if builder == 'matrix':
+        from matrix_model import solve_matrix_model
+        model = scheduler.build_matrix_model()
+        build_time = time.perf_counter() - start_time
+        result, _ = solve_matrix_model(model, solver_config=scheduler.solver_config)
+    else:
+        prob, x = scheduler.build_model()
+        build_time = time.perf_counter() - start_time
+        result = scheduler.solve(prob, x)
+    solver_time = result['solver_time'] if result['solver_time'] is not None else result['wall_time']
+    return {
+        'instance': name,
+        'path': path,
+        'build_time': build_time,
+        'solve_time': result['wall_time'],
+        'solver_time': solver_time,
+        'overhead': result['wall_time'] - solver_time,
+        'total_time': time.perf_counter() - start_time,
+        'status': result['status'],
+        'objective': result['objective'],
+    }
+
+
+def median_run(name, path, repeat=3, time_limit=None):
+    """Median of each timing over `repeat` runs."""
+    runs = [run(name, path, time_limit) for _ in range(repeat)]
+    row = dict(runs[-1])
+    for key in ('build_time', 'solve_time', 'solver_time', 'overhead', 'total_time'):
+        row[key] = statistics.median(r[key] for r in runs)
+    return row
+
+
+def format_table(rows):
+    """Text table of benchmark rows."""
+    header = (f"{'instance':<18}{'path':<16}{'build':>9}{'solve':>9}{'solver':>9}{'overhead':>10}"
+              f"{'total':>9}  status      objective")
+    lines = [header]
+    for row in rows:
+        objective = '' if row['objective'] is None else f"{row['objective']:g}"
+        lines.append(f"{row['instance']:<18}{row['path']:<16}{row['build_time']:>8.3f}s{row['solve_time']:>8.3f}s"
+                     f"{row['solver_time']:>8.3f}s{row['overhead']:>9.3f}s{row['total_time']:>8.3f}s"
+                     f"  {row['status']:<12}{objective}")
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    """Parse the command line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark file-based vs in-process solver paths.")
+    parser.add_argument('--instances', nargs='+', choices=sorted(INSTANCES), default=['nurses', 'caregivers'],
+                        help="Instances to run (default: nurses caregivers)")
+    parser.add_argument('--paths', nargs='+', choices=list(PATHS), help="Paths to run (default: all installed)")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per instance and path, timings are medians")
+    parser.add_argument('--time-limit', type=float, help="Solver time limit in seconds, per solve")
+    parser.add_argument('--json', metavar='PATH', help="Also write the measures to a JSON file")
+    return parser.parse_args(argv)
+
+
+def main():
+    """Main function with command line interface."""
+    args = parse_args()
+    paths = args.paths or available_paths()
+    rows = []
+    for name in args.instances:
+        for path in paths:
+            rows.append(median_run(name, path, args.repeat, args.time_limit))
+            print(f"{name} {path}: {rows[-1]['status']} in {rows[-1]['total_time']:.2f}s")
+    print(format_table(rows))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+"""
+Benchmark suite with regression tracking: model build, solve, solution extraction and
+Excel export timed separately on a scale ladder of instances (benchmarks/instances.py,
+from the shipped sizes up to 200 agents over 52 weeks), with the peak memory of each
+run. Each run is a fresh process, so that imports and memory peaks do not carry over.
+
+Results are stored as JSON, with the commit, Python version and platform they were
+measured on; `compare` flags the timings and memory peaks that grew past a threshold,
+and the instances whose status or objective got worse.
+
+    python -m benchmarks.suite run --scale small medium --output before.json
+    python -m benchmarks.suite run --scale small medium --output after.json
+    python -m benchmarks.suite compare before.json after.json --threshold 0.2
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from benchmarks.instances import SCALES
+
+
+# Timed phases; with the PuLP builder, the build is also split into variables, objective and constraints
+PHASES = ['build', 'solve', 'extract', 'export']
+BUILD_PHASES = ['variables', 'objective', 'constraints']
+
+# Differences below these are noise, whatever the ratio
+MIN_SECONDS = 0.05
+MIN_MEGABYTES = 5.0
+
+
+def peak_memory():
+    """Peak resident memory of the current process in MB, None where unknown."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+
+def build_pulp(scheduler, times):
+    """Build the PuLP model phase by phase (as ScheduleOptimizer.build_model); returns (prob, x)."""
+    from pulp import LpMaximize, LpProblem
+    from objectives import composite_objective
+
+    if scheduler.config.get('base_pattern'):
+        return scheduler.build_model()
+    start_time = time.perf_counter()
+    prob = LpProblem("Schedule Optimization", LpMaximize)
+    x = scheduler.create_variables()
+    times['variables'] = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    composite_objective(prob, x, scheduler.I, scheduler.J, scheduler.K, scheduler.nb_shifts)
+    times['objective'] = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    scheduler.add_constraints(prob, x)
+    times['constraints'] = time.perf_counter() - start_time
+    return prob, x
+
+
+def run(name, builder='pulp', base_pattern=False, time_limit=60):
+    """Build, solve, extract and export one instance in this process; returns the measures as a dict."""
+    from excel_export import export_roster
+    from jobs import make_scheduler
+    from benchmarks.instances import instance_config
+    from solver_config import solve as solve_problem
+
+    solver = {'name': 'HiGHS' if builder == 'matrix' else None, 'msg': False, 'time_limit': time_limit}
+    agent_type, config = instance_config(name, solver, builder=builder, base_pattern=base_pattern)
+    scheduler = make_scheduler(agent_type, config)
+    times = dict.fromkeys(PHASES)
+    base_memory = peak_memory()
+
+    start_time = time.perf_counter()
+    if builder == 'matrix':
+        from matrix_model import base_pattern_map, build_matrix_model, reduce_model, solve_matrix_model
+        model = build_matrix_model(scheduler)
+        P = None
+        if base_pattern:
+            P = base_pattern_map(scheduler)
+            model = reduce_model(model, P)
+        times['build'] = time.perf_counter() - start_time
+        size = (model.num_col, model.num_row)
+        start_time = time.perf_counter()
+        result, solution = solve_matrix_model(model, solver_config=scheduler.solver_config)
+        times['solve'] = time.perf_counter() - start_time
+        if solution is not None:
+            start_time = time.perf_counter()
+            if P is not None:
+                solution = (P @ solution).reshape(len(scheduler.I), len(scheduler.J), -1)
+            solution = solution.round().astype('int8')
+            times['extract'] = time.perf_counter() - start_time
+    else:
+        prob, x = build_pulp(scheduler, times)
+        times['build'] = time.perf_counter() - start_time
+        size = (len(prob.variables()), len(prob.constraints))
+        start_time = time.perf_counter()
+        result = solve_problem(prob, scheduler.solver_config)
+        times['solve'] = time.perf_counter() - start_time
+        solution = None
+        if result['status'] in ('Optimal', 'Feasible', 'Not Solved') and result['objective'] is not None:
+            start_time = time.perf_counter()
+            solution = scheduler.extract_solution(x)
+            times['extract'] = time.perf_counter() - start_time
+
+    if solution is not None:
+        with tempfile.TemporaryDirectory() as directory:
+            start_time = time.perf_counter()
+            export_roster(solution, scheduler.I, scheduler.J, scheduler.K, scheduler.part_time_I,
+                          scheduler.nb_shifts, os.path.join(directory, config['dest_file']))
+            times['export'] = time.perf_counter() - start_time
+
+    peak = peak_memory()
+    return {
+        'instance': name,
+        'builder': builder + ('+base' if base_pattern else ''),
+        'agents': len(scheduler.I),
+        'weeks': scheduler.nb_weeks,
+        'variables': size[0],
+        'constraints': size[1],
+        'times': times,
+        'peak_memory_mb': peak,
+        'model_memory_mb': peak - base_memory if peak is not None else None,
+        'status': result['status'],
+        'objective': result['objective'],
+        'gap': result['gap'],
+    }
+
+
+def run_isolated(name, builder='pulp', base_pattern=False, time_limit=60, repeat=1):
+    """Median measures of `repeat` runs of one instance, each in a fresh process."""
+    context = multiprocessing.get_context('spawn')
+    runs = []
+    for _ in range(repeat):
+        with context.Pool(1) as pool:
+            runs.append(pool.apply(run, (name, builder, base_pattern, time_limit)))
+    row = dict(runs[-1])
+    row['times'] = {phase: statistics.median(r['times'][phase] for r in runs)
+                    if runs[-1]['times'][phase] is not None else None for phase in runs[-1]['times']}
+    for key in ('peak_memory_mb', 'model_memory_mb'):
+        if row[key] is not None:
+            row[key] = max(r[key] for r in runs)
+    row['repeat'] = repeat
+    return row
+
+
+def git_commit():
+    """Commit of the working tree, with '+dirty' when it has changes; None outside a git checkout."""
+    root = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=root, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=root,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ('+dirty' if dirty else '')
+
+
+def run_suite(instances, builder='pulp', base_pattern=False, time_limit=60, repeat=1):
+    """Run the suite; returns the JSON document (meta and results)."""
+    results = []
+    for name in instances:
+        row = run_isolated(name, builder, base_pattern, time_limit, repeat)
+        results.append(row)
+        total = sum(row['times'][phase] or 0 for phase in PHASES)
+        print(f"{name}: {row['status']} in {total:.2f}s")
+    return {
+        'meta': {
+            'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'processor': platform.processor() or platform.machine(),
+            'cpu_count': os.cpu_count(),
+            'builder': builder + ('+base' if base_pattern else ''),
+            'time_limit': time_limit,
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def format_table(results):
+    """Text table of suite results."""
+    header = (f"{'instance':<20}{'builder':<13}{'cols':>8}{'rows':>9}" + "".join(f"{phase:>10}" for phase in PHASES)
+              + f"{'peak MB':>9}  status      objective")
+    lines = [header]
+    for row in results:
+        times = "".join(f"{'-':>10}" if row['times'][phase] is None else f"{row['times'][phase]:>9.3f}s"
+                        for phase in PHASES)
+        peak = '-' if row['peak_memory_mb'] is None else f"{row['peak_memory_mb']:.0f}"
+        objective = '' if row['objective'] is None else f"{row['objective']:g}"
+        lines.append(f"{row['instance']:<20}{row['builder']:<13}{row['variables']:>8}{row['constraints']:>9}"
+                     f"{times}{peak:>9}  {row['status']:<12}{objective}")
+    return "\n".join(lines)
+
+
+def compare(old, new, threshold=0.2):
+    """Differences between two suite documents; returns (regressions, improvements) as lists of strings.
+
+    A timing or memory peak is a regression when it grew by more than `threshold`
+    (relative) and by more than MIN_SECONDS or MIN_MEGABYTES. A status leaving Optimal
+    and a lower objective (the models maximize) are regressions too.
+    """
+    old_rows = {(row['instance'], row['builder']): row for row in old['results']}
+    regressions, improvements = [], []
+    for row in new['results']:
+        key = (row['instance'], row['builder'])
+        before = old_rows.get(key)
+        if before is None:
+            continue
+        label = f"{row['instance']} ({row['builder']})"
+        measures = [(phase, before['times'].get(phase), row['times'].get(phase), MIN_SECONDS, 's')
+                    for phase in PHASES + BUILD_PHASES]
+        measures.append(('peak memory', before['peak_memory_mb'], row['peak_memory_mb'], MIN_MEGABYTES, ' MB'))
+        for measure, old_value, new_value, minimum, unit in measures:
+            if old_value is None or new_value is None or abs(new_value - old_value) <= minimum:
+                continue
+            change = f"{label} {measure}: {old_value:.3f}{unit} -> {new_value:.3f}{unit}"
+            if new_value > old_value * (1 + threshold):
+                regressions.append(f"{change} (+{new_value / old_value - 1:.0%})")
+            elif new_value < old_value / (1 + threshold):
+                improvements.append(f"{change} (-{1 - new_value / old_value:.0%})")
+        if before['status'] == 'Optimal' and row['status'] != 'Optimal':
+            regressions.append(f"{label} status: {before['status']} -> {row['status']}")
+        if (before['objective'] is not None and row['objective'] is not None
+                and row['objective'] < before['objective'] - 1e-6):
+            regressions.append(f"{label} objective: {before['objective']:g} -> {row['objective']:g}")
+    return regressions, improvements
+
+
+def parse_args(argv=None):
+    """Parse the command line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark suite with regression tracking.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run', help="Run the suite and store the results as JSON")
+    run_parser.add_argument('--scale', nargs='+', choices=list(SCALES), default=['small'],
+                            help="Scale ladders to run (default: small)")
+    run_parser.add_argument('--instances', nargs='+',
+                            help="Instances to run instead, listed or generated ('nurses-200x52')")
+    run_parser.add_argument('--builder', choices=['pulp', 'matrix'], default='pulp',
+                            help="Model builder (default: pulp, the matrix builder solves with HiGHS)")
+    run_parser.add_argument('--base-pattern', action='store_true', help="Build the base pattern model")
+    run_parser.add_argument('--time-limit', type=float, default=60, help="Solver time limit in seconds (default: 60)")
+    run_parser.add_argument('--repeat', type=int, default=1, help="Runs per instance, timings are medians")
+    run_parser.add_argument('--output', '-o', default='benchmark_results.json',
+                            help="JSON file to write (default: benchmark_results.json)")
+    compare_parser = commands.add_parser('compare', help="Flag regressions between two runs")
+    compare_parser.add_argument('old', help="JSON results of the reference run")
+    compare_parser.add_argument('new', help="JSON results of the run to check")
+    compare_parser.add_argument('--threshold', type=float, default=0.2,
+                                help="Relative growth flagged as a regression (default: 0.2)")
+    return parser.parse_args(argv)
+
+
+def main():
+    """Main function with command line interface."""
+    args = parse_args()
+    if args.command == 'run':
+        instances = args.instances or [name for scale in args.scale for name in SCALES[scale]]
+        document = run_suite(instances, args.builder, args.base_pattern, args.time_limit, args.repeat)
+        print(format_table(document['results']))
+        with open(args.output, 'w') as f:
+            json.dump(document, f, indent=2)
+        print("Results written to", args.output)
+        return
+    with open(args.old) as f:
+        old = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    print(f"{old['meta']['commit']} ({old['meta']['date']}) -> {new['meta']['commit']} ({new['meta']['date']})")
+    if old['meta']['platform'] != new['meta']['platform']:
+        print("Warning: the runs were measured on different platforms")
+    regressions, improvements = compare(old, new, args.threshold)
+    for line in improvements:
+        print("Improved:", line)
+    for line in regressions:
+        print("REGRESSION:", line)
+    print(f"{len(regressions)} regression(s), {len(improvements)} improvement(s)")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
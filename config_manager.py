@@ -1,42 +1,75 @@
-from parameters.parametres_inf import (
-    I as I_inf, J as J_inf, K as K_inf, nb_shifts as nb_shifts_inf,
-    nb_weeks as nb_weeks_inf, part_time_I as part_time_I_inf,
-    staffing_constraints_week as staffing_constraints_week_inf,
-    staffing_constraints_weekend as staffing_constraints_weekend_inf,
-    dest_file as dest_file_inf
-)
-from parameters.parametres_as import (
-    I as I_as, J as J_as, K as K_as, nb_shifts as nb_shifts_as,
-    nb_weeks as nb_weeks_as, part_time_I as part_time_I_as,
-    dest_file as dest_file_as
-)
-
-
-def get_nurse_config():
-    """Get configuration for nurse scheduling."""
+from solver_config import merge_solver_config
+
+
+def get_solver_config(**options):
+    """Get a solver configuration (name, threads, time_limit, gap_rel, gap_abs, presolve, msg)."""
+    return merge_solver_config({key: val for key, val in options.items() if val is not None})
+
+
+def get_nurse_config(solver=None, **options):
+    """Get configuration for nurse scheduling.
+
+    `solver` is a (partial) solver configuration; extra options such as
+    `base_pattern` or `builder` are added to the configuration as is.
+    """
+    # Parameter files are only loaded for the agent type asked for
+    from parameters import parametres_inf as params
+
     return {
-        'I': I_inf,
-        'J': J_inf,
-        'K': K_inf,
-        'nb_shifts': nb_shifts_inf,
-        'nb_weeks': nb_weeks_inf,
-        'part_time_I': part_time_I_inf,
-        'full_time_I': [i for i in I_inf if i not in part_time_I_inf],
-        'staffing_constraints_week': staffing_constraints_week_inf,
-        'staffing_constraints_weekend': staffing_constraints_weekend_inf,
-        'dest_file': dest_file_inf
+        'I': params.I,
+        'J': params.J,
+        'K': params.K,
+        'nb_shifts': params.nb_shifts,
+        'nb_weeks': params.nb_weeks,
+        'part_time_I': params.part_time_I,
+        'full_time_I': [i for i in params.I if i not in params.part_time_I],
+        'staffing_constraints_week': params.staffing_constraints_week,
+        'staffing_constraints_weekend': params.staffing_constraints_weekend,
+        'dest_file': params.dest_file,
+        'solver': get_solver_config(**(solver or {})),
+        **options
     }
 
 
-def get_caregiver_config():
-    """Get configuration for caregiver scheduling."""
+def get_caregiver_config(solver=None, **options):
+    """Get configuration for caregiver scheduling (see get_nurse_config for the arguments)."""
+    from parameters import parametres_as as params
+
     return {
-        'I': I_as,
-        'J': J_as,
-        'K': K_as,
-        'nb_shifts': nb_shifts_as,
-        'nb_weeks': nb_weeks_as,
-        'part_time_I': part_time_I_as,
-        'full_time_I': [i for i in I_as if i not in part_time_I_as],
-        'dest_file': dest_file_as
-    } 
\ No newline at end of file
+        'I': params.I,
+        'J': params.J,
+        'K': params.K,
+        'nb_shifts': params.nb_shifts,
+        'nb_weeks': params.nb_weeks,
+        'part_time_I': params.part_time_I,
+        'full_time_I': [i for i in params.I if i not in params.part_time_I],
+        'staffing_rules': [tuple(rule) for rule in params.staffing_rules],
+        'dest_file': params.dest_file,
+        'solver': get_solver_config(**(solver or {})),
+        **options
+    }
+
+
+def resize_config(config, nb_agents=None, nb_part_time_agents=None, nb_weeks=None,
+                  staffing_week=None, staffing_weekend=None):
+    """Copy of a configuration with another headcount, horizon or staffing levels.
+
+    Agents are numbered from 1, the first `nb_part_time_agents` being part-time, as in
+    the parameter files. The staffing levels only apply to nurses.
+    """
+    config = dict(config)
+    nb_agents = len(config['I']) if nb_agents is None else nb_agents
+    nb_part_time_agents = len(config['part_time_I']) if nb_part_time_agents is None else nb_part_time_agents
+    if nb_part_time_agents > nb_agents:
+        raise ValueError(f"{nb_part_time_agents} part-time agents out of {nb_agents} agents")
+    config['I'] = range(1, nb_agents + 1)
+    config['part_time_I'] = range(1, nb_part_time_agents + 1)
+    config['full_time_I'] = [i for i in config['I'] if i not in config['part_time_I']]
+    if nb_weeks is not None:
+        config['nb_weeks'] = nb_weeks
+        config['J'] = range(1, nb_weeks * 6 + 1)
+    if staffing_week is not None:
+        config['staffing_constraints_week'] = list(staffing_week)
+    if staffing_weekend is not None:
+        config['staffing_constraints_weekend'] = list(staffing_weekend)
+    return config
@@ -0,0 +1,217 @@
+"""
+Constraint registry: every constraint family of the model (C1-C4 staffing, C5 to C17)
+is a named generator, registered in model order. The PuLP builder and the matrix
+builder (see matrix_model) generate only the families enabled in config['constraints'],
+and record the number of rows and the build time of each one.
+"""
+
+import time
+from pulp import lpSum
+
+
+class ConstraintFamily:
+    """A named constraint family and its generators for the PuLP and the matrix builders."""
+
+    def __init__(self, name, description):
+        self.name = name
+        self.description = description
+        self.pulp = None
+        self.matrix = None
+
+
+# Family name -> ConstraintFamily, in model order
+FAMILIES = {}
+
+# Sliding-window families, seldom binding at the optimum: generated lazily with config['lazy']
+LAZY_FAMILIES = ('C8', 'C9', 'C11', 'C17')
+
+# Families of rows each over one agent of s.I, within 7 consecutive days or over the whole
+# horizon: on the cyclic base pattern, the rows of the first two agents are all of them
+PER_AGENT_FAMILIES = ('C5', 'C6', 'C7', 'C8', 'C9', 'C10', 'C11', 'C17')
+
+# Families holding by construction on the cyclic base pattern
+BASE_PATTERN_FAMILIES = ('C12', 'C13', 'C14')
+
+
+def constraint_family(name, description=None, builder='pulp'):
+    """Decorator registering the generator of a constraint family for a builder ('pulp' or 'matrix').
+
+    PuLP generators are called as generator(scheduler, prob, x), matrix generators
+    as generator(layout, rows) (see matrix_model).
+    """
+    def register(generator):
+        family = FAMILIES.setdefault(name, ConstraintFamily(name, description))
+        family.description = family.description or description
+        setattr(family, builder, generator)
+        return generator
+    return register
+
+
+def enabled_families(config):
+    """Names of the families enabled by config['constraints'] ({name: False} disables one)."""
+    toggles = config.get('constraints') or {}
+    unknown = set(toggles) - set(FAMILIES)
+    if unknown:
+        raise ValueError(f"Unknown constraint families: {', '.join(sorted(unknown))} "
+                         f"(known: {', '.join(FAMILIES)})")
+    return [name for name in FAMILIES if toggles.get(name, True)]
+
+
+def lazy_families(config):
+    """Enabled families left out of the initial model: config['lazy'] is True (LAZY_FAMILIES) or a list."""
+    lazy = config.get('lazy')
+    if not lazy:
+        return []
+    lazy = LAZY_FAMILIES if lazy is True else lazy
+    unknown = set(lazy) - set(FAMILIES)
+    if unknown:
+        raise ValueError(f"Unknown constraint families: {', '.join(sorted(unknown))}")
+    return [name for name in enabled_families(config) if name in lazy]
+
+
+def eager_families(config):
+    """Enabled families generated in the initial model."""
+    lazy = lazy_families(config)
+    return [name for name in enabled_families(config) if name not in lazy]
+
+
+def add_constraints(scheduler, prob, x, families=None):
+    """Add the enabled constraint families to a PuLP problem.
+
+    Returns {family: {'rows', 'build_time'}} for the families generated.
+    """
+    families = enabled_families(scheduler.config) if families is None else families
+    stats = {}
+    for name in families:
+        nb_rows = len(prob.constraints)
+        start_time = time.perf_counter()
+        FAMILIES[name].pulp(scheduler, prob, x)
+        stats[name] = {'rows': len(prob.constraints) - nb_rows, 'build_time': time.perf_counter() - start_time}
+    return stats
+
+
+def format_stats(stats):
+    """Table of the rows and build time of each constraint family."""
+    lines = [f"{'Family':<8}{'Rows':>8}{'Build time':>12}"]
+    lines += [f"{name:<8}{row['rows']:>8}{row['build_time']:>11.3f}s" for name, row in stats.items()]
+    return "\n".join(lines)
+
+
+@constraint_family('C1-C4', "Staffing rules of the agent type")
+def staffing(s, prob, x):
+    for day_type, shifts, sense, rhs, overlay in s.staffing_rules():
+        for j in s.staffing_days(day_type):
+            staffed = lpSum(x[i, j, k] for i in s.I for k in shifts)
+            if overlay:
+                rhs_expr = rhs + lpSum(x[i, j, k + s.nb_shifts] for i in s.part_time_I for k in shifts)
+            else:
+                rhs_expr = rhs
+            if sense == '>=':
+                prob += staffed >= rhs_expr
+            elif sense == '<=':
+                prob += staffed <= rhs_expr
+            else:
+                prob += staffed == rhs_expr
+
+
+@constraint_family('C5', "No more than one shift per day per agent")
+def one_shift_per_day(s, prob, x):
+    for j in s.J:
+        for i in s.I:
+            prob += lpSum(x[i, j, k] for k in s.K[:s.nb_shifts]) <= 1
+
+
+@constraint_family('C6', "No morning shift after evening shift")
+def no_morning_after_evening(s, prob, x):
+    for j in s.J:
+        for i in s.I:
+            if j < max(s.J):
+                prob += x[i, j, 2] + x[i, j + 1, 1] <= 1
+
+
+@constraint_family('C7', "Weekend alternation constraint")
+def weekend_alternation(s, prob, x):
+    for i in s.I:
+        for j in range(1, s.nb_weeks):
+            prob += lpSum(x[i, j * 6, k] + x[i, (j + 1) * 6, k]
+                          for k in s.K[:s.nb_shifts]) == 1
+
+
+@constraint_family('C8', "No evening-rest-morning sequence")
+def no_isolated_rest(s, prob, x):
+    for i in s.I:
+        for j in range(2, len(s.J)):
+            prob += lpSum(x[i, j, k] - x[i, j-1, k] - x[i, j + 1, k]
+                          for k in s.K[:s.nb_shifts]) <= 0
+
+
+@constraint_family('C9', "At least a day off per week")
+def weekly_day_off(s, prob, x):
+    for i in s.I:
+        for j in range(1, len(s.J) - 5 + 1):
+            prob += lpSum(x[i, j + index, k] for k in s.K[:s.nb_shifts]
+                          for index in range(5)) <= 4
+
+
+@constraint_family('C10', "Days off constraint for full-time agents")
+def days_off_budget(s, prob, x):
+    for i in s.I:
+        prob += (lpSum(x[i, j, k] * (1 + int(j % 6 == 0)) for j in s.J for k in s.K[:s.nb_shifts])
+                 <= len(s.not_multiple_6) + 2 * len(s.multiple_6) - (9 * (s.nb_weeks / 4)) + 1)
+
+
+@constraint_family('C11', "No working day between two days off")
+def no_isolated_work(s, prob, x):
+    for i in s.I:
+        for j in s.J[:-2]:
+            prob += lpSum(x[i, j + 1, k] for k in s.K[:s.nb_shifts]) - x[i, j, 2] - x[i, j + 2, 1] >= -1
+
+
+@constraint_family('C12', "Strict cyclical constraints")
+def cyclic_rotation(s, prob, x):
+    for idx, i in enumerate(s.I[:-1]):
+        next_i = s.I[(idx + 1) % len(s.I)]
+        for j_idx, j in enumerate(s.J):
+            next_j = s.J[(j_idx + 6) % len(s.J)]
+            for k in s.K[:s.nb_shifts]:
+                prob += (x[i, j, k] == x[next_i, next_j, k])
+
+
+@constraint_family('C13', "Part-time day off cyclical constraints")
+def part_time_rotation(s, prob, x):
+    for idx, i in enumerate(s.part_time_I[:-1]):
+        next_i = s.part_time_I[(idx + 1) % len(s.part_time_I)]
+        for j_idx, j in enumerate(s.J):
+            for k in s.K[s.nb_shifts:]:
+                next_j = s.J[(j_idx + 6) % len(s.J)]
+                prob += (x[i, j, k] == x[next_i, next_j, k])
+
+
+@constraint_family('C14', "No part-time day off for full-time agents")
+def full_time_no_overlay(s, prob, x):
+    for i in s.full_time_I:
+        prob += lpSum(x[i, j, k] for j in s.J for k in s.K[s.nb_shifts:]) == 0
+
+
+@constraint_family('C15', "Part-time agent constraints")
+def part_time_days(s, prob, x):
+    for i in s.part_time_I:
+        # One day pinned per week except for weekends
+        for w in range(0, s.nb_weeks):
+            week_days = s.J[w * 6: w * 6 + 5]
+            weekend_day = s.J[w * 6 + 5]
+            prob += lpSum(x[i, j, k] for j in week_days for k in s.K[s.nb_shifts:]) == 1
+            prob += lpSum(x[i, weekend_day, k] for k in s.K[s.nb_shifts:]) == 0
+
+        # Day pinned must not be a day off
+        for j in s.J:
+            for k in s.K[:s.nb_shifts]:
+                prob += x[i, j, k + s.nb_shifts] - lpSum(x[i, j, k]) <= 0
+
+
+@constraint_family('C17', "No more than 3 consecutive days off")
+def max_days_off_in_a_row(s, prob, x):
+    for i in s.I:
+        for j in s.J[:-3]:
+            prob += lpSum(x[i, j + index, k] for k in s.K[:s.nb_shifts]
+                          for index in range(4)) >= 1
@@ -1,186 +1,163 @@
-import openpyxl
-from openpyxl import load_workbook
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.utils import get_column_letter
-from openpyxl.styles import Font, Alignment
+from openpyxl.styles import Font, Alignment, PatternFill
 from openpyxl.styles import Border, Side
+import numpy as np
 import os
-import pandas as pd
+from instrumentation import phase
+# The solution helpers live with the statistics, which do not need openpyxl
+from roster_stats import RosterStatistics, _value, solution_array
+
+
+def values_to_array(values, variable_names, I, J, K):
+    """Dense solution array from the flat values/variable_names lists of the legacy export API."""
+    expected = [f"x{i},{j},{k}" for i in I for j in J for k in K]
+    if list(variable_names) != expected:
+        position = {name: n for n, name in enumerate(variable_names)}
+        values = [values[position[name]] for name in expected]
+    return solution_array([_value(v) for v in values], I, J, K)
+
+
+def roster_dataframe(solution, I, J, K, part_time_I, nb_shifts):
+    """Roster table with one value per day, a string value for the shift type, and the totals."""
+    return RosterStatistics.from_solution(solution, I, J, K, part_time_I, nb_shifts).to_dataframe()
+
+
+# Styles shared by all the cells of the schedule
+THIN = Side(style='thin')
+THIN_BORDER = Border(left=THIN, right=THIN, top=THIN, bottom=THIN)
+BOLD = Font(bold=True)
+RA_FONT = Font(color="8B0000", italic=True)
+HEADER_ALIGNMENT = Alignment(horizontal='center', vertical='center')
+GREY_FILL = PatternFill(start_color="D3D3D3", end_color="D3D3D3", fill_type="solid")
+REST_FILL = PatternFill(start_color="87CEFA", end_color="87CEFA", fill_type="solid")
+FIRST_SHIFT_FILL = PatternFill(start_color="FFA500", end_color="FFA500", fill_type="solid")
+DAY_LETTERS = {"Lundi": "L", "Mardi": "M", "Mercredi": "Me", "Jeudi": "J",
+               "Vendredi": "V", "Samedi": "S", "Dimanche": "D"}
+
+
+class _CellFactory:
+    """Creates write-only cells, resolving each combination of styles only once."""
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.styles = {}
+
+    def __call__(self, value=None, font=None, fill=None, alignment=None):
+        key = (id(font), id(fill), id(alignment))
+        style = self.styles.get(key)
+        if style is None:
+            template = WriteOnlyCell(self.ws)
+            template.border = THIN_BORDER
+            if font is not None:
+                template.font = font
+            if fill is not None:
+                template.fill = fill
+            if alignment is not None:
+                template.alignment = alignment
+            style = self.styles[key] = template._style
+        cell = WriteOnlyCell(self.ws, value=value)
+        cell._style = style
+        return cell
+
+
+def write_workbook(df, I, J, dest_path="output/nurses_schedule.xlsx"):
+    """Write the roster table with its headers, merged weeks, colours and borders in a single pass.
+
+    Layout: week headers (merged per week) on row 1, day letters and total names on row 2,
+    one row per agent, then the Total, Total M, Total S and Total T rows. Rest days are
+    light blue, part-time pinned days (RA) dark red and italic, the first shift of each
+    agent's rotation orange, and the totals grey.
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Sheet1")
+    _cell = _CellFactory(ws)
+
+    nb_agents = len(I)
+    day_columns = [c for c in df.columns if not str(c).startswith('Total')]
+    total_columns = [c for c in df.columns if str(c).startswith('Total')]
+    nb_value_cols = len(day_columns)
+
+    # Set column widths, the first col should be wider
+    ws.column_dimensions['A'].width = 15
+    for col in range(2, 2 + nb_value_cols):
+        ws.column_dimensions[get_column_letter(col)].width = 6
+
+    # Header rows: merged weeks, then day letters and total names
+    weeks = [c.split(" ")[0] for c in day_columns]
+    week_row = [_cell()]
+    day_row = [_cell()]
+    for col, column in enumerate(day_columns):
+        first = col == 0 or weeks[col] != weeks[col - 1]
+        week_row.append(_cell(weeks[col] if first else None, BOLD, GREY_FILL, HEADER_ALIGNMENT))
+        day_row.append(_cell(DAY_LETTERS[column.split(" ")[1]], BOLD, GREY_FILL, HEADER_ALIGNMENT))
+        if first:
+            last = col + weeks[col:].count(weeks[col])
+            ws.merged_cells.add(f"{get_column_letter(col + 2)}1:{get_column_letter(last + 1)}1")
+    for column in total_columns:
+        week_row.append(_cell(None, BOLD, GREY_FILL, HEADER_ALIGNMENT))
+        day_row.append(_cell(column, BOLD, GREY_FILL, HEADER_ALIGNMENT))
+    ws.append(week_row)
+    ws.append(day_row)
+
+    values = df.to_numpy()
+    for row, name in enumerate(df.index):
+        is_agent = row < nb_agents
+        is_total = row == nb_agents
+        row_fill = None if is_agent else GREY_FILL
+        # Paint in orange the first shift of the agent in the rotation
+        first_shift_col = (7 * row) % nb_value_cols if is_agent else None
+        # Agent and total names are left plain, like the pandas index of the former export
+        cells = [_cell(name, fill=row_fill)]
+        for col in range(nb_value_cols):
+            val = values[row, col]
+            font, fill = (BOLD if is_total else None), row_fill
+            if is_agent:
+                if val == "R":
+                    fill = REST_FILL
+                if "(RA)" in str(val):
+                    font = RA_FONT
+                if col == first_shift_col:
+                    fill = FIRST_SHIFT_FILL
+            cells.append(_cell(val, font, fill))
+        for col in range(nb_value_cols, len(df.columns)):
+            font = BOLD if is_agent and col == nb_value_cols else None
+            cells.append(_cell(int(values[row, col]), font, GREY_FILL))
+        ws.append(cells)
+
+    with phase('save'):
+        wb.save(dest_path)
 
 
 def to_excel(
-        values, variable_names,
+        solution,
         I, J, K, part_time_I, nb_shifts,
         dest_path="output/nurses_schedule.xlsx"
              ):
-    """The excel file here will have only one value per day, with a string value for the shift type."""
-    shifts = {1: 'M', 2: 'S', 3: 'T'}
-    # Create the DataFrame structure
-    data = []
-    for i in I:  # For each nurse
-        row = []
-        for j in J:  # For each day
-            shift_value = "R"  # Rest by default
-            for k in K[:nb_shifts]:  # For each shift
-                index = variable_names.index(f"x{i},{j},{k}")
-                if values[index] == 1:
-                    shift_value = shifts[k]
-                if values[variable_names.index(f"x{i},{j},{k + nb_shifts}")] == 1:
-                    shift_value += " (RA)"
-            row.append(shift_value)
-        data.append(row)
-
-    # Convert list to DataFrame
-    days = {1: 'Lundi', 2: 'Mardi', 3: 'Mercredi', 4: 'Jeudi', 5: 'Vendredi', 6: 'Week-end'}
-    columns = [f"Semaine_{(j // 3) // 6 + 1} {days[(j // 3) % 6 + 1]}"
-               for j in range(0, 3 * len(J), 3)]
-    index_names = []
-    for i in I:
-        if i in part_time_I:
-            index_names.append(f"Agent {i} (80%)")
-        else:
-            index_names.append(f"Agent {i} (100%)")
-    df = pd.DataFrame(data, index=index_names, columns=columns)
-
-    # Duplicate the week-end columns into two separate columns for Samedi and Dimanche
-    # First replace "Week-end" with "Samedi"
-    df.columns = df.columns.str.replace('Week-end', 'Samedi')
-    # Then duplicate the columns for Dimanche, inserting them after Samedi
-    weeks = max(J) // 6
-    for w in range(weeks):
-        for i, c in enumerate(df.columns):
-            if 'Samedi' in c and f"Semaine_{w + 1} " in c:
-                df.insert(i+1, c.replace('Samedi', 'Dimanche'), df[c])
-
-    # Add a row for the number of nurses assigned per shift (excluding rest days)
-    shift_names = ["M", "S", "T"]
-    df['Total'] = df.apply(lambda row: sum([1 for shift in row if shift in shift_names]), axis=1)
-    total_nurses = df.apply(lambda col: sum([1 for shift in col if shift in shift_names]), axis=0)
-    total_nurses.name = 'Total'
-    df = pd.concat([df, total_nurses.to_frame().T])
-    for shift in ["M", "S", "T"]:
-        df[f'Total {shift}'] = df.apply(lambda row: sum([1 for s in row if s == shift]), axis=1)
-        total_nurses = df.apply(lambda col: sum([1 for s in col if s == shift]), axis=0)
-        total_nurses.name = f'Total {shift}'
-        df = pd.concat([df, total_nurses.to_frame().T])
-    df['Total R'] = df.apply(lambda row: sum([1 for shift in row if shift == "R"]), axis=1)
-
-    # Save as excel
-    df.to_excel(dest_path)
-
-
-def openpyxl_formatting(
-        I, J,
-        src_path="output/nurses_schedule.xlsx",
+    """The excel file here will have only one value per day, with a string value for the shift type.
+
+    Returns the RosterStatistics the totals were taken from.
+    """
+    with phase('statistics'):
+        statistics = RosterStatistics.from_solution(solution, I, J, K, part_time_I, nb_shifts)
+        df = statistics.to_dataframe()
+    with phase('workbook'):
+        write_workbook(df, I, J, dest_path)
+    return statistics
+
+
+def export_roster(
+        solution,
+        I, J, K, part_time_I, nb_shifts,
         dest_path="output/nurses_schedule.xlsx"
         ):
-    wb = load_workbook(src_path)
-    ws = wb.active
+    """Export a solution, given as an (agent, day, shift) array or an x[i, j, k] dict, to Excel.
 
-    # Insert new rows for Week and Day headers
-    ws.insert_rows(1)
-    # Apply header information
-    header_row = 1  # Week headers
-    # Set the initial week and day to manage merging
-    current_week = None
-    week_start_col = 2
-    week_dict = {"Lundi": "L", "Mardi": "M", "Mercredi": "Me", "Jeudi": "J",
-                 "Vendredi": "V", "Samedi": "S", "Dimanche": "D"}
-
-    for col in range(2, ws.max_column - 4):
-        # Extract week and day from the original cell
-        original_header = ws.cell(row=2, column=col).value  # assuming original headers start from row 3 now
-        if original_header:
-            week, day = original_header.split(" ")
-            ws.cell(row=header_row, column=col).value = week
-            ws.cell(row=header_row + 1, column=col).value = week_dict[day]
-            # Manage merging for week
-            if week != current_week:
-                if current_week is not None:
-                    ws.merge_cells(start_row=header_row, start_column=week_start_col,
-                                   end_row=header_row, end_column=(col - 1))
-                current_week = week
-                week_start_col = col
-
-    # Final merge for the last week and day
-    if current_week:
-        ws.merge_cells(start_row=header_row, start_column=week_start_col,
-                       end_row=header_row, end_column=(ws.max_column - 5))
-
-    # Set column widths and general styles as before
-    for i, col in enumerate(ws.columns):
-        # Skip first and last columns
-        if i == 0 or i > (ws.max_column - 6):
-            continue
-        ws.column_dimensions[get_column_letter(col[0].column)].width = 6
-    # First col should be wider
-    ws.column_dimensions['A'].width = 15
-
-    # Apply bold and centered style to day names
-    bold_centered = Font(bold=True)
-    center_alignment = Alignment(horizontal='center', vertical='center')
-    for col in range(2, ws.max_column + 1):
-        for row in [header_row, header_row + 1]:
-            cell = ws.cell(row=row, column=col)
-            cell.font = bold_centered
-            cell.alignment = center_alignment
-
-    # Define different border styles
-    thin_border = Border(left=Side(style='thin'), right=Side(style='thin'),
-                         top=Side(style='thin'), bottom=Side(style='thin'))
-    # Apply thin borders to all cells
-    for row in ws.iter_rows():
-        for cell in row:
-            cell.border = thin_border
-
-    # Paint the header rows (week and day) with in grey and light grey
-    for col in range(2, ws.max_column + 1):
-        for row in [header_row, header_row + 1]:
-            cell = ws.cell(row=row, column=col)
-            cell.fill = openpyxl.styles.PatternFill(start_color="D3D3D3", end_color="D3D3D3", fill_type="solid")
-
-    # Paint the four final rows with a light grey background
-    for row in range(ws.max_row - 3, ws.max_row + 1):
-        for col in range(1, ws.max_column + 1):
-            cell = ws.cell(row=row, column=col)
-            cell.fill = openpyxl.styles.PatternFill(start_color="D3D3D3", end_color="D3D3D3", fill_type="solid")
-    # Total row values in bold
-    for col in range(2, ws.max_column - 4):
-        ws.cell(row=ws.max_row - 3, column=col).font = bold_centered
-
-    # Values with "R" in light blue
-    for row in range(2, ws.max_row - 3):
-        for col in range(2, ws.max_column - 4):
-            cell = ws.cell(row=row, column=col)
-            if cell.value == "R":
-                cell.fill = openpyxl.styles.PatternFill(start_color="87CEFA", end_color="87CEFA", fill_type="solid")
-    # Values with "(RA)" with text in dark red and italic
-    for row in range(2, ws.max_row - 3):
-        for col in range(2, ws.max_column - 4):
-            cell = ws.cell(row=row, column=col)
-            if "(RA)" in str(cell.value):
-                cell.font = Font(color="8B0000", italic=True)
-    # Last five columns in light grey
-    for col in range(ws.max_column - 4, ws.max_column + 1):
-        for row in range(1, ws.max_row + 1):
-            cell = ws.cell(row=row, column=col)
-            cell.fill = openpyxl.styles.PatternFill(start_color="D3D3D3", end_color="D3D3D3", fill_type="solid")
-    # Col Total in bold
-    for row in range(1, ws.max_row - 3):
-        ws.cell(row=row, column=ws.max_column - 4).font = bold_centered
-
-    # Paint in orange the first shift of first agent
-    multiple_6 = [j for j in J if j % 6 == 0]
-    not_multiple_6 = [j for j in J if j % 6 != 0]
-    nb_value_cols = 2 * len(multiple_6) + len(not_multiple_6)
-
-    for i in I:
-        ws.cell(row=2+i, column=(2 + (7 * (i - 1))) % nb_value_cols).fill = openpyxl.styles.PatternFill(
-                                                                                                start_color="FFA500",
-                                                                                                end_color="FFA500",
-                                                                                                fill_type="solid"
-                                                                                                )
-    # Save the changes
-    wb.save(dest_path)
+    Returns the RosterStatistics of the exported roster.
+    """
+    os.makedirs(os.path.dirname(dest_path) or ".", exist_ok=True)
+    return to_excel(solution, I, J, K, part_time_I, nb_shifts, dest_path)
 
 
 def export_schedule(
@@ -188,6 +165,32 @@ def export_schedule(
         I, J, K, part_time_I, nb_shifts,
         dest_path="output/nurses_schedule.xlsx"
         ):
-    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
-    to_excel(values, variable_names, I, J, K, part_time_I, nb_shifts, dest_path)
-    openpyxl_formatting(I, J, dest_path, dest_path)
+    """Legacy export API taking flat values/variable_names lists (see export_roster)."""
+    solution = values_to_array(values, variable_names, I, J, K)
+    export_roster(solution, I, J, K, part_time_I, nb_shifts, dest_path)
+
+
+def read_schedule(
+        I, J, K, nb_shifts,
+        src_path="output/nurses_schedule.xlsx"
+        ):
+    """Read an exported schedule back into an (agent, day, shift) 0/1 array."""
+    shifts = {'M': 1, 'S': 2, 'T': 3}
+    solution = np.zeros((len(I), len(J), len(K)), dtype=np.int8)
+    wb = load_workbook(src_path, read_only=True)
+    ws = wb.active
+    # Agents start on row 3 (after week and day headers), days on column B,
+    # with 7 columns per week since the week-end day is split into Samedi and Dimanche
+    rows = ws.iter_rows(min_row=3, max_row=2 + len(I), min_col=2, max_col=1 + 7 * (len(J) // 6),
+                        values_only=True)
+    for a, row in enumerate(rows):
+        for b in range(len(J)):
+            cell = str(row[7 * (b // 6) + b % 6] or "R")
+            shift = shifts.get(cell.split(" ")[0])
+            if shift is None or shift > nb_shifts:
+                continue
+            solution[a, b, K.index(shift)] = 1
+            if "(RA)" in cell:
+                solution[a, b, K.index(shift + nb_shifts)] = 1
+    wb.close()
+    return solution
@@ -0,0 +1,228 @@
+"""
+Infeasibility analysis: a pre-solve check of necessary capacity conditions (staffing
+needs against the number of agents, the C7 week-end alternation, the C9, C10 and C17
+work limits), and a deletion filter naming a minimal set of constraint families that
+make a solved model infeasible.
+"""
+
+import numpy as np
+from constraints import enabled_families
+from pulp import LpMinimize, LpProblem, LpVariable, LpBinary, lpSum
+
+
+def staffing_bounds(scheduler):
+    """Bounds on the number of agents per (day, shift) and per day, from the staffing rules.
+
+    Returns (lower, upper, day_lower, issues): the (day, shift) bounds of the single-shift
+    rules, the minimum number of agents working each day, and the rules contradicting
+    each other.
+    """
+    J, K = list(scheduler.J), list(scheduler.K)
+    nb_shifts = scheduler.nb_shifts
+    lower = np.zeros((len(J), nb_shifts))
+    upper = np.full((len(J), nb_shifts), np.inf)
+    rules = []
+    for day_type, shifts, sense, rhs, overlay in scheduler.staffing_rules():
+        days = np.array([J.index(j) for j in scheduler.staffing_days(day_type)], dtype=int)
+        s = [K.index(k) for k in shifts]
+        rules.append((day_type, shifts, sense, rhs, days, s))
+        if len(s) == 1:
+            if sense in ('>=', '=='):
+                lower[days, s[0]] = np.maximum(lower[days, s[0]], rhs)
+            if sense in ('<=', '=='):
+                upper[days, s[0]] = np.minimum(upper[days, s[0]], rhs)
+
+    issues = []
+    names = shift_names(scheduler)
+    for d, s in zip(*np.nonzero(lower > upper)):
+        issues.append(_issue('C1-C4', f"Staffing rules ask for at least {lower[d, s]:g} and at most "
+                                      f"{upper[d, s]:g} agents on shift {names[s]} on day {J[d]}"))
+        break
+    day_lower = lower.sum(axis=1)
+    for day_type, shifts, sense, rhs, days, s in rules:
+        if len(s) == 1:
+            continue
+        if sense in ('>=', '==') and (upper[np.ix_(days, s)].sum(axis=1) < rhs).any():
+            issues.append(_issue('C1-C4', f"Staffing rules cap shifts {_names(names, s)} on {day_type} days "
+                                          f"below the {rhs} agents they require together"))
+        if sense in ('<=', '==') and (lower[np.ix_(days, s)].sum(axis=1) > rhs).any():
+            issues.append(_issue('C1-C4', f"Staffing rules require more than {rhs} agents on shifts "
+                                          f"{_names(names, s)} on {day_type} days, their common maximum"))
+        if sense in ('>=', '=='):
+            others = np.delete(lower[days], s, axis=1).sum(axis=1)
+            day_lower[days] = np.maximum(day_lower[days], rhs + others)
+    return lower, upper, day_lower, issues
+
+
+def shift_names(scheduler):
+    from roster_stats import SHIFT_NAMES
+    return [SHIFT_NAMES.get(k, str(k)) for k in range(1, scheduler.nb_shifts + 1)]
+
+
+def _names(names, shifts):
+    return "/".join(names[s] for s in shifts)
+
+
+def _issue(families, message):
+    return {'families': families, 'message': message}
+
+
+def precheck(scheduler):
+    """Necessary conditions for the roster to exist, checked in milliseconds.
+
+    Returns a list of {'families', 'message'} issues; an empty list does not prove
+    that the model is feasible. Conditions involving a disabled family are skipped.
+    """
+    issues = _capacity_issues(scheduler)
+    enabled = set(enabled_families(scheduler.config))
+    return [issue for issue in issues if enabled.issuperset(issue['families'].split(", "))]
+
+
+def _capacity_issues(scheduler):
+    J = list(scheduler.J)
+    nI, nJ, nb_weeks = len(scheduler.I), len(J), scheduler.nb_weeks
+    nb_part_time = len(scheduler.part_time_I)
+    weekend = np.array(J) % 6 == 0
+    lower, upper, day_lower, issues = staffing_bounds(scheduler)
+    if issues:
+        return issues
+
+    # C1-C4 with C5: one shift per agent and day
+    d = int(np.argmax(day_lower))
+    if day_lower[d] > nI:
+        kind = "week-end day" if weekend[d] else "week day"
+        issues.append(_issue('C1-C4, C5', f"Each {kind} needs {day_lower[d]:g} agents, "
+                                          f"but there are only {nI} agents"))
+
+    # C7: each agent works one week-end out of two
+    weekend_need = day_lower[weekend].max(initial=0)
+    if nb_weeks >= 2 and 2 * weekend_need > nI:
+        issues.append(_issue('C1-C4, C7', f"Each week-end needs {weekend_need:g} agents; working one week-end "
+                                          f"out of two (C7) takes at least {2 * weekend_need:g} agents, "
+                                          f"but there are only {nI}"))
+
+    # Part-time days pinned on week days (C15) come on top of the staffing needs (overlay)
+    overlay_shifts = {k for day_type, shifts, sense, rhs, overlay in scheduler.staffing_rules()
+                      if overlay and day_type == 'week' for k in shifts}
+    workable = {scheduler.K[s] for s in np.flatnonzero((upper[~weekend] > 0).any(axis=0))}
+    pinned = nb_part_time * nb_weeks if workable <= overlay_shifts else 0
+
+    # C10: day-off budget, week-end days counting twice
+    budget = (~weekend).sum() + 2 * weekend.sum() - (9 * (nb_weeks / 4)) + 1
+    need = day_lower[~weekend].sum() + 2 * day_lower[weekend].sum() + pinned
+    if need > nI * budget:
+        issues.append(_issue('C1-C4, C10, C15', f"The staffing needs {need:g} agent-days (week-end days count "
+                                                f"twice), but the day-off budget (C10) allows at most "
+                                                f"{nI} x {budget:g} = {nI * budget:g}"))
+
+    # C9: a day off in every 5 consecutive days
+    most = nJ - nJ // 5
+    if day_lower.sum() + pinned > nI * most:
+        issues.append(_issue('C1-C4, C9', f"The staffing needs {day_lower.sum() + pinned:g} agent-days, but "
+                                          f"with a day off every 5 days (C9) {nI} agents work at most "
+                                          f"{nI * most}"))
+
+    # C17: a working day in every 4 consecutive days, against the staffing caps
+    least = nJ // 4
+    capacity = np.minimum(upper.sum(axis=1), nI).sum()
+    if nI * least > capacity:
+        issues.append(_issue('C1-C4, C17', f"With at most 3 days off in a row (C17) {nI} agents work at least "
+                                           f"{nI * least} agent-days, but the staffing caps allow only "
+                                           f"{capacity:g}"))
+    return issues
+
+
+def _feasible(model, groups, solver_config):
+    """Whether the rows of the given constraint groups of a MatrixModel admit a binary solution.
+
+    Returns True, False, or None when the solver stopped (e.g. on its time limit) without knowing.
+    """
+    from matrix_model import pulp_constraints
+    from solver_config import solve as solve_problem
+
+    prob = LpProblem("Feasibility", LpMinimize)
+    x = [LpVariable(f"x{c}", cat=LpBinary) for c in range(model.num_col)]
+    prob += lpSum([])
+    for group in groups:
+        for constraint in pulp_constraints(model, range(*model.families[group]), x):
+            prob += constraint
+    status = solve_problem(prob, solver_config)['status']
+    return {'Optimal': True, 'Feasible': True, 'Infeasible': False}.get(status)
+
+
+def _rule_groups(scheduler, model):
+    """Split the staffing rows (C1-C4) of a matrix model into one group per staffing rule.
+
+    Returns the families dict of the model with the groups in place of 'C1-C4',
+    and a readable name for each group.
+    """
+    names = shift_names(scheduler)
+    families, labels = {}, {}
+    for family, (start, end) in model.families.items():
+        if family != 'C1-C4':
+            families[family] = (start, end)
+            labels[family] = family
+            continue
+        # The staffing rows are built rule by rule, one row per matching day
+        for n, (day_type, shifts, sense, rhs, overlay) in enumerate(scheduler.staffing_rules()):
+            group = f"C1-C4.{n}"
+            nb_days = len(scheduler.staffing_days(day_type))
+            families[group] = (start, start + nb_days)
+            s = [list(scheduler.K).index(k) for k in shifts]
+            labels[group] = f"C1-C4 ({day_type} {_names(names, s)} {sense} {rhs})"
+            start += nb_days
+    return families, labels
+
+
+def diagnose(scheduler, solver_config=None, time_limit=30):
+    """Constraint families that cannot hold together (deletion filter over the model).
+
+    The model is restated on the cyclic base pattern (C12, C13), with each staffing
+    rule as its own group. Groups are dropped one at a time, and kept only if the model
+    becomes feasible without them. The result is irreducible: it is infeasible with the
+    rotation, and removing any single group from it makes it feasible. Each feasibility
+    test is limited to `time_limit` seconds (an undecided test keeps the group).
+    Returns a list with one {'families', 'message'} issue, empty if the model turns out feasible.
+    """
+    from matrix_model import MatrixModel, base_pattern_map, reduce_model
+
+    model = scheduler.build_matrix_model()
+    families, labels = _rule_groups(scheduler, model)
+    model = MatrixModel(model.shape, model.c, model.A, model.row_lower, model.row_upper, families,
+                        model.build_time)
+    reduced = reduce_model(model, base_pattern_map(scheduler))
+    solver_config = {**(solver_config or {}), 'msg': False}
+    if solver_config.get('time_limit') is None:
+        solver_config['time_limit'] = time_limit
+
+    groups = [group for group in reduced.families if reduced.families[group][1] > reduced.families[group][0]]
+    if _feasible(reduced, groups, solver_config) is not False:
+        return []
+    # Try to drop the structural families first, then the staffing rules
+    conflict = list(groups)
+    for group in sorted(groups, key=lambda group: group.startswith('C1-C4')):
+        rest = [other for other in conflict if other != group]
+        if _feasible(reduced, rest, solver_config) is False:
+            conflict = rest
+    return [_issue(", ".join(labels[group] for group in conflict),
+                   "These constraints cannot all hold under the cyclic rotation (C12, C13); "
+                   "relaxing any one of them makes the roster feasible")]
+
+
+def infeasible_result(solver_config, issues):
+    """Result dict of a problem rejected by the pre-check, in the format of solver_config.solve."""
+    return {
+        'solver': (solver_config or {}).get('name'),
+        'status': 'Infeasible',
+        'objective': None,
+        'wall_time': 0.0,
+        'solver_time': None,
+        'cpu_time': None,
+        'gap': None,
+        'diagnosis': issues,
+    }
+
+
+def format_issues(issues):
+    """One line per issue, prefixed with its constraint families."""
+    return "\n".join(f"[{issue['families']}] {issue['message']}" for issue in issues)
@@ -0,0 +1,259 @@
+"""
+Run instrumentation: wall and CPU time per phase of a run (model build, each
+constraint family, solve, extraction, Excel export), counters (model size, solver
+time, gap), and optionally the peak Python memory of each phase (tracemalloc) and a
+cProfile of the whole run.
+
+Every phase and counter is also sent as an event dict to the callbacks, e.g. a
+JsonLinesSink writing one JSON object per line, or an OpenMetricsSink writing the
+metrics in the OpenMetrics text format at the end of each run.
+
+Code outside the scheduler marks its phases with the module-level phase(), which only
+records while a run is active (Instrumentation.run) and costs nothing otherwise.
+"""
+
+import contextvars
+import json
+import time
+from contextlib import contextmanager, nullcontext
+
+
+_ACTIVE = contextvars.ContextVar('instrumentation', default=None)
+
+
+class Instrumentation:
+    """Phase timers, counters and event callbacks of scheduling runs.
+
+    `callbacks` are called with each event dict; `trace_memory` records the peak Python
+    memory of each phase; `profile` runs cProfile over each run, True to print its
+    summary, or a path to also write its stats (for pstats or snakeviz). `labels` are
+    added to every event.
+    """
+
+    def __init__(self, callbacks=(), trace_memory=False, profile=None, labels=None):
+        self.callbacks = list(callbacks)
+        self.trace_memory = trace_memory
+        self.profile = profile
+        self.labels = dict(labels or {})
+        self.phases = {}
+        self.counters = {}
+        self.profiler = None
+        self._stack = []
+        self._frames = []
+        self._tracing = False
+
+    @classmethod
+    def from_config(cls, options, labels=None):
+        """Instrumentation of config['instrumentation']: True or a dict of the __init__ arguments."""
+        options = options if isinstance(options, dict) else {}
+        return cls(options.get('callbacks', ()), options.get('trace_memory', False), options.get('profile'),
+                   {**(labels or {}), **options.get('labels', {})})
+
+    def emit(self, event, **fields):
+        """Send an event dict to the callbacks."""
+        if not self.callbacks:
+            return
+        payload = {'event': event, 'timestamp': time.time(), **self.labels, **fields}
+        for callback in self.callbacks:
+            callback(payload)
+
+    @contextmanager
+    def phase(self, name):
+        """Time a phase; nested phases are named after their parents, e.g. 'build/constraints/C5'."""
+        path = "/".join(self._stack + [name])
+        frame = {'peak': 0, 'current': 0}
+        if self.trace_memory:
+            import tracemalloc
+            if self._frames:
+                self._frames[-1]['peak'] = max(self._frames[-1]['peak'], tracemalloc.get_traced_memory()[1])
+            frame['current'] = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        # Listed in the order the phases start, parents before their children
+        self.phases.setdefault(path, self._new_record())
+        self._stack.append(name)
+        self._frames.append(frame)
+        start_time, start_cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall_time, cpu_time = time.perf_counter() - start_time, time.process_time() - start_cpu
+            self._stack.pop()
+            self._frames.pop()
+            peak_memory = None
+            if self.trace_memory:
+                import tracemalloc
+                peak = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+                peak_memory = peak - frame['current']
+                if self._frames:
+                    self._frames[-1]['peak'] = max(self._frames[-1]['peak'], peak)
+            self._record(path, wall_time, cpu_time, peak_memory)
+
+    @staticmethod
+    def _new_record():
+        return {'calls': 0, 'wall_time': 0.0, 'cpu_time': None, 'peak_memory': None}
+
+    def add_time(self, name, wall_time, cpu_time=None, peak_memory=None):
+        """Record a phase timed elsewhere (e.g. a constraint family), nested in the current phase."""
+        self._record("/".join(self._stack + [name]), wall_time, cpu_time, peak_memory)
+
+    def _record(self, name, wall_time, cpu_time=None, peak_memory=None):
+        # Calls of the same phase add up
+        record = self.phases.setdefault(name, self._new_record())
+        record['calls'] += 1
+        record['wall_time'] += wall_time
+        if cpu_time is not None:
+            record['cpu_time'] = (record['cpu_time'] or 0.0) + cpu_time
+        if peak_memory is not None:
+            record['peak_memory'] = max(record['peak_memory'] or 0, peak_memory)
+        self.emit('phase', phase=name, wall_time=wall_time, cpu_time=cpu_time, peak_memory=peak_memory)
+
+    def count(self, name, value):
+        """Set a counter (model size, solver time, gap...); None values are skipped."""
+        if value is None:
+            return
+        self.counters[name] = value
+        self.emit('counter', name=name, value=value)
+
+    @contextmanager
+    def run(self):
+        """Make this instrumentation active for a run: module-level phase() calls record on it,
+        and the profiler and memory tracing (when enabled) cover the run."""
+        if _ACTIVE.get() is self:
+            yield self
+            return
+        token = _ACTIVE.set(self)
+        if self.trace_memory:
+            import tracemalloc
+            self._tracing = not tracemalloc.is_tracing()
+            if self._tracing:
+                tracemalloc.start()
+        if self.profile:
+            import cProfile
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        self.emit('run_start')
+        try:
+            yield self
+        finally:
+            if self.profiler is not None:
+                self.profiler.disable()
+                if isinstance(self.profile, str):
+                    self.profiler.dump_stats(self.profile)
+            if self._tracing:
+                import tracemalloc
+                tracemalloc.stop()
+                self._tracing = False
+            _ACTIVE.reset(token)
+            self.emit('run_end', **self.report())
+
+    def report(self):
+        """Phases and counters recorded so far, as a JSON-compatible dict."""
+        return {'phases': {name: dict(record) for name, record in self.phases.items()}, 'counters': dict(self.counters)}
+
+    def format_report(self):
+        """Table of the phases (wall time, CPU time, calls and peak memory) and the counters."""
+        lines = [f"{'Phase':<32}{'Wall':>10}{'CPU':>10}{'Calls':>7}{'Peak MB':>9}"]
+        for name, record in self.phases.items():
+            cpu = '-' if record['cpu_time'] is None else f"{record['cpu_time']:.3f}s"
+            peak = '-' if record['peak_memory'] is None else f"{record['peak_memory'] / 2 ** 20:.1f}"
+            indent = "  " * name.count("/")
+            lines.append(f"{indent + name.rsplit('/', 1)[-1]:<32}{record['wall_time']:>9.3f}s{cpu:>10}"
+                         f"{record['calls']:>7}{peak:>9}")
+        lines += [f"{name}: {value:g}" if isinstance(value, float) else f"{name}: {value}"
+                  for name, value in self.counters.items()]
+        return "\n".join(lines)
+
+    def profile_summary(self, limit=15):
+        """The `limit` functions of the last profile with the largest cumulative time."""
+        if self.profiler is None:
+            return ""
+        import io
+        import pstats
+        stream = io.StringIO()
+        pstats.Stats(self.profiler, stream=stream).sort_stats('cumulative').print_stats(limit)
+        return stream.getvalue()
+
+
+def active():
+    """Instrumentation of the current run, or None."""
+    return _ACTIVE.get()
+
+
+def phase(name):
+    """Time a phase on the active instrumentation (a no-op context outside of a run)."""
+    instrumentation = _ACTIVE.get()
+    return instrumentation.phase(name) if instrumentation is not None else nullcontext()
+
+
+def count(name, value):
+    """Set a counter on the active instrumentation, if any."""
+    instrumentation = _ACTIVE.get()
+    if instrumentation is not None:
+        instrumentation.count(name, value)
+
+
+class JsonLinesSink:
+    """Callback appending each event as one JSON line to a file (or a text stream)."""
+
+    def __init__(self, target):
+        self.target = target
+
+    def __call__(self, event):
+        line = json.dumps(event, default=str) + "\n"
+        if isinstance(self.target, str):
+            with open(self.target, 'a') as f:
+                f.write(line)
+        else:
+            self.target.write(line)
+            self.target.flush()
+
+
+def _label_set(labels):
+    return ",".join(f'{key}="{str(val).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+                    for key, val in sorted(labels.items()))
+
+
+def openmetrics(runs, prefix='fairnessnsp'):
+    """OpenMetrics text of runs, a list of (labels, report) pairs (see Instrumentation.report)."""
+    families = {
+        'phase_seconds': ('gauge', "Wall time of a run phase"),
+        'phase_cpu_seconds': ('gauge', "CPU time of a run phase"),
+        'phase_peak_memory_bytes': ('gauge', "Peak Python memory of a run phase"),
+        'counter': ('gauge', "Run counter (model size, solver time, gap)"),
+    }
+    samples = {family: [] for family in families}
+    for labels, report in runs:
+        for name, record in report['phases'].items():
+            phase_labels = _label_set({**labels, 'phase': name})
+            samples['phase_seconds'].append(f"{{{phase_labels}}} {record['wall_time']!r}")
+            if record['cpu_time'] is not None:
+                samples['phase_cpu_seconds'].append(f"{{{phase_labels}}} {record['cpu_time']!r}")
+            if record['peak_memory'] is not None:
+                samples['phase_peak_memory_bytes'].append(f"{{{phase_labels}}} {record['peak_memory']}")
+        for name, value in report['counters'].items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                samples['counter'].append(f"{{{_label_set({**labels, 'name': name})}}} {value!r}")
+    lines = []
+    for family, (kind, description) in families.items():
+        if samples[family]:
+            lines += [f"# TYPE {prefix}_{family} {kind}", f"# HELP {prefix}_{family} {description}."]
+            lines += [f"{prefix}_{family}{sample}" for sample in samples[family]]
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+class OpenMetricsSink:
+    """Callback rewriting an OpenMetrics text file at the end of each run, with the metrics
+    of every run it has seen (one label set per run, e.g. per scheduler)."""
+
+    def __init__(self, path):
+        self.path = path
+        self.runs = {}
+
+    def __call__(self, event):
+        if event['event'] != 'run_end':
+            return
+        labels = {key: val for key, val in event.items() if key not in ('event', 'timestamp', 'phases', 'counters')}
+        self.runs[tuple(sorted(labels.items()))] = (labels, {'phases': event['phases'], 'counters': event['counters']})
+        with open(self.path, 'w') as f:
+            f.write(openmetrics(list(self.runs.values())))
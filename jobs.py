@@ -0,0 +1,313 @@
+"""
+Background solve jobs: each job builds, solves and exports one schedule in its own
+worker process, so that a long solve neither blocks the caller nor is restarted by
+it. Jobs get an ID, are queued up to a limit, can be polled and can be cancelled.
+While a job solves, its progress (incumbent, bound, gap, nodes) is streamed back, and
+the job can be told to stop at its current incumbent and export it (accept).
+"""
+
+import itertools
+import multiprocessing
+import os
+import signal
+import threading
+import time
+import traceback
+
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = 'queued', 'running', 'done', 'failed', 'cancelled'
+FINISHED = (DONE, FAILED, CANCELLED)
+
+SCHEDULER_NAMES = {'nurse': 'NurseScheduler', 'caregiver': 'CaregiverScheduler'}
+
+
+class QueueFullError(RuntimeError):
+    """Raised when a job is submitted while the queue is full."""
+
+
+def export_job(config, solution, result=None, scheduler_name=None):
+    """Export a solution to config['dest_file'] (under output/); returns (dest_path, RosterStatistics).
+
+    With config['export'] set to False, only the statistics are computed and dest_path is None.
+    With config['roster_file'], the roster is also written to a .roster file, its header
+    holding the status and objective of `result` (see roster_file).
+    """
+    if config.get('roster_file'):
+        from roster_file import ROSTER_EXTENSION, roster_metadata, write_roster
+        write_roster(os.path.join("output", os.path.splitext(config['dest_file'])[0] + ROSTER_EXTENSION), solution,
+                     config['I'], config['J'], config['K'], config['part_time_I'], config['nb_shifts'],
+                     roster_metadata(scheduler_name, config, result))
+    if not config.get('export', True):
+        from roster_stats import RosterStatistics
+        return None, RosterStatistics.from_solution(solution, config['I'], config['J'], config['K'],
+                                                    config['part_time_I'], config['nb_shifts'])
+    from excel_export import export_roster
+
+    dest_path = os.path.join("output", config['dest_file'])
+    statistics = export_roster(solution, config['I'], config['J'], config['K'],
+                               config['part_time_I'], config['nb_shifts'], dest_path)
+    return dest_path, statistics
+
+
+def make_scheduler(agent_type, config):
+    """NurseScheduler or CaregiverScheduler for a job."""
+    if agent_type == 'nurse':
+        from nurse_scheduler import NurseScheduler as Scheduler
+    else:
+        from caregiver_scheduler import CaregiverScheduler as Scheduler
+    return Scheduler(config)
+
+
+def run_job(agent_type, config, initial_assignment, conn, stop=None):
+    """Worker process: build, solve and export one schedule, and send back the outcome.
+
+    Sends the solver progress events, then (result dict, solution array, RosterStatistics,
+    instrumentation report) through `conn`, or an error message. Setting the `stop` event
+    stops the solver at its current incumbent, which is exported. Without an incumbent,
+    the solution, statistics and dest_path are None.
+    """
+    # Own process group, so that cancelling the job also stops the solver subprocess
+    os.setpgrp()
+    try:
+        scheduler = make_scheduler(agent_type, config)
+        scheduler.on_progress = lambda event: conn.send(('progress', event))
+        scheduler.stop_event = stop
+        if initial_assignment is not None:
+            try:
+                scheduler.set_initial_assignment(initial_assignment)
+            except ValueError:
+                pass
+        instrumentation = scheduler.instrumentation
+        with instrumentation.run():
+            if config.get('builder') == 'local_search':
+                from local_search import local_search
+                with instrumentation.phase('solve'):
+                    scheduler.result, scheduler.solution = local_search(scheduler, config.get('local_search'),
+                                                                        scheduler.initial_assignment)
+                result = scheduler.result
+            else:
+                prob, x = scheduler.build_model()
+                result = scheduler.solve(prob, x)
+            scheduler.count_result()
+            # Nothing to export without an incumbent
+            result['dest_path'], statistics = None, None
+            if scheduler.solution is not None:
+                with instrumentation.phase('export'):
+                    result['dest_path'], statistics = export_job(config, scheduler.solution, result,
+                                                                 type(scheduler).__name__)
+        conn.send(('ok', (result, scheduler.solution, statistics, instrumentation.report())))
+    except Exception:
+        conn.send(('error', traceback.format_exc()))
+    finally:
+        conn.close()
+
+
+class Job:
+    """A solve job and its outcome, once finished."""
+
+    def __init__(self, job_id, agent_type, config, initial_assignment=None):
+        self.id = job_id
+        self.agent_type = agent_type
+        self.config = config
+        self.initial_assignment = initial_assignment
+        self.status = QUEUED
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.result = None
+        self.solution = None
+        self.statistics = None
+        self.instrumentation = None
+        self.error = None
+        self.queue_position = None
+        self.process = None
+        self.conn = None
+        self.cache_key = None
+        # Solver progress events (see solver_config.progress_event) and stop request
+        self.progress = []
+        self.stop = None
+
+    @property
+    def elapsed(self):
+        """Seconds spent running (so far, if still running)."""
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+
+class JobManager:
+    """Runs solve jobs in worker processes, at most `max_workers` at a time.
+
+    At most `max_queued` jobs may be waiting or running; submit() raises QueueFullError
+    beyond that. A monitor thread starts queued jobs and collects finished ones, so the
+    status of a job can be read at any time without blocking.
+
+    With a SolutionCache, a job whose problem was already solved is done on submission,
+    and the proven outcome of a solved job is stored (see solution_cache.is_cacheable). A job failing the capacity pre-check
+    (see feasibility) is also done on submission, with an Infeasible status and no roster.
+    """
+
+    def __init__(self, max_workers=2, max_queued=8, poll_interval=0.2, cache=None):
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.cache = cache
+        self.poll_interval = poll_interval
+        self.jobs = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.RLock()
+        # Spawned workers do not inherit the threads and locks of the parent (e.g. a web server)
+        self._context = multiprocessing.get_context('spawn')
+        self._monitor = threading.Thread(target=self._monitor_loop, daemon=True)
+        self._monitor.start()
+
+    def submit(self, agent_type, config, initial_assignment=None):
+        """Queue a job ('nurse' or 'caregiver') and return its ID."""
+        with self._lock:
+            if len(self.pending()) >= self.max_queued:
+                raise QueueFullError(f"Too many jobs waiting or running (limit {self.max_queued})")
+            job_id = f"{agent_type}-{next(self._ids)}"
+            job = self.jobs[job_id] = Job(job_id, agent_type, config, initial_assignment)
+            if self.cache is not None:
+                from solution_cache import config_key
+                job.cache_key = config_key(SCHEDULER_NAMES[agent_type], config)
+                hit = self.cache.get(job.cache_key)
+                if hit is not None:
+                    self._finish(job, *hit)
+                    return job_id
+            scheduler = make_scheduler(agent_type, config)
+            if config.get('precheck', True) and scheduler.precheck():
+                self._finish(job, scheduler.result, None)
+                return job_id
+            self.poll()
+            return job_id
+
+    def get(self, job_id):
+        """The Job with this ID, or None."""
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def status(self, job_id):
+        """Status of a job: queued, running, done, failed or cancelled (None if unknown)."""
+        job = self.get(job_id)
+        return job.status if job is not None else None
+
+    def pending(self):
+        """Jobs queued or running, in submission order."""
+        with self._lock:
+            return [job for job in self.jobs.values() if job.status in (QUEUED, RUNNING)]
+
+    def cancel(self, job_id):
+        """Cancel a queued job, or terminate the worker of a running one."""
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None or job.status in FINISHED:
+                return False
+            if job.status == RUNNING:
+                try:
+                    os.killpg(job.process.pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    job.process.terminate()
+                job.process.join()
+                job.conn.close()
+            job.status = CANCELLED
+            job.finished = time.time()
+            self.poll()
+            return True
+
+    def accept(self, job_id):
+        """Stop the solver of a running job at its current incumbent, which is then exported."""
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None or job.status != RUNNING:
+                return False
+            job.stop.set()
+            return True
+
+    def forget(self, job_id):
+        """Drop a finished job and its outcome."""
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is not None and job.status in FINISHED:
+                del self.jobs[job_id]
+
+    def poll(self):
+        """Collect the finished workers and start queued jobs on the free slots."""
+        with self._lock:
+            running = [job for job in self.jobs.values() if job.status == RUNNING]
+            for job in running:
+                self._collect(job)
+            queued = [job for job in self.jobs.values() if job.status == QUEUED]
+            free = self.max_workers - sum(job.status == RUNNING for job in self.jobs.values())
+            for job in queued[:max(free, 0)]:
+                self._start(job)
+            for position, job in enumerate(queued[max(free, 0):], 1):
+                job.queue_position = position
+
+    def wait(self, job_id, timeout=None):
+        """Block until a job is finished (for scripts); returns its status."""
+        deadline = None if timeout is None else time.time() + timeout
+        while self.status(job_id) not in FINISHED + (None,):
+            if deadline is not None and time.time() > deadline:
+                break
+            time.sleep(self.poll_interval)
+            self.poll()
+        return self.status(job_id)
+
+    def _finish(self, job, result, solution):
+        job.started = time.time()
+        if solution is not None:
+            result['dest_path'], job.statistics = export_job(job.config, solution, result,
+                                                             SCHEDULER_NAMES[job.agent_type])
+        job.result, job.solution = result, solution
+        job.status = DONE
+        job.finished = time.time()
+        job.initial_assignment = None
+
+    def _start(self, job):
+        parent_conn, child_conn = self._context.Pipe(duplex=False)
+        job.stop = self._context.Event()
+        job.process = self._context.Process(
+            target=run_job, args=(job.agent_type, job.config, job.initial_assignment, child_conn, job.stop),
+            daemon=True)
+        job.process.start()
+        child_conn.close()
+        job.conn = parent_conn
+        job.status = RUNNING
+        job.started = time.time()
+        job.queue_position = None
+
+    def _collect(self, job):
+        # Read before joining: a large outcome would fill the pipe and block the worker
+        outcome = None
+        try:
+            while outcome is None and job.conn.poll():
+                message = job.conn.recv()
+                if message[0] == 'progress':
+                    job.progress.append(message[1])
+                else:
+                    outcome = message
+        except (EOFError, OSError):
+            pass
+        if outcome is None and job.process.is_alive():
+            return
+        job.process.join()
+        job.conn.close()
+        job.finished = time.time()
+        if outcome is None:
+            job.status = FAILED
+            job.error = f"Worker process exited with code {job.process.exitcode}"
+        elif outcome[0] == 'ok':
+            job.status = DONE
+            job.result, job.solution, job.statistics, job.instrumentation = outcome[1]
+            if self.cache is not None:
+                self.cache.put(job.cache_key, SCHEDULER_NAMES[job.agent_type], job.result, job.solution)
+        else:
+            job.status = FAILED
+            job.error = outcome[1]
+        job.initial_assignment = None
+
+    def _monitor_loop(self):
+        while True:
+            time.sleep(self.poll_interval)
+            if self.pending():
+                self.poll()
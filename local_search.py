@@ -0,0 +1,270 @@
+"""
+Solver-free fast path: simulated annealing over the cyclic base pattern (C12, C13).
+
+The model is restated on the base pattern (matrix_model.reduce_model), and a move
+changes the shift of one base day, swaps the shifts of two base days, or moves the
+pinned part-time day of one week; worked week-ends alternate (C7) throughout. The row
+activities are updated incrementally from the columns a move touches, so that each
+move costs a few array operations whatever the size of the roster. The search
+maximizes composite_objective minus a penalty per unit of constraint violation, and
+returns the best roster found, feasible or not, as an (agent, day, shift) array.
+
+While rows are violated, half of the moves are drawn on their days, and the penalty
+of each row grows while it stays violated (breakout), so that the search leaves the
+local optima that trade a single violated row for a better objective.
+"""
+
+import time
+import numpy as np
+
+
+DEFAULT_OPTIONS = {
+    'time_limit': 1.0,  # seconds
+    'seed': 0,
+    'cycles': 4,        # cooling cycles, each one restarting from the best roster
+    'penalty': None,    # per unit of violation, default: twice the largest objective coefficient, plus 1
+}
+
+
+class LocalSearch:
+    """Simulated annealing on the base pattern of a scheduler's model."""
+
+    def __init__(self, scheduler, seed=0, penalty=None):
+        from constraints import enabled_families
+        from matrix_model import base_pattern_map, reduce_model
+
+        self.scheduler = scheduler
+        self.nb_shifts = scheduler.nb_shifts
+        self.nJ = len(scheduler.J)
+        self.nb_weeks = scheduler.nb_weeks
+        self.P = base_pattern_map(scheduler)
+        self.model = reduce_model(scheduler.build_matrix_model(), self.P)
+        self.overlay = self.P.shape[1] > self.nJ * self.nb_shifts
+        self.weekend = np.array(scheduler.J) % 6 == 0
+        # C7 holds by construction: moves never change whether a week-end is worked
+        self.alternate = 'C7' in enabled_families(scheduler.config)
+        self.c = self.model.c
+        self.lower, self.upper = self.model.row_lower, self.model.row_upper
+        self.penalty = 2 * np.abs(self.c).max() + 1 if penalty is None else penalty
+        self.rng = np.random.default_rng(seed)
+
+        # Rows and coefficients of each column, for incremental updates
+        A = self.model.A.tocsc()
+        self.col_rows = np.split(A.indices, A.indptr[1:-1])
+        self.col_vals = np.split(A.data, A.indptr[1:-1])
+        # Base days of each row, for the moves aimed at violated rows
+        A = self.model.A
+        self.row_days = np.split(A.indices % (self.nJ * self.nb_shifts) // self.nb_shifts, A.indptr[1:-1])
+        self.conflicts = np.zeros(0, dtype=int)
+        # Penalty multiplier of each row, raised while the row stays violated (breakout)
+        self.weights = np.ones(self.model.num_row)
+
+    def column(self, d, shift, pinned=False):
+        """Base pattern column of day d, shift index `shift`, on the work or the overlay part."""
+        return (self.nJ * self.nb_shifts if pinned else 0) + d * self.nb_shifts + shift
+
+    def violation(self, activity):
+        return np.maximum(self.lower - activity, 0) + np.maximum(activity - self.upper, 0)
+
+    def set_state(self, shifts, pinned):
+        """Start from base shifts (shift index per day, -1 for rest) and pinned days (bool per day)."""
+        self.shifts = np.asarray(shifts, dtype=int).copy()
+        self.pinned = np.asarray(pinned, dtype=bool).copy() if self.overlay else np.zeros(self.nJ, dtype=bool)
+        if self.alternate:
+            self.alternate_weekends()
+        self.b = self.vector(self.shifts, self.pinned)
+        self.activity = self.model.A @ self.b
+        self.total_violation = self.violation(self.activity).sum()
+        self.objective = self.c @ self.b
+        self.update_conflicts()
+
+    def alternate_weekends(self):
+        """Work every other week-end (C7), moving the shifts of the week-ends worked out of turn."""
+        weekends = np.flatnonzero(self.weekend)
+        worked = self.shifts[weekends] >= 0
+        turns = [np.arange(len(weekends)) % 2 == parity for parity in (0, 1)]
+        turn = min(turns, key=lambda turn: (turn != worked).sum())
+        extra = list(weekends[worked & ~turn])
+        for d in weekends[turn & ~worked]:
+            self.shifts[d] = self.shifts[extra.pop()] if extra else self.rng.integers(self.nb_shifts)
+        self.shifts[weekends[~turn]] = -1
+        self.pinned[weekends] = False
+
+    def update_conflicts(self):
+        """Rows violated by the current roster."""
+        self.conflicts = np.flatnonzero(self.violation(self.activity) > 1e-9)
+
+    def random_day(self):
+        """A random base day: half of the time, while rows are violated, a day of a violated row."""
+        if len(self.conflicts) and self.rng.random() < 0.5:
+            return self.rng.choice(self.row_days[self.rng.choice(self.conflicts)])
+        return self.rng.integers(self.nJ)
+
+    def vector(self, shifts, pinned):
+        b = np.zeros(self.model.num_col)
+        days = np.flatnonzero(shifts >= 0)
+        b[self.column(days, shifts[days])] = 1
+        if self.overlay:
+            days = np.flatnonzero(pinned & (shifts >= 0))
+            b[self.column(days, shifts[days], True)] = 1
+        return b
+
+    def state_from_solution(self, solution):
+        """Base shifts and pinned days of an (agent, day, shift) array (taken from its base pattern part)."""
+        b = self.P.T @ np.asarray(solution, dtype=float).ravel() > 0
+        work = b[:self.nJ * self.nb_shifts].reshape(self.nJ, self.nb_shifts)
+        shifts = np.where(work.any(axis=1), work.argmax(axis=1), -1)
+        pinned = b[self.nJ * self.nb_shifts:].reshape(self.nJ, -1).any(axis=1) if self.overlay else None
+        return shifts, pinned
+
+    def delta(self, changes):
+        """(objective change, violation change of each row, rows, new activities) of setting columns to values."""
+        cols = np.array([col for col, val in changes], dtype=int)
+        steps = np.array([val for col, val in changes], dtype=float) - self.b[cols]
+        rows = np.concatenate([self.col_rows[col] for col in cols])
+        vals = np.concatenate([self.col_vals[col] * step for col, step in zip(cols, steps)])
+        # Dense over the rows of the base pattern model, cheaper than sorting the few rows touched
+        change = np.bincount(rows, weights=vals, minlength=self.model.num_row)
+        rows = np.flatnonzero(change)
+        activity = self.activity[rows] + change[rows]
+        old = np.maximum(self.lower[rows] - self.activity[rows], 0) + np.maximum(self.activity[rows] - self.upper[rows], 0)
+        new = np.maximum(self.lower[rows] - activity, 0) + np.maximum(activity - self.upper[rows], 0)
+        return self.c[cols] @ steps, new - old, rows, activity
+
+    def day_changes(self, d, new):
+        """Column changes setting base day d to shift index `new` (-1 for rest); a pinned day follows the shift."""
+        old = self.shifts[d]
+        changes = []
+        for pinned in (False, True) if self.pinned[d] else (False,):
+            if old >= 0:
+                changes.append((self.column(d, old, pinned), 0))
+            if new >= 0:
+                changes.append((self.column(d, new, pinned), 1))
+        return changes
+
+    def shift_move(self):
+        """A random new shift (or rest) on a random base day."""
+        d = self.random_day()
+        old = self.shifts[d]
+        if self.alternate and self.weekend[d]:
+            if old < 0 or self.nb_shifts == 1:
+                return [], None
+            new = self.rng.integers(self.nb_shifts - 1)
+            new = new + 1 if new >= old else new
+            return self.day_changes(d, new), ('shift', [(d, new)])
+        new = self.rng.integers(-1, self.nb_shifts - 1) if old >= 0 else self.rng.integers(self.nb_shifts)
+        new = new + 1 if 0 <= old <= new else new
+        return self.day_changes(d, new), ('shift', [(d, new)])
+
+    def swap_move(self):
+        """Swap the shifts of two base days of the same kind (week days or week-end days),
+        which keeps the workload (C10)."""
+        d = self.random_day()
+        same = np.flatnonzero(self.weekend == self.weekend[d])
+        e = self.rng.choice(same)
+        if self.shifts[d] == self.shifts[e] or (
+                self.alternate and self.weekend[d] and (self.shifts[d] < 0) != (self.shifts[e] < 0)):
+            return [], None
+        changes = self.day_changes(d, self.shifts[e]) + self.day_changes(e, self.shifts[d])
+        return changes, ('shift', [(d, self.shifts[e]), (e, self.shifts[d])])
+
+    def pin_move(self):
+        """Changes moving the pinned day of a random week to another week day (C15)."""
+        w = self.rng.integers(self.nb_weeks)
+        days = np.arange(6 * w, 6 * w + 5)
+        current = days[self.pinned[days]]
+        new = self.rng.choice(days[~self.pinned[days]]) if (~self.pinned[days]).any() else days[0]
+        changes = [(self.column(d, self.shifts[d], True), 0) for d in current if self.shifts[d] >= 0]
+        if self.shifts[new] >= 0:
+            changes.append((self.column(new, self.shifts[new], True), 1))
+        return changes, ('pin', [(w, new)])
+
+    def apply(self, changes, move, rows, activity):
+        for col, val in changes:
+            self.b[col] = val
+        self.activity[rows] = activity
+        kind, days = move
+        for index, new in days:
+            if kind == 'shift':
+                self.shifts[index] = new
+            else:
+                self.pinned[6 * index:6 * index + 5] = False
+                self.pinned[new] = True
+
+    def run(self, time_limit=1.0, cycles=1):
+        """Anneal for `time_limit` seconds in `cycles` cooling cycles, each one starting over
+        from the best roster so far; returns (best base shifts, best pinned days, its violation)."""
+        start_time = time.perf_counter()
+        best = (self.total_violation, -self.objective, self.shifts.copy(), self.pinned.copy())
+        temperature, final = self.penalty, 0.05
+        iteration, cycle = 0, 0
+        while True:
+            if iteration % 200 == 0:
+                progress = (time.perf_counter() - start_time) / time_limit
+                if progress >= 1:
+                    break
+                if int(progress * cycles) > cycle:
+                    cycle = int(progress * cycles)
+                    self.set_state(best[2], best[3])
+                temperature = self.penalty * (final / self.penalty) ** (progress * cycles - cycle)
+                self.update_conflicts()
+                self.weights[self.conflicts] += 1
+            iteration += 1
+            draw = self.rng.random()
+            if self.overlay and draw < 0.2:
+                changes, move = self.pin_move()
+            elif draw < 0.6:
+                changes, move = self.swap_move()
+            else:
+                changes, move = self.shift_move()
+            if not changes:
+                continue
+            d_objective, d_rows, rows, activity = self.delta(changes)
+            d_violation = d_rows.sum()
+            gain = d_objective - self.penalty * (self.weights[rows] @ d_rows)
+            if gain >= 0 or self.rng.random() < np.exp(gain / temperature):
+                self.apply(changes, move, rows, activity)
+                self.objective += d_objective
+                self.total_violation += d_violation
+                if (self.total_violation, -self.objective) < best[:2]:
+                    best = (self.total_violation, -self.objective, self.shifts.copy(), self.pinned.copy())
+        self.iterations = iteration
+        return best[2], best[3], best[0]
+
+    def solution(self, shifts, pinned):
+        """(agent, day, shift) 0/1 array of base shifts and pinned days."""
+        b = self.vector(shifts, pinned)
+        return np.rint(self.P @ b).astype(np.int8).reshape(len(self.scheduler.I), self.nJ, -1)
+
+
+def local_search(scheduler, options=None, start=None):
+    """Run the local search on a scheduler's problem; returns (result dict, solution array).
+
+    `options` completes DEFAULT_OPTIONS (time_limit, seed, penalty). The search starts
+    from `start`, an (agent, day, shift) array, or else from the greedy assignment of
+    warm_start. The status is 'Feasible' when the best roster breaks no constraint
+    (its optimality is not proven), and 'Not Solved' otherwise.
+    """
+    from warm_start import greedy_assignment
+
+    options = {**DEFAULT_OPTIONS, **(options or {})}
+    start_time = time.perf_counter()
+    search = LocalSearch(scheduler, options['seed'], options['penalty'])
+    search.set_state(*search.state_from_solution(greedy_assignment(scheduler) if start is None else start))
+    build_time = time.perf_counter() - start_time
+    shifts, pinned, violation = search.run(options['time_limit'], options['cycles'])
+    solution = search.solution(shifts, pinned)
+    full_model = scheduler.build_matrix_model()
+    result = {
+        'solver': 'LocalSearch',
+        'status': 'Feasible' if violation == 0 else 'Not Solved',
+        'objective': float(full_model.c @ solution.ravel()),
+        'build_time': build_time,
+        'wall_time': time.perf_counter() - start_time,
+        'solver_time': time.perf_counter() - start_time - build_time,
+        'cpu_time': None,
+        'gap': None,
+        'iterations': search.iterations,
+        'violations': {family: count for family, count in full_model.violations(solution).items() if count},
+    }
+    return result, solution
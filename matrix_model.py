@@ -0,0 +1,451 @@
+"""
+Vectorized model construction: the constraint system of a ScheduleOptimizer is
+assembled directly as NumPy/SciPy sparse matrices and passed to HiGHS in bulk,
+without creating any PuLP variable or expression.
+"""
+
+import time
+import numpy as np
+from scipy.sparse import coo_matrix, csr_matrix
+from constraints import FAMILIES, constraint_family, enabled_families
+
+
+HIGHS_STATUS = {
+    'kOptimal': 'Optimal',
+    'kInfeasible': 'Infeasible',
+    'kUnbounded': 'Unbounded',
+    'kUnboundedOrInfeasible': 'Infeasible',
+    'kTimeLimit': 'Not Solved',
+    'kInterrupt': 'Not Solved',
+}
+
+
+class MatrixModel:
+    """Row-wise sparse (CSR) ILP: maximize c.x subject to row_lower <= A.x <= row_upper, x binary."""
+
+    def __init__(self, shape, c, A, row_lower, row_upper, families, build_time, family_stats=None):
+        self.shape = shape
+        self.c = c
+        self.A = A
+        self.row_lower = row_lower
+        self.row_upper = row_upper
+        self.families = families
+        self.build_time = build_time
+        self.family_stats = family_stats
+
+    @property
+    def num_col(self):
+        return self.A.shape[1]
+
+    @property
+    def num_row(self):
+        return self.A.shape[0]
+
+    def violated_rows(self, solution, tol=1e-6):
+        """Indices of the rows violated by an (agent, day, shift) 0/1 array."""
+        activity = self.A @ np.asarray(solution, dtype=float).ravel()
+        return np.flatnonzero((activity < self.row_lower - tol) | (activity > self.row_upper + tol))
+
+    def violations(self, solution):
+        """Number of violated rows per constraint family."""
+        violated = self.violated_rows(solution)
+        return {family: int(((violated >= start) & (violated < end)).sum())
+                for family, (start, end) in self.families.items()}
+
+
+class _RowBuilder:
+    """Collects blocks of rows sharing the same number of non-zeros."""
+
+    def __init__(self):
+        self.rows, self.cols, self.vals = [], [], []
+        self.lower, self.upper = [], []
+        self.families = {}
+        self.num_row = 0
+
+    def add(self, family, cols, coefs, lower=-np.inf, upper=np.inf):
+        """Add one row per line of `cols` (2D array), with coefficients broadcast to its shape."""
+        cols = np.atleast_2d(cols)
+        nb_rows = cols.shape[0]
+        if nb_rows == 0:
+            return
+        coefs = np.broadcast_to(np.asarray(coefs, dtype=float), cols.shape)
+        self.rows.append(np.repeat(np.arange(self.num_row, self.num_row + nb_rows), cols.shape[1]))
+        self.cols.append(cols.ravel())
+        self.vals.append(coefs.ravel())
+        self.lower.append(np.broadcast_to(np.asarray(lower, dtype=float), (nb_rows,)))
+        self.upper.append(np.broadcast_to(np.asarray(upper, dtype=float), (nb_rows,)))
+        start, _ = self.families.get(family, (self.num_row, 0))
+        self.num_row += nb_rows
+        self.families[family] = (start, self.num_row)
+
+    def matrix(self, num_col):
+        A = coo_matrix((np.concatenate(self.vals), (np.concatenate(self.rows), np.concatenate(self.cols))),
+                       shape=(self.num_row, num_col)).tocsr()
+        A.sum_duplicates()
+        return A, np.concatenate(self.lower), np.concatenate(self.upper)
+
+
+def _bounds(sense, rhs):
+    if sense == '>=':
+        return rhs, np.inf
+    if sense == '<=':
+        return -np.inf, rhs
+    return rhs, rhs
+
+
+class _Layout:
+    """Column positions of the x[i, j, k] variables and the index sets used by the matrix generators."""
+
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+        I, J, K = list(scheduler.I), list(scheduler.J), list(scheduler.K)
+        self.K = K
+        self.nb_shifts, self.nb_weeks = scheduler.nb_shifts, scheduler.nb_weeks
+        self.nI, self.nJ, self.nK = len(I), len(J), len(K)
+        self.part_time = np.array([I.index(i) for i in scheduler.part_time_I], dtype=int)
+        self.full_time = np.array([I.index(i) for i in scheduler.full_time_I], dtype=int)
+
+        # Column index of x[i, j, k] by position
+        self.idx = np.arange(self.nI * self.nJ * self.nK).reshape(self.nI, self.nJ, self.nK)
+        self.work = self.idx[:, :, :self.nb_shifts]
+        self.pinned = self.idx[:, :, self.nb_shifts:]
+        self.weekend = np.array(J) % 6 == 0
+
+
+def build_matrix_model(scheduler, families=None):
+    """Build the same feasible set as scheduler.build_model() as a sparse matrix model.
+
+    Only the given families, by default those enabled in config['constraints'], are
+    generated; the rows and build time of each one are kept in the model's family_stats.
+    """
+    start_time = time.perf_counter()
+    layout = _Layout(scheduler)
+    rows = _RowBuilder()
+    family_stats = {}
+    for name in enabled_families(scheduler.config) if families is None else families:
+        nb_rows = rows.num_row
+        family_start = time.perf_counter()
+        FAMILIES[name].matrix(layout, rows)
+        family_stats[name] = {'rows': rows.num_row - nb_rows, 'build_time': time.perf_counter() - family_start}
+
+    # Objective: composite_objective (maximize week shifts, minimize weekend shifts)
+    c = np.zeros((layout.nI, layout.nJ, layout.nK))
+    c[:, :, :layout.nb_shifts] = np.where(layout.weekend, -1.0, 1.0)[None, :, None]
+
+    A, row_lower, row_upper = rows.matrix(layout.idx.size)
+    build_time = time.perf_counter() - start_time
+    return MatrixModel(layout.idx.shape, c.ravel(), A, row_lower, row_upper, rows.families, build_time,
+                       family_stats)
+
+
+@constraint_family('C1-C4', builder='matrix')
+def staffing(m, rows):
+    for day_type, shifts, sense, rhs, overlay in m.scheduler.staffing_rules():
+        d = np.flatnonzero(~m.weekend if day_type == 'week' else m.weekend)
+        s = [m.K.index(k) for k in shifts]
+        cols = m.idx[:, d][:, :, s].transpose(1, 0, 2).reshape(len(d), -1)
+        coefs = np.ones(cols.shape[1])
+        if overlay:
+            o = [m.K.index(k + m.nb_shifts) for k in shifts]
+            pt_cols = m.idx[m.part_time][:, d][:, :, o].transpose(1, 0, 2).reshape(len(d), -1)
+            cols = np.hstack([cols, pt_cols])
+            coefs = np.concatenate([coefs, -np.ones(pt_cols.shape[1])])
+        rows.add('C1-C4', cols, coefs, *_bounds(sense, rhs))
+
+
+@constraint_family('C5', builder='matrix')
+def one_shift_per_day(m, rows):
+    rows.add('C5', m.work.reshape(-1, m.nb_shifts), 1, upper=1)
+
+
+@constraint_family('C6', builder='matrix')
+def no_morning_after_evening(m, rows):
+    rows.add('C6', np.stack([m.idx[:, :-1, 1], m.idx[:, 1:, 0]], axis=-1).reshape(-1, 2), 1, upper=1)
+
+
+@constraint_family('C7', builder='matrix')
+def weekend_alternation(m, rows):
+    w = np.arange(1, m.nb_weeks)
+    cols = np.concatenate([m.work[:, w * 6 - 1], m.work[:, (w + 1) * 6 - 1]], axis=-1)
+    rows.add('C7', cols.reshape(-1, 2 * m.nb_shifts), 1, 1, 1)
+
+
+@constraint_family('C8', builder='matrix')
+def no_isolated_rest(m, rows):
+    d = np.arange(1, m.nJ - 1)
+    cols = np.concatenate([m.work[:, d], m.work[:, d - 1], m.work[:, d + 1]], axis=-1)
+    coefs = np.repeat([1, -1, -1], m.nb_shifts)
+    rows.add('C8', cols.reshape(-1, 3 * m.nb_shifts), coefs, upper=0)
+
+
+@constraint_family('C9', builder='matrix')
+def weekly_day_off(m, rows):
+    d = np.arange(m.nJ - 5)
+    cols = np.concatenate([m.work[:, d + index] for index in range(5)], axis=-1)
+    rows.add('C9', cols.reshape(-1, 5 * m.nb_shifts), 1, upper=4)
+
+
+@constraint_family('C10', builder='matrix')
+def days_off_budget(m, rows):
+    budget = (m.nJ - m.weekend.sum()) + 2 * m.weekend.sum() - (9 * (m.nb_weeks / 4)) + 1
+    coefs = np.repeat(1 + m.weekend.astype(int), m.nb_shifts)
+    rows.add('C10', m.work.reshape(m.nI, -1), coefs, upper=budget)
+
+
+@constraint_family('C11', builder='matrix')
+def no_isolated_work(m, rows):
+    d = np.arange(m.nJ - 2)
+    cols = np.concatenate([m.work[:, d + 1], m.idx[:, d, 1:2], m.idx[:, d + 2, 0:1]], axis=-1)
+    coefs = np.concatenate([np.ones(m.nb_shifts), [-1, -1]])
+    rows.add('C11', cols.reshape(-1, m.nb_shifts + 2), coefs, lower=-1)
+
+
+@constraint_family('C12', builder='matrix')
+def cyclic_rotation(m, rows):
+    shifted = np.roll(m.work, -6, axis=1)
+    cols = np.stack([m.work[:-1], shifted[1:]], axis=-1)
+    rows.add('C12', cols.reshape(-1, 2), [1, -1], 0, 0)
+
+
+@constraint_family('C13', builder='matrix')
+def part_time_rotation(m, rows):
+    shifted = np.roll(m.pinned, -6, axis=1)
+    cols = np.stack([m.pinned[m.part_time[:-1]], shifted[m.part_time[1:]]], axis=-1)
+    rows.add('C13', cols.reshape(-1, 2), [1, -1], 0, 0)
+
+
+@constraint_family('C14', builder='matrix')
+def full_time_no_overlay(m, rows):
+    rows.add('C14', m.pinned[m.full_time].reshape(len(m.full_time), -1), 1, 0, 0)
+
+
+@constraint_family('C15', builder='matrix')
+def part_time_days(m, rows):
+    s = np.arange(m.nb_weeks)
+    week_days = (s[:, None] * 6 + np.arange(5)).ravel()
+    part_time = m.pinned[m.part_time]
+    rows.add('C15', part_time[:, week_days].reshape(len(m.part_time) * m.nb_weeks, -1), 1, 1, 1)
+    rows.add('C15', part_time[:, s * 6 + 5].reshape(-1, m.nb_shifts), 1, 0, 0)
+    cols = np.stack([part_time, m.work[m.part_time]], axis=-1)
+    rows.add('C15', cols.reshape(-1, 2), [1, -1], upper=0)
+
+
+@constraint_family('C17', builder='matrix')
+def max_days_off_in_a_row(m, rows):
+    d = np.arange(m.nJ - 3)
+    cols = np.concatenate([m.work[:, d + index] for index in range(4)], axis=-1)
+    rows.add('C17', cols.reshape(-1, 4 * m.nb_shifts), 1, lower=1)
+
+
+def base_pattern_map(scheduler):
+    """Sparse 0/1 matrix P with x = P @ b, mapping the cyclic base pattern b to every agent.
+
+    As in ScheduleOptimizer.create_base_pattern_variables, agent a works day d of the base
+    pattern on day d + 6a (C12), part-time agents rotate the overlay the same way (C13),
+    and the overlay of full-time agents is 0 (C14).
+    """
+    I, J = list(scheduler.I), list(scheduler.J)
+    nb_shifts = scheduler.nb_shifts
+    nI, nJ, nK = len(I), len(J), len(scheduler.K)
+    nb_overlay = nK - nb_shifts
+    d = np.arange(nJ)
+    a = np.arange(nI)
+    work = ((d[None, :, None] - 6 * a[:, None, None]) % nJ) * nb_shifts + np.arange(nb_shifts)
+    full = np.arange(nI * nJ * nK).reshape(nI, nJ, nK)
+    rows, cols = [full[:, :, :nb_shifts].ravel()], [work.ravel()]
+    part_time = np.array([I.index(i) for i in scheduler.part_time_I], dtype=int)
+    num_base = nJ * nb_shifts
+    if len(part_time):
+        p = np.arange(len(part_time))
+        overlay = num_base + ((d[None, :, None] - 6 * p[:, None, None]) % nJ) * nb_overlay + np.arange(nb_overlay)
+        rows.append(full[part_time][:, :, nb_shifts:].ravel())
+        cols.append(overlay.ravel())
+        num_base += nJ * nb_overlay
+    rows, cols = np.concatenate(rows), np.concatenate(cols)
+    return csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(full.size, num_base))
+
+
+def reduce_model(model, P):
+    """Restate a MatrixModel on the columns b of x = P @ b.
+
+    Rows that become empty and satisfied (all of C12, C13 and C14 for the base pattern)
+    or identical to an earlier row are dropped. Returns a MatrixModel of shape (P.shape[1],).
+    """
+    A = (model.A @ P).tocsr()
+    A.eliminate_zeros()
+    A.sort_indices()
+    keep = np.zeros(A.shape[0], dtype=bool)
+    seen = set()
+    for r in range(A.shape[0]):
+        start, end = A.indptr[r], A.indptr[r + 1]
+        if start == end and model.row_lower[r] <= 0 <= model.row_upper[r]:
+            continue
+        key = (A.indices[start:end].tobytes(), A.data[start:end].tobytes(), model.row_lower[r], model.row_upper[r])
+        if key not in seen:
+            seen.add(key)
+            keep[r] = True
+    families, start = {}, 0
+    for family, (first, last) in model.families.items():
+        end = start + int(keep[first:last].sum())
+        families[family] = (start, end)
+        start = end
+    return MatrixModel((P.shape[1],), P.T @ model.c, A[keep], model.row_lower[keep], model.row_upper[keep],
+                       families, model.build_time)
+
+
+def pulp_constraints(model, rows, columns):
+    """PuLP constraints of some rows of a MatrixModel, `columns` holding the PuLP variable
+    (or expression) of each column."""
+    from pulp import lpSum
+
+    A = model.A
+    for r in rows:
+        start, end = A.indptr[r], A.indptr[r + 1]
+        expr = lpSum(coef * columns[col] for col, coef in zip(A.indices[start:end], A.data[start:end]))
+        lower, upper = model.row_lower[r], model.row_upper[r]
+        if lower == upper:
+            yield expr == lower
+            continue
+        if np.isfinite(lower):
+            yield expr >= lower
+        if np.isfinite(upper):
+            yield expr <= upper
+
+
+def to_highs(model, solver_config=None):
+    """Pass a MatrixModel to a new highspy.Highs instance in a single passModel call."""
+    import highspy
+    from solver_config import highs_options
+
+    lp = highspy.HighsLp()
+    lp.num_col_ = model.num_col
+    lp.num_row_ = model.num_row
+    lp.sense_ = highspy.ObjSense.kMaximize
+    lp.col_cost_ = model.c
+    lp.col_lower_ = np.zeros(model.num_col)
+    lp.col_upper_ = np.ones(model.num_col)
+    lp.row_lower_ = np.where(np.isinf(model.row_lower), -highspy.kHighsInf, model.row_lower)
+    lp.row_upper_ = np.where(np.isinf(model.row_upper), highspy.kHighsInf, model.row_upper)
+    lp.a_matrix_.format_ = highspy.MatrixFormat.kRowwise
+    lp.a_matrix_.num_col_ = model.num_col
+    lp.a_matrix_.num_row_ = model.num_row
+    lp.a_matrix_.start_ = model.A.indptr
+    lp.a_matrix_.index_ = model.A.indices
+    lp.a_matrix_.value_ = model.A.data
+    lp.integrality_ = [highspy.HighsVarType.kInteger] * model.num_col
+
+    h = highspy.Highs()
+    for option, option_value in highs_options(solver_config).items():
+        h.setOptionValue(option, option_value)
+    h.passModel(lp)
+    return h
+
+
+def solve_matrix_model(model, highs=None, solver_config=None, start=None, progress=None, stop=None):
+    """Solve a MatrixModel with HiGHS and return (result dict, solution array or None).
+
+    `start` is an optional (agent, day, shift) 0/1 array passed to HiGHS as a MIP start.
+    `progress` and `stop` report the progress of the solve and stop it at its current
+    incumbent, as in solver_config.solve.
+    """
+    h = highs if highs is not None else to_highs(model, solver_config)
+    if start is not None:
+        h.setSolution(model.num_col, np.arange(model.num_col, dtype=np.int32),
+                      np.asarray(start, dtype=float).ravel())
+    callback_types = []
+    if progress is not None or stop is not None:
+        from solver_config import highs_callback
+        callback, callback_types = highs_callback(progress, stop)
+        h.setCallback(callback, None)
+        for callback_type in callback_types:
+            h.startCallback(callback_type)
+    start_time = time.perf_counter()
+    h.run()
+    wall_time = time.perf_counter() - start_time
+    for callback_type in callback_types:
+        h.stopCallback(callback_type)
+
+    info = h.getInfo()
+    result = {
+        'solver': 'HiGHS',
+        'status': HIGHS_STATUS.get(h.getModelStatus().name, 'Undefined'),
+        'objective': None,
+        'build_time': model.build_time,
+        'wall_time': wall_time,
+        'solver_time': h.getRunTime(),
+        'cpu_time': None,
+        'gap': info.mip_gap,
+    }
+    if stop is not None and stop.is_set():
+        result['stopped'] = True
+    solution = None
+    if info.primal_solution_status:
+        solution = np.rint(np.asarray(h.getSolution().col_value)).astype(np.int8).reshape(model.shape)
+        result['objective'] = info.objective_function_value
+        # Stopped on a limit or a stop request with an incumbent (see solver_config.solve_status)
+        if result['status'] == 'Not Solved':
+            result['status'] = 'Feasible'
+    else:
+        result['gap'] = None
+    return result, solution
+
+
+def lazy_rows(pool, solution, added, tol=1e-6):
+    """Rows of a lazy pool to add after a solution: none if it violates no row, otherwise
+    the violated rows and the rows not yet added that it meets at a bound (tight rows
+    are often violated by the next solution, so adding them saves rounds)."""
+    activity = pool.A @ np.asarray(solution, dtype=float).ravel()
+    violated = (activity < pool.row_lower - tol) | (activity > pool.row_upper + tol)
+    if not violated.any():
+        return violated.nonzero()[0]
+    tight = (activity <= pool.row_lower + tol) | (activity >= pool.row_upper - tol)
+    return np.flatnonzero(violated | (tight & ~added))
+
+
+def solve_matrix_model_lazy(model, pool, solver_config=None, start=None, progress=None, stop=None):
+    """Solve a MatrixModel with the rows of `pool` (a MatrixModel over the same columns)
+    added lazily, and return (result dict, solution array or None).
+
+    Each round solves the HiGHS model, adds the pool rows violated by its solution (see
+    lazy_rows) and solves again from that solution (MIP start), until no pool row is violated; the
+    solution is then optimal for the model with all the pool rows, or only Feasible when the
+    round stopped on the time limit. The time limit applies to the whole solve; when it runs
+    out (or `stop` is set) while the incumbent violates pool rows, the result is Not Solved
+    without a solution. The result gives the number of rounds and of rows added, and the
+    times summed over the rounds. `progress` and `stop` apply to each round (see solve_matrix_model).
+    """
+    import highspy
+    from solver_config import merge_solver_config
+
+    h = to_highs(model, solver_config)
+    time_limit = merge_solver_config(solver_config)['time_limit']
+    start_time = time.perf_counter()
+    added = np.zeros(pool.num_row, dtype=bool)
+    wall_time = solver_time = 0.0
+    rounds = 0
+    while True:
+        rounds += 1
+        if time_limit is not None:
+            h.setOptionValue('time_limit', max(time_limit - (time.perf_counter() - start_time), 0.01))
+        result, solution = solve_matrix_model(model, h, start=start, progress=progress, stop=stop)
+        wall_time += result['wall_time']
+        solver_time += result['solver_time']
+        if solution is None:
+            break
+        rows = lazy_rows(pool, solution, added)
+        if not len(rows):
+            break
+        if result.get('stopped') or (time_limit is not None and time.perf_counter() - start_time >= time_limit):
+            # The incumbent violates pool rows and there is no time left to add them
+            result.update(status='Not Solved', objective=None, gap=None)
+            solution = None
+            break
+        added[rows] = True
+        block = pool.A[rows]
+        lower = np.where(np.isinf(pool.row_lower[rows]), -highspy.kHighsInf, pool.row_lower[rows])
+        upper = np.where(np.isinf(pool.row_upper[rows]), highspy.kHighsInf, pool.row_upper[rows])
+        h.addRows(len(rows), lower, upper, block.nnz, block.indptr[:-1].astype(np.int32),
+                  block.indices.astype(np.int32), block.data)
+        start = solution
+    result.update(wall_time=wall_time, solver_time=solver_time, lazy_rounds=rounds, lazy_rows=int(added.sum()))
+    return result, solution
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Scheduling service keeping built models in memory between requests: a local HTTP
+server solving ward configurations (the mappings of batch.py) with HiGHS, and its
+Python client.
+
+Models are kept per configuration shape (agent type, headcounts, horizon, constraint
+families, staffing rule structure), the least recently used one being evicted past
+`max_models`. A request on a known shape only updates the staffing levels (row bounds
+of C1-C4) and the fixed assignments (column bounds) of the HiGHS model in memory, and
+starts from its last solution: no model is built and no file is written.
+
+    python model_server.py --port 8765
+    curl -d '{"agent_type": "nurse", "staffing_week": [4, 2, 1]}' http://127.0.0.1:8765/solve
+"""
+
+import argparse
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+
+DEFAULT_PORT = 8765
+
+
+def model_key(scheduler):
+    """Key of the shape of a scheduler's model: everything but staffing levels and solver options."""
+    from constraints import enabled_families
+
+    config = scheduler.config
+    rules = [(day_type, list(shifts), sense, bool(overlay))
+             for day_type, shifts, sense, rhs, overlay in scheduler.staffing_rules()]
+    shape = [type(scheduler).__name__, len(scheduler.I), len(scheduler.part_time_I), scheduler.nb_weeks,
+             scheduler.nb_shifts, bool(config.get('base_pattern')), enabled_families(config), rules]
+    return hashlib.sha256(json.dumps(shape).encode()).hexdigest()[:16]
+
+
+class _Model:
+    """A model kept by the server: the MatrixModel, its HiGHS instance and the last solution."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.model = None
+        self.highs = None
+        self.P = None
+        self.start = None
+        self.fixed = False
+        self.hits = 0
+
+
+class ModelStore:
+    """LRU store of built models, solving ward configurations on them."""
+
+    def __init__(self, max_models=8):
+        self.max_models = max_models
+        self.models = OrderedDict()
+        self.lock = threading.Lock()
+
+    def entry(self, key):
+        """Model entry of a key, created (empty) if unknown; returns (entry, known)."""
+        with self.lock:
+            if key in self.models:
+                self.models.move_to_end(key)
+                return self.models[key], True
+            self.models[key] = entry = _Model()
+            while len(self.models) > self.max_models:
+                evicted, _ = self.models.popitem(last=False)
+                print("Evicted model", evicted)
+            return entry, False
+
+    def describe(self):
+        """Key, size and hits of every model, most recently used last."""
+        with self.lock:
+            return [{'key': key, 'rows': entry.model.num_row if entry.model else None,
+                     'columns': entry.model.num_col if entry.model else None, 'hits': entry.hits}
+                    for key, entry in self.models.items()]
+
+    def solve(self, ward):
+        """Solve a ward configuration (see batch.ward_config) and return the response dict.
+
+        `ward` may also hold `fix`, a list of [agent, day, shift, value] assignments to
+        impose (not with the base pattern model).
+        """
+        from batch import ward_config
+        from jobs import make_scheduler
+        from matrix_model import base_pattern_map, build_matrix_model, reduce_model, solve_matrix_model, to_highs
+        from roster_stats import roster_codes
+        from solver_config import highs_options
+
+        ward = dict(ward)
+        fix = ward.pop('fix', None) or []
+        ward.setdefault('name', 'request')
+        agent_type, config = ward_config(ward, {'name': 'HiGHS', 'msg': False})
+        scheduler = make_scheduler(agent_type, config)
+        key = model_key(scheduler)
+        if fix and config.get('base_pattern'):
+            raise ValueError("Fixed assignments need the full model, not the base pattern one")
+        response = {'key': key, 'cached': False, 'status': None, 'objective': None, 'gap': None,
+                    'build_time': 0.0, 'update_time': 0.0, 'solve_time': 0.0, 'codes': None, 'pinned': None}
+        issues = scheduler.precheck()
+        if issues:
+            from feasibility import format_issues
+            response.update(status=scheduler.result['status'], diagnosis=format_issues(issues))
+            return response
+
+        entry, known = self.entry(key)
+        with entry.lock:
+            start_time = time.perf_counter()
+            if entry.highs is None:
+                entry.model = build_matrix_model(scheduler)
+                if config.get('base_pattern'):
+                    entry.P = base_pattern_map(scheduler)
+                    entry.model = reduce_model(entry.model, entry.P)
+                entry.highs = to_highs(entry.model, scheduler.solver_config)
+                response['build_time'] = time.perf_counter() - start_time
+            else:
+                response['cached'] = True
+                self.update_staffing(entry, scheduler)
+                entry.highs.resetOptions()
+                for option, option_value in highs_options(scheduler.solver_config).items():
+                    entry.highs.setOptionValue(option, option_value)
+            self.fix_columns(entry, scheduler, fix)
+            response['update_time'] = time.perf_counter() - start_time - response['build_time']
+            entry.hits += 1
+
+            result, solution = solve_matrix_model(entry.model, entry.highs, start=entry.start)
+            if solution is not None:
+                entry.start = solution
+                if entry.P is not None:
+                    solution = np.rint(entry.P @ solution).reshape(len(scheduler.I), len(scheduler.J), -1)
+        response.update(status=result['status'], objective=result['objective'], solve_time=result['wall_time'],
+                        gap=result['gap'] if result['status'] in ('Optimal', 'Feasible') else None)
+        if solution is not None:
+            codes, pinned = roster_codes(solution, scheduler.nb_shifts)
+            response.update(codes=codes.tolist(), pinned=pinned.tolist())
+        return response
+
+    @staticmethod
+    def update_staffing(entry, scheduler):
+        """Set the staffing rows (C1-C4) of a kept model to the staffing levels of a scheduler."""
+        from matrix_model import build_matrix_model, reduce_model
+
+        if 'C1-C4' not in entry.model.families:
+            return
+        staffing = build_matrix_model(scheduler, ['C1-C4'])
+        if entry.P is not None:
+            staffing = reduce_model(staffing, entry.P)
+        first, last = entry.model.families['C1-C4']
+        rows = np.arange(first, last)
+        if (np.array_equal(staffing.row_lower, entry.model.row_lower[rows])
+                and np.array_equal(staffing.row_upper, entry.model.row_upper[rows])):
+            return
+        import highspy
+        entry.model.row_lower[rows] = staffing.row_lower
+        entry.model.row_upper[rows] = staffing.row_upper
+        entry.highs.changeRowsBounds(len(rows), rows.astype(np.int32),
+                                     np.where(np.isinf(staffing.row_lower), -highspy.kHighsInf, staffing.row_lower),
+                                     np.where(np.isinf(staffing.row_upper), highspy.kHighsInf, staffing.row_upper))
+
+    @staticmethod
+    def fix_columns(entry, scheduler, fix):
+        """Set the column bounds of a kept model: 0-1, except the [agent, day, shift, value] assignments of `fix`."""
+        if not fix and not entry.fixed:
+            return
+        I, J, K = list(scheduler.I), list(scheduler.J), list(scheduler.K)
+        lower, upper = np.zeros(entry.model.num_col), np.ones(entry.model.num_col)
+        for agent, day, shift, value in fix:
+            col = np.ravel_multi_index((I.index(agent), J.index(day), K.index(shift)), entry.model.shape)
+            lower[col] = upper[col] = value
+        entry.highs.changeColsBounds(entry.model.num_col, np.arange(entry.model.num_col, dtype=np.int32), lower, upper)
+        entry.fixed = bool(fix)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """JSON API: POST /solve, GET /models, GET /health."""
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/health':
+            self.send_json(200, {'status': 'ok'})
+        elif self.path == '/models':
+            self.send_json(200, self.server.store.describe())
+        else:
+            self.send_json(404, {'error': f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        if self.path != '/solve':
+            self.send_json(404, {'error': f"Unknown path {self.path}"})
+            return
+        try:
+            ward = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            response = self.server.store.solve(ward)
+        except (ValueError, KeyError, TypeError) as error:
+            self.send_json(400, {'error': f"{type(error).__name__}: {error}"})
+        except Exception as error:
+            self.send_json(500, {'error': f"{type(error).__name__}: {error}"})
+        else:
+            print(f"{response['key']}: {response['status']} in {response['solve_time']:.2f}s"
+                  f"{' (cached model)' if response['cached'] else ''}")
+            self.send_json(200, response)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(host='127.0.0.1', port=DEFAULT_PORT, max_models=8):
+    """HTTP server with its ModelStore (server.store); call serve_forever() to run it."""
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.store = ModelStore(max_models)
+    return server
+
+
+class ModelClient:
+    """Python client of the scheduling service."""
+
+    def __init__(self, url=f"http://127.0.0.1:{DEFAULT_PORT}", timeout=None):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+
+    def request(self, path, payload=None):
+        from urllib.error import HTTPError
+        from urllib.request import Request, urlopen
+
+        data = None if payload is None else json.dumps(payload).encode()
+        request = Request(self.url + path, data=data, headers={'Content-Type': 'application/json'})
+        try:
+            with urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except HTTPError as error:
+            raise RuntimeError(json.loads(error.read()).get('error', str(error))) from None
+
+    def solve(self, **ward):
+        """Solve a ward configuration; the roster comes back as (agent, day) NumPy arrays `codes` and `pinned`."""
+        response = self.request('/solve', ward)
+        if response['codes'] is not None:
+            response['codes'] = np.array(response['codes'], dtype=np.uint8)
+            response['pinned'] = np.array(response['pinned'], dtype=bool)
+        return response
+
+    def models(self):
+        """Models kept by the server."""
+        return self.request('/models')
+
+    def health(self):
+        return self.request('/health')
+
+
+def parse_args(argv=None):
+    """Parse the command line arguments."""
+    parser = argparse.ArgumentParser(description="Scheduling service keeping built models in memory.")
+    parser.add_argument('--host', default='127.0.0.1', help="Address to listen on (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f"Port (default: {DEFAULT_PORT})")
+    parser.add_argument('--max-models', type=int, default=8, help="Models kept in memory (default: 8)")
+    return parser.parse_args(argv)
+
+
+def main():
+    """Main function with command line interface."""
+    args = parse_args()
+    server = make_server(args.host, args.port, args.max_models)
+    print(f"Serving on http://{args.host}:{args.port} (up to {args.max_models} models)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,16 @@
-from pulp import LpMaximize, LpMinimize, lpSum
+"""
+Objective functions: the historical PuLP objectives (maximize, minimize, composite),
+and a registry of objective terms combined by config['objective']. Each term is a
+named generator returning a linear expression, adding its auxiliary variables and
+rows to the model when it needs some (e.g. min-max bounds), with the sense it is
+optimized in.
+
+Terms are combined as a weighted sum (one solve), or lexicographically: one solve
+per term in priority order, each keeping the optimum of the earlier ones (see
+ScheduleOptimizer.solve_lexicographic).
+"""
+
+from pulp import LpMaximize, LpMinimize, LpVariable, lpSum
 
 
 def maximize_objective(prob, x, I, J, K, nb_shifts):  # noqa
@@ -16,3 +28,139 @@ def composite_objective(prob, x, I, J, K, nb_shifts):  # noqa
     prob.sense = LpMaximize
     prob += (lpSum(x[i, j, k] for i in I for j in J if j % 6 != 0 for k in K[:nb_shifts])
              - lpSum(x[i, j, k] for i in I for j in J if j % 6 == 0 for k in K[:nb_shifts]))
+
+
+class ObjectiveTerm:
+    """A named objective term: its generator, its sense ('max' or 'min'), and the constraint
+    families under which it is constant."""
+
+    def __init__(self, name, sense, description, generator, constant_with=()):
+        self.name = name
+        self.sense = sense
+        self.description = description
+        self.generator = generator
+        self.constant_with = constant_with
+
+
+# Term name -> ObjectiveTerm, in registration order
+OBJECTIVE_TERMS = {}
+
+MODES = ('weighted', 'lexicographic')
+
+
+def objective_term(name, sense, description, constant_with=()):
+    """Decorator registering the generator of an objective term, called as generator(scheduler, prob, x).
+
+    `constant_with` names the constraint families making the term constant: the term is
+    rejected while one of them is enabled (see objective_options).
+    """
+    def register(generator):
+        OBJECTIVE_TERMS[name] = ObjectiveTerm(name, sense, description, generator, constant_with)
+        return generator
+    return register
+
+
+def objective_options(config):
+    """(mode, [(term, weight)], tolerance) of config['objective'].
+
+    config['objective'] is a dict with 'mode' ('weighted' by default, or 'lexicographic'),
+    'terms' (a {term: weight} dict, or a list of terms weighted 1, in priority order for the
+    lexicographic mode) and 'tolerance' (relative slack left on the optimum of each
+    lexicographic stage, 0 by default). A negative weight reverses the sense of a term.
+    A term is rejected while a family making it constant is enabled (the base pattern
+    model always enforces C12).
+    """
+    from constraints import enabled_families
+
+    options = config.get('objective') or {}
+    mode = options.get('mode', 'weighted')
+    if mode not in MODES:
+        raise ValueError(f"Unknown objective mode: {mode} (known: {', '.join(MODES)})")
+    terms = options.get('terms', ['composite'])
+    terms = list(terms.items()) if isinstance(terms, dict) else [(name, 1) for name in terms]
+    unknown = {name for name, weight in terms} - set(OBJECTIVE_TERMS)
+    if unknown:
+        raise ValueError(f"Unknown objective terms: {', '.join(sorted(unknown))} "
+                         f"(known: {', '.join(OBJECTIVE_TERMS)})")
+    if not terms:
+        raise ValueError("config['objective'] needs at least one term")
+    families = set(enabled_families(config)) | ({'C12'} if config.get('base_pattern') else set())
+    constant = {name: [family for family in OBJECTIVE_TERMS[name].constant_with if family in families]
+                for name, weight in terms}
+    constant = {name: found for name, found in constant.items() if found}
+    if constant:
+        raise ValueError("Objective terms constant under the enabled constraint families: "
+                         + ", ".join(f"{name} ({', '.join(found)})" for name, found in constant.items())
+                         + "; disable them with config['constraints'], e.g. {'C12': False, 'C13': False}")
+    return mode, terms, options.get('tolerance', 0.0)
+
+
+def add_objective_terms(scheduler, prob, x, names):
+    """Generate the terms `names` on a PuLP problem; returns {term: expression}."""
+    return {name: OBJECTIVE_TERMS[name].generator(scheduler, prob, x) for name in names}
+
+
+def stage_objective(name, expression, weight=1):
+    """Expression to maximize for a term: the term, negated when it is minimized, times its weight."""
+    sign = 1 if OBJECTIVE_TERMS[name].sense == 'max' else -1
+    return sign * weight * expression
+
+
+def weighted_objective(expressions, weights):
+    """Expression to maximize for a weighted sum of terms."""
+    return lpSum(stage_objective(name, expressions[name], weights[name]) for name in expressions)
+
+
+@objective_term('composite', 'max', "Week shifts minus week-end shifts (composite_objective)")
+def composite_term(s, prob, x):
+    return (lpSum(x[i, j, k] for i in s.I for j in s.J if j % 6 != 0 for k in s.K[:s.nb_shifts])
+            - lpSum(x[i, j, k] for i in s.I for j in s.J if j % 6 == 0 for k in s.K[:s.nb_shifts]))
+
+
+@objective_term('coverage_surplus', 'max', "Agents staffed above the minimum of the '>=' staffing rules")
+def coverage_surplus(s, prob, x):
+    surplus = []
+    for day_type, shifts, sense, rhs, overlay in s.staffing_rules():
+        if sense != '>=':
+            continue
+        for j in s.staffing_days(day_type):
+            surplus.append(lpSum(x[i, j, k] for i in s.I for k in shifts) - rhs)
+            if overlay:
+                surplus.append(-lpSum(x[i, j, k + s.nb_shifts] for i in s.part_time_I for k in shifts))
+    return lpSum(surplus)
+
+
+# C12 makes every agent a rotation of the same pattern, so every agent has the same counts
+@objective_term('shift_balance', 'min', "Spread of each shift type over the full-time agents (max - min count)",
+                constant_with=('C12',))
+def shift_balance(s, prob, x):
+    agents = list(s.full_time_I)
+    if len(agents) < 2:
+        return lpSum([])
+    spread = []
+    for k in s.K[:s.nb_shifts]:
+        # Min-max bounds on the count of shift k per agent
+        highest = LpVariable(f"shift_balance_max{k}", lowBound=0)
+        lowest = LpVariable(f"shift_balance_min{k}", lowBound=0)
+        for i in agents:
+            count = lpSum(x[i, j, k] for j in s.J)
+            prob += highest >= count
+            prob += lowest <= count
+        spread.append(highest - lowest)
+    return lpSum(spread)
+
+
+# C7 has every agent work every other week-end, so every agent works as many week-ends
+@objective_term('weekend_spread', 'min', "Spread of the number of week-ends worked per agent (max - min count)",
+                constant_with=('C7', 'C12'))
+def weekend_spread(s, prob, x):
+    if len(s.I) < 2:
+        return lpSum([])
+    # Min-max bounds on the week-ends worked per agent
+    highest = LpVariable("weekend_spread_max", lowBound=0)
+    lowest = LpVariable("weekend_spread_min", lowBound=0)
+    for i in s.I:
+        load = lpSum(x[i, j, k] for j in s.J if j % 6 == 0 for k in s.K[:s.nb_shifts])
+        prob += highest >= load
+        prob += lowest <= load
+    return highest - lowest
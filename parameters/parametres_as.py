@@ -9,4 +9,24 @@ part_time_I = range(1, nb_part_time_agents + 1)  # Indices of part-time agents i
 full_time_I = [i for i in I if i not in part_time_I]  # Indices of full-time agents in I
 staffing_constraints_week = [3, 0, 2]
 staffing_constraints_weekend = [3, 0, 2]
+# Staffing rules (day type, shifts, sense, number of agents, part-time overlay)
+staffing_rules = [
+    # Week days
+    # C1 (morning shift constraint)
+    ('week', (1,), '>=', 3, True),
+    # C2 (evening shift constraint)
+    ('week', (2,), '>=', 2, True),
+    # C3 (day shift constraint)
+    ('week', (3,), '==', 0, False),
+    # Weekends
+    # C1b (total week-end shift constraint)
+    ('weekend', (1, 2), '>=', 4, False),
+    # C1 (morning week-end shift constraint)
+    ('weekend', (2,), '>=', 1, False),
+    # C2 (evening week-end shift constraint)
+    ('weekend', (2,), '>=', 1, False),
+    ('weekend', (2,), '<=', 2, False),
+    # C4 (day shift constraint)
+    ('weekend', (3,), '==', 0, False),
+]
 dest_file = "caregivers_schedule.xlsx"
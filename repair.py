@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Roster repair after absences: an existing roster is kept everywhere except on the days
+around the absences, where HiGHS re-plans the shifts while changing as few assignments
+as possible. The model is built once per roster; each repair only updates the column
+bounds and costs of the HiGHS model in memory before solving again.
+
+An absent agent breaks the rotation of the cyclic roster, so C12 and C13 are left out
+of the repair model, and the rows of the absent agent about days off in a row (C7, C8,
+C11, C15, C17) are relaxed across the absence; every other row still holds.
+"""
+
+import argparse
+import time
+import numpy as np
+
+
+RELAXED_FAMILIES = ('C12', 'C13')
+
+# Rows about the rhythm of days off no longer make sense through an absence: those of an
+# absent agent that involve an absent day are dropped, C15 keeping its upper bound
+ABSENCE_RELAXED = {'C7': 'drop', 'C8': 'drop', 'C11': 'drop', 'C17': 'drop', 'C15': 'lower'}
+
+DEFAULT_OPTIONS = {
+    'radius': 3,              # days freed before and after each absence, doubled while infeasible
+    'change_weight': 10.0,    # objective cost of one changed assignment, above the shift values of composite_objective
+    'shortage_weight': 100.0,  # objective cost of one missing agent on a staffing rule, None to forbid shortages
+}
+
+
+class RosterRepair:
+    """Repairs a roster after absences on one HiGHS model, updated in place between repairs.
+
+    The staffing rows with a lower bound (C1-C4) get a shortage column each, so that a
+    repair may leave a shift short of an agent at `shortage_weight` rather than fail.
+    """
+
+    def __init__(self, scheduler, roster, change_weight=DEFAULT_OPTIONS['change_weight'],
+                 shortage_weight=DEFAULT_OPTIONS['shortage_weight']):
+        from scipy.sparse import csr_matrix, hstack
+        from constraints import enabled_families
+        from matrix_model import MatrixModel, build_matrix_model, to_highs
+
+        self.scheduler = scheduler
+        self.I, self.J = list(scheduler.I), list(scheduler.J)
+        families = [name for name in enabled_families(scheduler.config) if name not in RELAXED_FAMILIES]
+        model = build_matrix_model(scheduler, families)
+        self.shape = model.shape
+        self.num_x = model.num_col
+        self.c = model.c
+        self.full_model = model
+
+        # Shortage columns of the staffing rows, in the row order of the matrix generator
+        first, last = model.families.get('C1-C4', (0, 0))
+        self.shortage_rows = first + np.flatnonzero(np.isfinite(model.row_lower[first:last]))
+        self.shortage_days = self.staffing_row_days()[self.shortage_rows - first]
+        nb_shortages = len(self.shortage_rows)
+        S = csr_matrix((np.ones(nb_shortages), (self.shortage_rows, np.arange(nb_shortages))),
+                       shape=(model.num_row, nb_shortages))
+        self.model = MatrixModel((self.num_x + nb_shortages,), np.concatenate([model.c, np.zeros(nb_shortages)]),
+                                 hstack([model.A, S]).tocsr(), model.row_lower, model.row_upper, model.families,
+                                 model.build_time)
+        self.highs = to_highs(self.model, scheduler.solver_config)
+        self.build_time = model.build_time
+        self.row_bounds = self.model.row_lower.copy(), self.model.row_upper.copy()
+        self.change_weight = change_weight
+        self.shortage_weight = shortage_weight
+        self.roster = np.asarray(roster, dtype=np.int8).reshape(self.shape)
+        self.absent = np.zeros(self.shape[:2], dtype=bool)
+
+    def staffing_row_days(self):
+        """(day, shifts) of each staffing row, as generated by matrix_model.staffing."""
+        weekend = np.array(self.J) % 6 == 0
+        days = []
+        for day_type, shifts, sense, rhs, overlay in self.scheduler.staffing_rules():
+            days += [(self.J[d], tuple(shifts)) for d in np.flatnonzero(~weekend if day_type == 'week' else weekend)]
+        return np.array(days, dtype=object).reshape(-1, 2)
+
+    def add_absences(self, absences):
+        """Mark absences, a {agent: days} dict of agents of I and days of J."""
+        for agent, days in absences.items():
+            if agent not in self.I:
+                raise ValueError(f"Unknown agent {agent}")
+            unknown = [day for day in days if day not in self.J]
+            if unknown:
+                raise ValueError(f"Unknown days for agent {agent}: {unknown}")
+            self.absent[self.I.index(agent), [self.J.index(day) for day in days]] = True
+
+    def free_days(self, radius):
+        """Days within `radius` days of an absence, for which every agent is re-planned."""
+        days = np.flatnonzero(self.absent.any(axis=0))
+        free = np.zeros(len(self.J), dtype=bool)
+        for day in days:
+            free[max(day - radius, 0):day + radius + 1] = True
+        return free
+
+    def relax_rows(self):
+        """Update the row bounds of the HiGHS model for the absences (see ABSENCE_RELAXED)."""
+        import highspy
+
+        absent = np.broadcast_to(self.absent[:, :, None], self.shape).ravel().astype(float)
+        touched = abs(self.full_model.A) @ absent > 0
+        lower, upper = self.row_bounds[0].copy(), self.row_bounds[1].copy()
+        for family, relax in ABSENCE_RELAXED.items():
+            if family in self.model.families:
+                rows = np.zeros(self.model.num_row, dtype=bool)
+                rows[slice(*self.model.families[family])] = True
+                lower[rows & touched] = -np.inf
+                if relax == 'drop':
+                    upper[rows & touched] = np.inf
+        rows = np.flatnonzero(touched)
+        self.highs.changeRowsBounds(len(rows), rows.astype(np.int32),
+                                    np.where(np.isinf(lower[rows]), -highspy.kHighsInf, lower[rows]),
+                                    np.where(np.isinf(upper[rows]), highspy.kHighsInf, upper[rows]))
+
+    def solve(self, free):
+        """Solve with the days `free` re-planned and the others kept; returns (result, roster, shortages)."""
+        from matrix_model import solve_matrix_model
+
+        roster = self.roster.ravel().astype(float)
+        lower = np.where(free[None, :, None], 0.0, self.roster).ravel().astype(float)
+        upper = np.where(free[None, :, None], 1.0, self.roster).ravel().astype(float)
+        upper[np.broadcast_to(self.absent[:, :, None], self.shape).ravel()] = 0
+        lower = np.minimum(lower, upper)
+        start = np.minimum(roster, upper)
+        # Shortages on the free days only, up to the whole staffing level
+        staffing_days = np.array([self.J.index(day) for day, shifts in self.shortage_days], dtype=int)
+        shortage_upper = np.where(free[staffing_days], self.model.row_lower[self.shortage_rows], 0)
+        if self.shortage_weight is None:
+            shortage_upper[:] = 0
+        shortage_start = np.clip(self.model.row_lower[self.shortage_rows]
+                                 - self.full_model.A[self.shortage_rows] @ start, 0, shortage_upper)
+        # Maximize the objective minus change_weight per changed assignment and shortage_weight per shortage
+        cost = np.concatenate([self.c + self.change_weight * (2 * roster - 1),
+                               np.full(len(self.shortage_rows), -(self.shortage_weight or 0.0))])
+        self.relax_rows()
+        columns = np.arange(self.model.num_col, dtype=np.int32)
+        self.highs.changeColsBounds(self.model.num_col, columns, np.concatenate([lower, np.zeros(len(shortage_upper))]),
+                                    np.concatenate([upper, shortage_upper]))
+        self.highs.changeColsCost(self.model.num_col, columns, cost)
+        result, solution = solve_matrix_model(self.model, self.highs, start=np.concatenate([start, shortage_start]))
+        if solution is None:
+            return result, None, None
+        shortages = [(day, shifts, int(missing)) for (day, shifts), missing
+                     in zip(self.shortage_days, solution[self.num_x:]) if missing > 0]
+        return result, solution[:self.num_x].reshape(self.shape), shortages
+
+    def repair(self, absences=None, radius=DEFAULT_OPTIONS['radius']):
+        """Repair the roster for the absences added so far (and `absences`); returns (result, solution).
+
+        The free days grow from `radius` days around each absence until the problem is
+        feasible. The result lists the changed assignments (see roster_changes) and the
+        staffing shortages as (day, shifts, missing agents). The repaired roster becomes
+        the roster of the next repair.
+        """
+        if absences:
+            self.add_absences(absences)
+        start_time = time.perf_counter()
+        solver_time = 0.0
+        while True:
+            free = self.free_days(radius)
+            result, solution, shortages = self.solve(free)
+            solver_time += result['solver_time']
+            if solution is not None or free.all():
+                break
+            print(f"No repair within {radius} days, freeing more days")
+            radius *= 2
+        result.update(build_time=self.build_time, wall_time=time.perf_counter() - start_time,
+                      solver_time=solver_time, radius=radius, free_days=int(free.sum()))
+        self.build_time = 0.0
+        if solution is not None:
+            result['objective'] = float(self.c @ solution.ravel())
+            result['changes'] = roster_changes(self.scheduler, self.roster, solution)
+            result['shortages'] = shortages
+            self.roster = solution
+        return result, solution
+
+
+def roster_changes(scheduler, before, after):
+    """(agent, day, before, after) of each (agent, day) whose shift label changed, e.g. (3, 14, 'M', 'R')."""
+    from roster_stats import SHIFT_NAMES, roster_codes
+
+    names = np.array(['R'] + [SHIFT_NAMES.get(k, str(k)) for k in range(1, scheduler.nb_shifts + 1)], dtype=object)
+    labels = []
+    for roster in (before, after):
+        codes, pinned = roster_codes(roster, scheduler.nb_shifts)
+        grid = names[codes]
+        grid[pinned] += " (RA)"
+        labels.append(grid)
+    I, J = list(scheduler.I), list(scheduler.J)
+    return [(I[a], J[b], labels[0][a, b], labels[1][a, b]) for a, b in zip(*np.nonzero(labels[0] != labels[1]))]
+
+
+def parse_absence(text):
+    """Absence AGENT:DAYS, e.g. '3:14' or '3:14-17' or '3:14,20'."""
+    from sweep import parse_values
+
+    agent, _, days = text.partition(':')
+    if not days:
+        raise argparse.ArgumentTypeError(f"Expected AGENT:DAYS, got {text!r}")
+    return int(agent), parse_values(days)
+
+
+def parse_args(argv=None):
+    """Parse the command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Repair an exported schedule after absences, changing as few assignments as possible.",
+        epilog="Example: repair.py nurse output/nurses_schedule.xlsx --absent 3:14-17 --absent 5:20"
+    )
+    parser.add_argument('agent_type', choices=['nurse', 'caregiver'], help="Agents of the schedule")
+    parser.add_argument('roster', help="Schedule to repair: an exported .xlsx or .roster file, or a saved .npy solution")
+    parser.add_argument('--absent', type=parse_absence, action='append', required=True, metavar='AGENT:DAYS',
+                        help="Absent agent and days of the horizon (repeatable)")
+    parser.add_argument('--radius', type=int, default=DEFAULT_OPTIONS['radius'],
+                        help="Days re-planned around each absence (default: 3)")
+    parser.add_argument('--time-limit', type=float, help="Solver time limit in seconds")
+    parser.add_argument('--out', help="Repaired schedule, under output/ (default: <roster>_repaired.xlsx)")
+    return parser.parse_args(argv)
+
+
+def main():
+    """Main function with command line interface."""
+    import os
+    from config_manager import get_caregiver_config, get_nurse_config
+    from jobs import make_scheduler
+    from warm_start import load_initial_assignment
+
+    args = parse_args()
+    get_config = get_nurse_config if args.agent_type == 'nurse' else get_caregiver_config
+    solver = {'name': 'HiGHS', 'msg': False, **({'time_limit': args.time_limit} if args.time_limit else {})}
+    config = get_config(solver)
+    config['dest_file'] = args.out or os.path.splitext(os.path.basename(args.roster))[0] + "_repaired.xlsx"
+    scheduler = make_scheduler(args.agent_type, config)
+    absences = {}
+    for agent, days in args.absent:
+        absences.setdefault(agent, []).extend(days)
+
+    result, solution = scheduler.repair(absences, load_initial_assignment(scheduler, args.roster), radius=args.radius)
+    if solution is None:
+        print("No repair found:", result['status'])
+        return 1
+    for agent, day, before, after in result['changes']:
+        print(f"Agent {agent}, day {day}: {before} -> {after}")
+    for day, shifts, missing in result['shortages']:
+        print(f"Day {day}: {missing} agent(s) missing on shifts {', '.join(map(str, shifts))}")
+    print(f"{len(result['changes'])} assignments changed over {result['free_days']} days "
+          f"in {result['wall_time']:.2f}s")
+    scheduler.export(solution)
+    print(f"Repaired schedule written to output/{config['dest_file']}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
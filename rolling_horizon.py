@@ -0,0 +1,159 @@
+"""
+Rolling-horizon mode for long planning horizons: the base pattern model (C12, C13,
+see matrix_model.reduce_model) is solved over overlapping windows of weeks instead of
+all at once. Each window frees its weeks, keeps the weeks before it fixed, and leaves
+the weeks after it out; then the window moves on by `step` weeks.
+
+A window keeps the rows that only involve fixed weeks and its own weeks. The rows
+straddling the fixed part take its values as constants, which carries the boundary
+state forward exactly: the last shift (C6, C8, C11), the week-end parity (C7) and the
+days off in a row (C9, C17). Rows involving weeks not decided yet are left out, except
+the day-off budget (C10) whose bound is prorated to the weeks decided. The last window
+holds every row, including the complete C10 budget and the rows wrapping around the
+cyclic pattern to its first weeks.
+
+When a window is infeasible, the repair pass frees more weeks around it (before it,
+and from the start of the pattern for the last window) until it is feasible; with all
+the weeks free, it is the monolithic model, whose status is then final.
+"""
+
+import time
+import numpy as np
+
+
+DEFAULT_OPTIONS = {
+    'window': 12,       # weeks freed by each window
+    'step': 4,          # weeks fixed after each window
+    'compare': False,   # also solve the monolithic model and report the gap
+}
+
+
+def column_weeks(scheduler, num_col):
+    """Base pattern week of each column of the reduced model (work columns, then overlay)."""
+    nJ, nb_shifts = len(scheduler.J), scheduler.nb_shifts
+    days = np.arange(nJ * nb_shifts) // nb_shifts
+    if num_col > nJ * nb_shifts:
+        nb_overlay = (num_col - nJ * nb_shifts) // nJ
+        days = np.concatenate([days, np.arange(nJ * nb_overlay) // nb_overlay])
+    return days // 6
+
+
+def row_last_weeks(model, weeks):
+    """Last week involved in each row of a model (-1 for an empty row)."""
+    A = model.A
+    last = np.full(model.num_row, -1)
+    filled = np.diff(A.indptr) > 0
+    last[filled] = np.maximum.reduceat(weeks[A.indices], A.indptr[:-1][filled])
+    return last
+
+
+def solve_weeks(model, values, free, rows, upper_scale, solver_config):
+    """Solve the rows `rows` of a model over the columns `free`, the others keeping `values`.
+
+    `upper_scale` scales the upper bound of each row (C10 prorating). Rows left without
+    free column are dropped. Returns the result dict of the sub-problem and the updated
+    values (None if it has no solution).
+    """
+    from matrix_model import MatrixModel, solve_matrix_model
+
+    A = model.A[rows]
+    fixed = A[:, ~free] @ values[~free]
+    A_free = A[:, free].tocsr()
+    keep = np.diff(A_free.indptr) > 0
+    sub = MatrixModel((int(free.sum()),), model.c[free], A_free[keep],
+                      model.row_lower[rows][keep] - fixed[keep],
+                      model.row_upper[rows][keep] * upper_scale[keep] - fixed[keep], {}, 0)
+    result, solution = solve_matrix_model(sub, solver_config=solver_config, start=values[free])
+    if solution is None:
+        return result, None
+    values = values.copy()
+    values[free] = solution
+    return result, values
+
+
+def rolling_horizon(scheduler, options=None):
+    """Solve a scheduler's problem window by window; returns (result dict, solution array or None).
+
+    `options` completes DEFAULT_OPTIONS (window, step, compare). The status is 'Feasible'
+    when a roster meets every constraint (it is not proven optimal), or the status of the
+    monolithic model when the repair pass had to free every week. With `compare`, the
+    monolithic model is solved too, and the result gives its outcome and the relative
+    gap of the rolling-horizon objective to it.
+    """
+    from matrix_model import base_pattern_map, reduce_model, solve_matrix_model
+
+    options = {**DEFAULT_OPTIONS, **(options or {})}
+    window, step = options['window'], options['step']
+    if not 0 < step <= window:
+        raise ValueError(f"Rolling horizon: expected 0 < step <= window, got step {step} and window {window}")
+    start_time = time.perf_counter()
+    full_model = scheduler.build_matrix_model()
+    P = base_pattern_map(scheduler)
+    model = reduce_model(full_model, P)
+    weeks = column_weeks(scheduler, model.num_col)
+    last_weeks = row_last_weeks(model, weeks)
+    budget = np.zeros(model.num_row, dtype=bool)
+    if 'C10' in model.families:
+        budget[slice(*model.families['C10'])] = True
+    nb_weeks = scheduler.nb_weeks
+    build_time = time.perf_counter() - start_time
+
+    values = np.zeros(model.num_col)
+    solver_time, windows, repairs = 0.0, 0, 0
+    status = 'Feasible'
+    first = 0
+    while True:
+        end = min(first + window, nb_weeks)
+        # Rows over decided weeks; the C10 budget is prorated to them until the last window
+        rows = np.flatnonzero((last_weeks >= 0) & ((last_weeks < end) | budget))
+        for margin in range(0, nb_weeks + step, step):
+            free_weeks = np.zeros(nb_weeks, dtype=bool)
+            free_weeks[max(first - margin, 0):end] = True
+            if end == nb_weeks:
+                free_weeks[:margin] = True
+            everything = free_weeks[:end].all()
+            upper_scale = np.where(budget[rows] & (last_weeks[rows] >= end) & ~everything, end / nb_weeks, 1.0)
+            result, solved = solve_weeks(model, values, free_weeks[weeks], rows, upper_scale,
+                                         scheduler.solver_config)
+            solver_time += result['wall_time']
+            if solved is not None or everything:
+                break
+            repairs += 1
+            print(f"Weeks {first + 1}-{end} infeasible, freeing {margin + step} more weeks")
+        if solved is None:
+            # Every decided week was free, and the rows kept are a relaxation of the whole problem
+            status = result['status']
+            break
+        values = solved
+        windows += 1
+        print(f"Weeks {first + 1}-{end} solved ({result['wall_time']:.2f}s)")
+        if end == nb_weeks:
+            break
+        first += step
+
+    solution = None
+    if status == 'Feasible':
+        solution = np.rint(P @ values).astype(np.int8).reshape(full_model.shape)
+        if full_model.violated_rows(solution).size:
+            status = 'Not Solved'
+    wall_time = time.perf_counter() - start_time
+    result = {
+        'solver': 'HiGHS',
+        'status': status,
+        'objective': float(full_model.c @ solution.ravel()) if solution is not None else None,
+        'build_time': build_time,
+        'wall_time': wall_time,
+        'solver_time': solver_time,
+        'cpu_time': None,
+        'gap': None,
+        'windows': windows,
+        'repairs': repairs,
+    }
+    if options['compare']:
+        print("Solving the monolithic model...")
+        monolithic, _ = solve_matrix_model(model, solver_config=scheduler.solver_config)
+        result['monolithic'] = {'status': monolithic['status'], 'objective': monolithic['objective'],
+                                'wall_time': monolithic['wall_time'], 'gap': monolithic['gap']}
+        if result['objective'] is not None and monolithic['objective']:
+            result['horizon_gap'] = (monolithic['objective'] - result['objective']) / abs(monolithic['objective'])
+    return result, solution
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Compact binary roster files (.roster): the (agent, day) uint8 shift codes of a roster
+(0 for rest, k for shift k, see roster_stats.roster_codes) and its part-time overlay
+(k on the days pinned on shift k, RA), after a JSON header holding the agents, the
+days, the configuration hash (solution_cache.config_key), the status and the objective.
+
+The arrays are stored raw after the header, at an aligned offset, so that a file is
+loaded with np.memmap without parsing: an archive of thousands of rosters can be
+scanned by reading only the headers and the pages of the arrays actually used.
+
+    python roster_file.py output/ --status Optimal
+"""
+
+import argparse
+import glob
+import json
+import os
+import struct
+import time
+import numpy as np
+
+
+ROSTER_EXTENSION = '.roster'
+MAGIC = b"NSPROSTR"
+VERSION = 1
+# Offset of the arrays in the file is a multiple of this
+ALIGNMENT = 64
+
+
+def roster_arrays(solution, I, J, K, nb_shifts):
+    """(codes, overlay) uint8 (agent, day) arrays of a solution (array or x dict)."""
+    from roster_stats import roster_codes, solution_array
+
+    solution = solution_array(solution, I, J, K)
+    codes, _ = roster_codes(solution, nb_shifts)
+    overlay, _ = roster_codes(solution[:, :, nb_shifts:2 * nb_shifts], nb_shifts)
+    return codes, overlay
+
+
+def roster_metadata(scheduler_name, config, result):
+    """Header entries of a solved roster: scheduler, configuration hash, status, objective and gap."""
+    from solution_cache import config_key
+
+    result = result or {}
+    return {
+        'scheduler': scheduler_name,
+        'config_key': config_key(scheduler_name, config),
+        'status': result.get('status'),
+        'objective': result.get('objective'),
+        'gap': result.get('gap'),
+    }
+
+
+def write_roster(path, solution, I, J, K, part_time_I, nb_shifts, metadata=None):
+    """Write a solution (array or x dict) to a .roster file; `metadata` entries go to the header."""
+    codes, overlay = roster_arrays(solution, I, J, K, nb_shifts)
+    header = {
+        'version': VERSION,
+        'shape': list(codes.shape),
+        'I': [int(i) for i in I],
+        'J': [int(j) for j in J],
+        'part_time_I': [int(i) for i in part_time_I],
+        'nb_shifts': nb_shifts,
+        'created': time.time(),
+        **(metadata or {}),
+    }
+    text = json.dumps(header, default=lambda val: val.item()).encode()
+    prefix = len(MAGIC) + 4
+    # Pad the header with spaces up to the aligned offset of the arrays
+    text += b" " * (-(prefix + len(text)) % ALIGNMENT)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(MAGIC + struct.pack('<I', len(text)) + text)
+        f.write(codes.tobytes())
+        f.write(overlay.tobytes())
+    return path
+
+
+def read_header(path):
+    """(header dict, offset of the arrays) of a .roster file, reading only the header."""
+    with open(path, 'rb') as f:
+        prefix = f.read(len(MAGIC) + 4)
+        if len(prefix) < len(MAGIC) + 4 or prefix[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a roster file")
+        length, = struct.unpack('<I', prefix[len(MAGIC):])
+        header = json.loads(f.read(length))
+    if header['version'] > VERSION:
+        raise ValueError(f"{path}: roster file version {header['version']} is not supported")
+    return header, len(prefix) + length
+
+
+class RosterFile:
+    """A .roster file: its header and its (agent, day) arrays, memory-mapped read-only."""
+
+    def __init__(self, path, header, data):
+        self.path = path
+        self.header = header
+        self.data = data
+
+    @classmethod
+    def open(cls, path):
+        """Memory-map a .roster file; only the header is read."""
+        header, offset = read_header(path)
+        data = np.memmap(path, dtype=np.uint8, mode='r', offset=offset, shape=(2, *header['shape']))
+        return cls(path, header, data)
+
+    @property
+    def codes(self):
+        """(agent, day) worked shift codes, 0 for rest."""
+        return self.data[0]
+
+    @property
+    def overlay(self):
+        """(agent, day) pinned part-time shift codes (RA), 0 on the other days."""
+        return self.data[1]
+
+    @property
+    def pinned(self):
+        return self.overlay > 0
+
+    def solution(self):
+        """Roster as an (agent, day, shift) 0/1 array, shifts 1..nb_shifts then their overlay."""
+        nb_shifts = self.header['nb_shifts']
+        solution = np.zeros((*self.header['shape'], 2 * nb_shifts), dtype=np.int8)
+        agents, days = np.nonzero(self.codes)
+        solution[agents, days, self.codes[agents, days] - 1] = 1
+        agents, days = np.nonzero(self.overlay)
+        solution[agents, days, nb_shifts + self.overlay[agents, days] - 1] = 1
+        return solution
+
+    def statistics(self):
+        """RosterStatistics of the roster."""
+        from roster_stats import RosterStatistics
+
+        return RosterStatistics(np.asarray(self.codes), np.asarray(self.pinned), self.header['I'], self.header['J'],
+                                self.header['part_time_I'], self.header['nb_shifts'])
+
+
+def load_roster(path):
+    """RosterFile of a .roster file (see RosterFile.open)."""
+    return RosterFile.open(path)
+
+
+def scan_rosters(paths):
+    """RosterFile of each .roster file among `paths` (files, or directories searched recursively)."""
+    for path in paths:
+        if os.path.isdir(path):
+            for found in sorted(glob.glob(os.path.join(path, '**', '*' + ROSTER_EXTENSION), recursive=True)):
+                yield RosterFile.open(found)
+        else:
+            yield RosterFile.open(path)
+
+
+def parse_args(argv=None):
+    """Parse the command line arguments."""
+    parser = argparse.ArgumentParser(description="List archived .roster files with their headline figures.")
+    parser.add_argument('paths', nargs='+', help=".roster files, or directories to search")
+    parser.add_argument('--status', help="Only list the rosters with this status, e.g. Optimal")
+    parser.add_argument('--config-key', help="Only list the rosters of this configuration hash (or its prefix)")
+    return parser.parse_args(argv)
+
+
+def main():
+    """Main function with command line interface."""
+    args = parse_args()
+    print(f"{'roster':<40}{'status':<12}{'objective':>10}{'agents':>8}{'days':>6}{'worked':>10}  config")
+    count = 0
+    for roster in scan_rosters(args.paths):
+        header = roster.header
+        if args.status and header.get('status') != args.status:
+            continue
+        if args.config_key and not (header.get('config_key') or '').startswith(args.config_key):
+            continue
+        # Worked days per agent, straight from the mapped codes (a week-end day counts once here)
+        worked = ((roster.codes > 0) & ~roster.pinned).sum(axis=1)
+        objective = '-' if header.get('objective') is None else f"{header['objective']:g}"
+        print(f"{os.path.relpath(roster.path):<40}{header.get('status') or '-':<12}{objective:>10}"
+              f"{roster.codes.shape[0]:>8}{roster.codes.shape[1]:>6}{f'{worked.min()}-{worked.max()}':>10}"
+              f"  {(header.get('config_key') or '-')[:12]}")
+        count += 1
+    print(f"{count} roster(s)")
+
+
+if __name__ == "__main__":
+    main()
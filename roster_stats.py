@@ -0,0 +1,160 @@
+"""
+Roster statistics: shift counts per agent, per calendar day and per shift, computed
+once with NumPy reductions from an integer-coded roster. The same object feeds the
+Excel export, the Streamlit metrics and JSON output.
+"""
+
+import json
+import numpy as np
+
+
+SHIFT_NAMES = {1: 'M', 2: 'S', 3: 'T'}
+DAY_NAMES = ['Lundi', 'Mardi', 'Mercredi', 'Jeudi', 'Vendredi', 'Samedi', 'Dimanche']
+
+
+def _value(var):
+    """Numeric value of a solution entry: a number or a PuLP variable/expression."""
+    val = var.value() if hasattr(var, 'value') else var
+    return 0 if val is None else val
+
+
+def solution_array(solution, I, J, K):
+    """Solution as a dense (agent, day, shift) 0/1 array, from an array or an x[i, j, k] dict."""
+    if isinstance(solution, dict):
+        solution = [[[_value(solution[i, j, k]) for k in K] for j in J] for i in I]
+    return np.rint(np.asarray(solution, dtype=float)).astype(np.int8).reshape(len(I), len(J), len(K))
+
+
+def roster_codes(solution, nb_shifts):
+    """Integer-coded roster from an (agent, day, shift) 0/1 array.
+
+    Returns the (agent, day) uint8 array of worked shifts (0 for rest, k for shift k)
+    and the (agent, day) boolean array of part-time pinned days (RA).
+    """
+    solution = np.asarray(solution)
+    work = solution[:, :, :nb_shifts]
+    pinned = solution[:, :, nb_shifts:2 * nb_shifts]
+    # C5 allows at most one shift per day; the last one wins as in the original export
+    codes = np.where(work.any(axis=2), nb_shifts - np.argmax(work[:, :, ::-1], axis=2), 0)
+    return codes.astype(np.uint8), pinned.any(axis=2)
+
+
+def calendar_days(J):
+    """Horizon day position of each calendar day: the week-end day is both Samedi and Dimanche."""
+    weekend = np.asarray(J) % 6 == 0
+    return np.repeat(np.arange(len(weekend)), np.where(weekend, 2, 1))
+
+
+class RosterStatistics:
+    """Coverage statistics of a roster, counted over calendar days (a week-end counts twice).
+
+    Pinned part-time days (RA) are counted neither as worked nor as rest days, as in the
+    totals of the Excel export.
+    """
+
+    def __init__(self, codes, pinned, I, J, part_time_I, nb_shifts):
+        self.codes = codes
+        self.pinned = pinned
+        self.I = list(I)
+        self.J = list(J)
+        self.part_time_I = list(part_time_I)
+        self.nb_shifts = nb_shifts
+        self.shift_names = [SHIFT_NAMES.get(k, str(k)) for k in range(1, nb_shifts + 1)]
+        self.calendar = calendar_days(self.J)
+
+        # -1 on pinned days so that they match neither a shift nor rest
+        counted = np.where(pinned, -1, codes.astype(np.int16))[:, self.calendar]
+        one_hot = counted[:, :, None] == np.arange(1, nb_shifts + 1)
+        self.agent_shifts = one_hot.sum(axis=1)            # (agent, shift)
+        self.agent_total = self.agent_shifts.sum(axis=1)
+        self.agent_rest = (counted == 0).sum(axis=1)
+        self.agent_pinned = pinned[:, self.calendar].sum(axis=1)
+        weekend = np.asarray(self.J) % 6 == 0
+        self.agent_weekends = ((codes > 0) & ~pinned)[:, weekend].sum(axis=1)
+        self.day_shifts = one_hot.sum(axis=0)              # (calendar day, shift)
+        self.day_total = self.day_shifts.sum(axis=1)
+        self.shift_totals = self.agent_shifts.sum(axis=0)
+
+    @classmethod
+    def from_solution(cls, solution, I, J, K, part_time_I, nb_shifts):
+        """Statistics of an (agent, day, shift) 0/1 array or an x[i, j, k] dict."""
+        codes, pinned = roster_codes(solution_array(solution, I, J, K), nb_shifts)
+        return cls(codes, pinned, I, J, part_time_I, nb_shifts)
+
+    @property
+    def agent_names(self):
+        return [f"Agent {i} (80%)" if i in self.part_time_I else f"Agent {i} (100%)" for i in self.I]
+
+    @property
+    def day_names(self):
+        """Calendar column names, e.g. 'Semaine_1 Lundi' ... 'Semaine_1 Dimanche'."""
+        days = np.asarray(self.J)[self.calendar]
+        sunday = np.diff(self.calendar, prepend=-1) == 0
+        position = (days - 1) % 6 + sunday
+        weeks = (days - 1) // 6 + 1
+        return [f"Semaine_{w} {DAY_NAMES[p]}" for w, p in zip(weeks, position)]
+
+    def labels(self):
+        """(agent, calendar day) grid of shift labels: 'M', 'S', 'T' or 'R', with ' (RA)' on pinned days."""
+        labels = np.array(['R'] + self.shift_names, dtype=object)
+        grid = labels[self.codes]
+        grid[self.pinned] += " (RA)"
+        return grid[:, self.calendar]
+
+    def to_dataframe(self):
+        """Roster table of the Excel export: labels, per-agent totals columns and per-day totals rows."""
+        import pandas as pd
+
+        nb_agents, nb_days = len(self.I), len(self.calendar)
+        total_columns = ['Total'] + [f'Total {s}' for s in self.shift_names] + ['Total R']
+        # The totals rows leave the totals columns at 0
+        table = np.zeros((nb_agents + 1 + self.nb_shifts, nb_days + len(total_columns)), dtype=object)
+        table[:nb_agents, :nb_days] = self.labels()
+        agent_totals = np.column_stack([self.agent_total, self.agent_shifts, self.agent_rest])
+        table[:nb_agents, nb_days:] = agent_totals.tolist()
+        day_totals = np.vstack([self.day_total, self.day_shifts.T])
+        table[nb_agents:, :nb_days] = day_totals.tolist()
+        index = self.agent_names + ['Total'] + [f'Total {s}' for s in self.shift_names]
+        return pd.DataFrame(table, index=index, columns=self.day_names + total_columns)
+
+    def summary(self):
+        """Headline figures: total shifts, and the spread of worked days and week-ends over full-time agents."""
+        full_time = np.array([i not in self.part_time_I for i in self.I])
+        if not full_time.any():
+            full_time[:] = True
+        worked = self.agent_total[full_time]
+        weekends = self.agent_weekends[full_time]
+        return {
+            'total_shifts': int(self.agent_total.sum()),
+            'shifts': dict(zip(self.shift_names, self.shift_totals.tolist())),
+            'min_worked_days': int(worked.min()),
+            'max_worked_days': int(worked.max()),
+            'min_weekends': int(weekends.min()),
+            'max_weekends': int(weekends.max()),
+        }
+
+    def to_dict(self):
+        """JSON-serializable statistics."""
+        return {
+            'summary': self.summary(),
+            'agents': [
+                {'agent': i, 'name': name, 'part_time': i in self.part_time_I,
+                 'worked': int(total), 'rest': int(rest), 'pinned': int(ra), 'weekends': int(weekends),
+                 'shifts': dict(zip(self.shift_names, shifts.tolist()))}
+                for i, name, total, rest, ra, weekends, shifts in zip(
+                    self.I, self.agent_names, self.agent_total, self.agent_rest, self.agent_pinned,
+                    self.agent_weekends, self.agent_shifts)
+            ],
+            'days': [
+                {'day': name, 'total': int(total), 'shifts': dict(zip(self.shift_names, shifts.tolist()))}
+                for name, total, shifts in zip(self.day_names, self.day_total, self.day_shifts)
+            ],
+        }
+
+    def to_json(self, path=None, indent=2):
+        """Statistics as a JSON string, also written to `path` when given."""
+        text = json.dumps(self.to_dict(), indent=indent, ensure_ascii=False)
+        if path is not None:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+        return text
@@ -1,15 +1,65 @@
 from abc import ABC, abstractmethod
-from pulp import LpMaximize, LpProblem, LpVariable, lpSum, LpBinary, LpStatus, value
-from excel_export import export_schedule
-from objectives import composite_objective
+from pulp import LpMaximize, LpProblem, LpVariable, LpAffineExpression, LpConstraint, LpBinary
+from constraints import (BASE_PATTERN_FAMILIES, PER_AGENT_FAMILIES, add_constraints, eager_families, format_stats,
+                         lazy_families)
+from instrumentation import Instrumentation
+from objectives import add_objective_terms, composite_objective, objective_options, stage_objective, weighted_objective
+from roster_stats import RosterStatistics, solution_array
+from solver_config import SOLVED_STATUSES, solve as solve_problem
+import numpy as np
 import os
+import time
+
+
+class _ReducedProblem:
+    """Wraps an LpProblem and drops rows made trivial or duplicated by the C12/C13 rotation."""
+    
+    def __init__(self, prob):
+        self.prob = prob
+        self.seen = set()
+        self.dropped = 0
+    
+    def __iadd__(self, other):
+        if isinstance(other, LpConstraint):
+            items = frozenset((var.name, coef) for var, coef in other.items() if coef != 0)
+            key = (items, other.sense, other.constant)
+            trivial = not items and (other.constant == 0 or other.sense * other.constant > 0)
+            if trivial or key in self.seen:
+                self.dropped += 1
+                return self
+            self.seen.add(key)
+        self.prob += other
+        return self
+    
+    @property
+    def constraints(self):
+        return self.prob.constraints
+
+
+class _BasePatternAgents:
+    """A scheduler seen with its first two agents only, for the per-agent families of the base pattern model.
+    
+    Agent i+1 is agent i shifted by 6 days, so a window of agent i is a window of agent 0,
+    or of agent 1 when it wraps around the end of the base pattern.
+    """
+    
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+        self.I = scheduler.I[:2]
+    
+    def __getattr__(self, name):
+        return getattr(self.scheduler, name)
 
 
 class ScheduleOptimizer(ABC):
     """Abstract base class for schedule optimization with fairness constraints."""
     
-    def __init__(self, config):
-        """Initialize with configuration parameters."""
+    def __init__(self, config, initial_assignment=None):
+        """Initialize with configuration parameters.
+        
+        `initial_assignment` is an optional (agent, day, shift) 0/1 array or {(i, j, k): 0/1}
+        dict fed to the solver as a MIP start (see set_initial_assignment).
+        """
         self.config = config
         self.I = config['I']
         self.J = config['J'] 
@@ -19,138 +69,641 @@ class ScheduleOptimizer(ABC):
         self.part_time_I = config['part_time_I']
         self.full_time_I = config['full_time_I']
         self.dest_file = config['dest_file']
+        self.solver_config = config.get('solver')
+        self.result = None
+        self.solution = None
+        self.statistics = None
+        self.constraint_stats = None
+        self.initial_assignment = None
+        self.roster_repair = None
+        # Expressions of the objective terms of config['objective'] (see set_objective)
+        self.objective_terms = None
+        # Solver progress callback and stop request (see solver_config.solve)
+        self.on_progress = config.get('progress')
+        self.stop_event = config.get('stop')
+        # Phase timers and counters of the runs (see instrumentation)
+        self.instrumentation = Instrumentation.from_config(config.get('instrumentation'),
+                                                           {'scheduler': type(self).__name__})
         
         # Derived values
         self.multiple_6 = [j for j in self.J if j % 6 == 0]
         self.not_multiple_6 = [j for j in self.J if j % 6 != 0]
+        
+        # MIP start, given directly or as config['warm_start'] ('greedy', .xlsx, .roster or .npy path)
+        if initial_assignment is None and config.get('warm_start'):
+            from warm_start import load_initial_assignment
+            initial_assignment = load_initial_assignment(self, config['warm_start'])
+        if initial_assignment is not None:
+            self.set_initial_assignment(initial_assignment)
     
     def create_variables(self):
         """Create decision variables for the optimization problem."""
         return {(i, j, k): LpVariable(f"x{i},{j},{k}", cat=LpBinary) 
                 for i in self.I for j in self.J for k in self.K}
     
-    def add_common_constraints(self, prob, x):
-        """Add constraints that are common to all agent types."""
-        
-        # C5: No more than one shift per day per agent
-        for j in self.J:
-            for i in self.I:
-                prob += lpSum(x[i, j, k] for k in self.K[:self.nb_shifts]) <= 1
-                
-                # C6: No morning shift after evening shift
-                if j < max(self.J):
-                    prob += x[i, j, 2] + x[i, j + 1, 1] <= 1
-        
-        # C7: Weekend alternation constraint
-        for i in self.I:
-            for j in range(1, self.nb_weeks):
-                prob += lpSum(x[i, j * 6, k] + x[i, (j + 1) * 6, k] 
-                             for k in self.K[:self.nb_shifts]) == 1
-        
-        # C8: No evening-rest-morning sequence
-        for i in self.I:
-            for j in range(2, len(self.J)):
-                prob += lpSum(x[i, j, k] - x[i, j-1, k] - x[i, j + 1, k] 
-                             for k in self.K[:self.nb_shifts]) <= 0
+    def rotated_day(self, i, j, agents=None):
+        """Day of the base pattern worked by agent i on day j (agent i+1 is agent i shifted by 6 days)."""
+        agents = self.I if agents is None else agents
+        return self.J[(self.J.index(j) - 6 * agents.index(i)) % len(self.J)]
+    
+    def create_base_pattern_variables(self):
+        """Create variables for the cyclic base pattern only and expand them into a full x view.
         
-        # C9: At least a day off per week
-        for i in self.I:
-            for j in range(1, len(self.J) - 5 + 1):
-                prob += lpSum(x[i, j + index, k] for k in self.K[:self.nb_shifts] 
-                             for index in range(5)) <= 4
+        C12 makes every agent a rotation of the first one, and C13 does the same for the
+        part-time overlay, so x[i, j, k] simply points to the base variable of the rotated day.
+        Overlay entries of full-time agents are the constant 0 (C14).
+        """
+        base = {(j, k): LpVariable(f"b{j},{k}", cat=LpBinary)
+                for j in self.J for k in self.K[:self.nb_shifts]}
+        overlay = {(j, k): LpVariable(f"p{j},{k}", cat=LpBinary)
+                   for j in self.J for k in self.K[self.nb_shifts:]} if len(self.part_time_I) else {}
         
-        # C10: Days off constraint for full-time agents
+        x = {}
         for i in self.I:
-            prob += (lpSum(x[i, j, k] * (1 + int(j % 6 == 0)) for j in self.J for k in self.K[:self.nb_shifts])
-                     <= len(self.not_multiple_6) + 2 * len(self.multiple_6) - (9 * (self.nb_weeks / 4)) + 1)
-        
-        # C11: No working day between two days off
-        for i in self.I:
-            for j in self.J[:-2]:
-                prob += lpSum(x[i, j + 1, k] for k in self.K[:self.nb_shifts]) - x[i, j, 2] - x[i, j + 2, 1] >= -1
-        
-        # C12: Strict cyclical constraints
-        for idx, i in enumerate(self.I[:-1]):
-            next_i = self.I[(idx + 1) % len(self.I)]
-            for j_idx, j in enumerate(self.J):
-                next_j = self.J[(j_idx + 6) % len(self.J)]
-                for k in self.K[:self.nb_shifts]:
-                    prob += (x[i, j, k] == x[next_i, next_j, k])
-        
-        # C13: Part-time day off cyclical constraints
-        for idx, i in enumerate(self.part_time_I[:-1]):
-            next_i = self.part_time_I[(idx + 1) % len(self.part_time_I)]
-            for j_idx, j in enumerate(self.J):
-                for k in self.K[self.nb_shifts:]:
-                    next_j = self.J[(j_idx + 6) % len(self.J)]
-                    prob += (x[i, j, k] == x[next_i, next_j, k])
-        
-        # C14: No part-time day off for full-time agents
-        for i in self.full_time_I:
-            prob += lpSum(x[i, j, k] for j in self.J for k in self.K[self.nb_shifts:]) == 0
-        
-        # C15: Part-time agent constraints
-        for i in self.part_time_I:
-            # One day pinned per week except for weekends
-            for s in range(0, self.nb_weeks):
-                week_days = self.J[s * 6: s * 6 + 5]
-                weekend_day = self.J[s * 6 + 5]
-                prob += lpSum(x[i, j, k] for j in week_days for k in self.K[self.nb_shifts:]) == 1
-                prob += lpSum(x[i, weekend_day, k] for k in self.K[self.nb_shifts:]) == 0
-            
-            # Day pinned must not be a day off
             for j in self.J:
                 for k in self.K[:self.nb_shifts]:
-                    prob += x[i, j, k + self.nb_shifts] - lpSum(x[i, j, k]) <= 0
+                    x[i, j, k] = base[self.rotated_day(i, j), k]
+                for k in self.K[self.nb_shifts:]:
+                    if i in self.part_time_I:
+                        x[i, j, k] = overlay[self.rotated_day(i, j, self.part_time_I), k]
+                    else:
+                        x[i, j, k] = LpAffineExpression()
+        return x
+    
+    def add_constraints(self, prob, x, base_pattern=False):
+        """Add the constraint families enabled in config['constraints'] (see constraints),
+        except the lazy ones (config['lazy']), added while solving (see solve_lazy).
         
-        # C17: No more than 3 consecutive days off
-        for i in self.I:
-            for j in self.J[:-3]:
-                prob += lpSum(x[i, j + index, k] for k in self.K[:self.nb_shifts] 
-                             for index in range(4)) >= 1
+        With `base_pattern` (x from create_base_pattern_variables), C12-C14 are left out and
+        the per-agent families are generated for the first two agents only (_BasePatternAgents).
+        The rows and build time of each family are kept in self.constraint_stats.
+        """
+        families = eager_families(self.config)
+        if not base_pattern:
+            self.constraint_stats = add_constraints(self, prob, x, families)
+        else:
+            families = [name for name in families if name not in BASE_PATTERN_FAMILIES]
+            stats = add_constraints(self, prob, x, [name for name in families if name not in PER_AGENT_FAMILIES])
+            stats.update(add_constraints(_BasePatternAgents(self), prob, x,
+                                         [name for name in families if name in PER_AGENT_FAMILIES]))
+            self.constraint_stats = {name: stats[name] for name in families}
+        for name, stats in self.constraint_stats.items():
+            self.instrumentation.add_time(name, stats['build_time'])
     
     @abstractmethod
-    def add_staffing_constraints(self, prob, x):
-        """Add agent-specific staffing constraints. Must be implemented by subclasses."""
+    def staffing_rules(self):
+        """Agent-specific staffing rules. Must be implemented by subclasses.
+        
+        Each rule is a tuple (day_type, shifts, sense, rhs, overlay): on every 'week' or
+        'weekend' day, the number of agents working one of `shifts` must satisfy `sense` `rhs`,
+        plus the number of part-time days pinned on that shift when `overlay` is set.
+        """
         pass
     
+    def staffing_days(self, day_type):
+        """Days of J matching a staffing rule day type."""
+        return [j for j in self.J if (j % 6 != 0) == (day_type == 'week')]
+    
     def build_model(self):
         """Build the complete optimization model."""
+        with self.instrumentation.phase('build'):
+            if self.config.get('base_pattern', False):
+                return self.build_base_pattern_model()
+            
+            prob = LpProblem("Schedule Optimization", LpMaximize)
+            with self.instrumentation.phase('variables'):
+                x = self.create_variables()
+            
+            # Set objective function
+            with self.instrumentation.phase('objective'):
+                self.set_objective(prob, x)
+            
+            # Add constraints
+            with self.instrumentation.phase('constraints'):
+                self.add_constraints(prob, x)
+        
+        return prob, x
+    
+    def build_base_pattern_model(self):
+        """Build the symmetry-reduced model over the cyclic base pattern.
+        
+        Constraints are generated on the expanded x view, so every agent's rows are expressed
+        on rotated base days: C12-C14 hold by construction and are not generated, the per-agent
+        families only for the first two agents, and the rows left identical are dropped.
+        """
         prob = LpProblem("Schedule Optimization", LpMaximize)
-        x = self.create_variables()
+        with self.instrumentation.phase('variables'):
+            x = self.create_base_pattern_variables()
         
         # Set objective function
-        composite_objective(prob, x, self.I, self.J, self.K, self.nb_shifts)
+        with self.instrumentation.phase('objective'):
+            self.set_objective(prob, x)
         
         # Add constraints
-        self.add_staffing_constraints(prob, x)
-        self.add_common_constraints(prob, x)
+        reduced = _ReducedProblem(prob)
+        with self.instrumentation.phase('constraints'):
+            self.add_constraints(reduced, x, base_pattern=True)
+        self.instrumentation.count('rows_dropped', reduced.dropped)
         
         return prob, x
     
+    def set_objective(self, prob, x):
+        """Set the objective of a PuLP problem: composite_objective, or the terms of
+        config['objective'] (see objectives.objective_options).
+        
+        In weighted mode the objective is their weighted sum; in lexicographic mode it is
+        the first term, the others being optimized in turn by solve_lexicographic.
+        """
+        if not self.config.get('objective'):
+            composite_objective(prob, x, self.I, self.J, self.K, self.nb_shifts)
+            return
+        mode, terms, _ = objective_options(self.config)
+        weights = dict(terms)
+        self.objective_terms = add_objective_terms(self, prob, x, weights)
+        prob.sense = LpMaximize
+        if mode == 'weighted':
+            prob.setObjective(weighted_objective(self.objective_terms, weights))
+        else:
+            name, weight = terms[0]
+            prob.setObjective(stage_objective(name, self.objective_terms[name], weight))
+    
+    def build_matrix_model(self):
+        """Build the same model as sparse matrices for HiGHS, bypassing PuLP (see matrix_model)."""
+        from matrix_model import build_matrix_model
+        return build_matrix_model(self)
+    
+    def set_initial_assignment(self, assignment):
+        """Set the MIP start: a previous solution, a roster read back from Excel or a greedy one.
+        
+        Accepts an (agent, day, shift) 0/1 array or a {(i, j, k): 0/1} dict; see warm_start
+        for helpers building one from an exported .xlsx file or a constructive heuristic.
+        """
+        if isinstance(assignment, dict):
+            array = np.zeros((len(self.I), len(self.J), len(self.K)), dtype=np.int8)
+            for a, i in enumerate(self.I):
+                for b, j in enumerate(self.J):
+                    for c, k in enumerate(self.K):
+                        array[a, b, c] = round(assignment.get((i, j, k)) or 0)
+            assignment = array
+        assignment = np.asarray(assignment, dtype=np.int8)
+        if assignment.shape != (len(self.I), len(self.J), len(self.K)):
+            raise ValueError(f"Initial assignment of shape {assignment.shape} does not match "
+                             f"{(len(self.I), len(self.J), len(self.K))} (agents, days, shifts)")
+        self.initial_assignment = assignment
+    
+    def apply_initial_assignment(self, x):
+        """Set the initial value of the model variables from the initial assignment."""
+        for a, i in enumerate(self.I):
+            for b, j in enumerate(self.J):
+                for c, k in enumerate(self.K):
+                    if isinstance(x[i, j, k], LpVariable):
+                        x[i, j, k].setInitialValue(int(self.initial_assignment[a, b, c]))
+    
+    def extract_solution(self, x):
+        """Values of x as an (agent, day, shift) 0/1 array."""
+        return solution_array(x, self.I, self.J, self.K)
+    
+    def solve(self, prob, x=None):
+        """Solve a built model with the configured solver and record the result.
+        
+        When an initial assignment is set and x is given, it is used as a MIP start.
+        With lazy families (config['lazy']) and x given, see solve_lazy.
+        """
+        lexicographic = self.objective_terms is not None and objective_options(self.config)[0] == 'lexicographic'
+        if x is not None and lexicographic:
+            return self.solve_lexicographic(prob, x)
+        if x is not None and lazy_families(self.config):
+            return self.solve_lazy(prob, x)
+        warm_start = self.initial_assignment is not None and x is not None
+        if warm_start:
+            self.apply_initial_assignment(x)
+        with self.instrumentation.phase('solve'):
+            self.result = solve_problem(prob, self.solver_config, warm_start, self.on_progress, self.stop_event)
+        if x is not None:
+            with self.instrumentation.phase('extract'):
+                self.solution = self.extract_solution(x) if self.result['status'] in SOLVED_STATUSES else None
+        self.record_terms()
+        self.diagnose_if_infeasible()
+        return self.result
+    
+    def solve_lexicographic(self, prob, x):
+        """Solve the terms of config['objective'] one after the other, in priority order.
+        
+        Each stage solves the same model: the term of the previous stage is bounded by
+        the optimum found (less the relative 'tolerance'), the objective is replaced by
+        the next term, and the solver starts from the previous solution (MIP start).
+        The result is the last stage's, with the status, objective and times of every
+        stage in 'stages'.
+        """
+        if lazy_families(self.config):
+            raise ValueError("The lexicographic objective mode does not support lazy families")
+        _, terms, tolerance = objective_options(self.config)
+        warm_start = self.initial_assignment is not None
+        if warm_start:
+            self.apply_initial_assignment(x)
+        stages, wall_time, solver_time = [], 0.0, 0.0
+        for stage, (name, weight) in enumerate(terms):
+            objective = stage_objective(name, self.objective_terms[name], weight)
+            if stage:
+                # Keep the previous term at its optimum, and start from its solution
+                previous = stages[-1]['objective']
+                prob += (prob.objective >= previous - tolerance * abs(previous) - 1e-6,
+                         f"lexicographic_{terms[stage - 1][0]}")
+                for var in prob.variables():
+                    # The solver's values are off the bounds by noise (-6.6e-14 on a binary): round
+                    # the integers, keep the continuous variables without checking their bounds
+                    var.setInitialValue(round(var.varValue) if var.isInteger() else var.varValue, check=False)
+                warm_start = True
+                prob.setObjective(objective)
+            print(f"Lexicographic stage {stage + 1}/{len(terms)}: {name}")
+            with self.instrumentation.phase('solve'):
+                self.result = solve_problem(prob, self.solver_config, warm_start, self.on_progress, self.stop_event)
+            if self.result['objective'] is not None:
+                # Drop the float noise of the sums of terms (363.0000000000002)
+                self.result['objective'] = round(self.result['objective'], 9)
+            wall_time += self.result['wall_time']
+            solver_time += self.result['solver_time'] or 0.0
+            stages.append({'term': name, 'status': self.result['status'], 'objective': self.result['objective'],
+                           'wall_time': self.result['wall_time']})
+            if self.result['objective'] is None or self.result.get('stopped'):
+                break
+        with self.instrumentation.phase('extract'):
+            self.solution = self.extract_solution(x) if self.result['status'] in SOLVED_STATUSES else None
+        self.result.update(wall_time=wall_time, solver_time=solver_time, stages=stages)
+        self.record_terms()
+        self.diagnose_if_infeasible()
+        return self.result
+    
+    def record_terms(self):
+        """Value of each objective term of config['objective'] in the result ('terms'), rounded
+        to 9 decimals like the objective."""
+        if self.objective_terms is None or self.result['objective'] is None:
+            return
+        self.result['objective'] = round(self.result['objective'], 9)
+        self.result['terms'] = {name: round(expression.value(), 9) for name, expression in self.objective_terms.items()}
+    
+    def solve_lazy(self, prob, x):
+        """Solve a model built without its lazy families, adding their rows round after round.
+        
+        Each round adds the rows of the lazy families violated by the solution (see
+        matrix_model.lazy_rows), and solves again from that solution (MIP start), until
+        none is violated: the solution is then optimal for the complete model, or only
+        Feasible when the round stopped on the time limit. The time limit applies to the
+        whole solve; when it runs out (or a stop is requested) while the incumbent breaks
+        lazy rows, the result is Not Solved. The result gives the number of rounds and of
+        rows added, and the times summed over the rounds.
+        """
+        from matrix_model import build_matrix_model, lazy_rows, pulp_constraints
+        from solver_config import merge_solver_config
+        
+        pool = build_matrix_model(self, lazy_families(self.config))
+        added = np.zeros(pool.num_row, dtype=bool)
+        columns = [x[i, j, k] for i in self.I for j in self.J for k in self.K]
+        # Rows repeated by the C12/C13 rotation in the base pattern model are added once
+        reduced = _ReducedProblem(prob)
+        nb_rows = len(prob.constraints)
+        time_limit = merge_solver_config(self.solver_config)['time_limit']
+        start_time = time.perf_counter()
+        rounds, wall_time, solver_time = 0, 0.0, 0.0
+        while True:
+            rounds += 1
+            solver_config = self.solver_config
+            if time_limit is not None:
+                solver_config = {**(solver_config or {}),
+                                 'time_limit': max(time_limit - (time.perf_counter() - start_time), 0.01)}
+            warm_start = self.initial_assignment is not None
+            if warm_start:
+                self.apply_initial_assignment(x)
+            with self.instrumentation.phase('solve'):
+                self.result = solve_problem(prob, solver_config, warm_start, self.on_progress, self.stop_event)
+            wall_time += self.result['wall_time']
+            solver_time += self.result['solver_time'] or 0.0
+            with self.instrumentation.phase('extract'):
+                self.solution = self.extract_solution(x) if self.result['status'] in SOLVED_STATUSES else None
+            if self.solution is None:
+                break
+            rows = lazy_rows(pool, self.solution, added)
+            if not len(rows):
+                break
+            if self.result.get('stopped') or (time_limit is not None
+                                               and time.perf_counter() - start_time >= time_limit):
+                # The incumbent breaks lazy rows and there is no time left to add them
+                self.result.update(status='Not Solved', objective=None, gap=None)
+                self.solution = None
+                break
+            added[rows] = True
+            with self.instrumentation.phase('lazy_rows'):
+                for constraint in pulp_constraints(pool, rows, columns):
+                    reduced += constraint
+            self.initial_assignment = self.solution
+        self.result.update(wall_time=wall_time, solver_time=solver_time, lazy_rounds=rounds,
+                           lazy_rows=len(prob.constraints) - nb_rows)
+        self.diagnose_if_infeasible()
+        return self.result
+    
+    def precheck(self):
+        """Check necessary capacity conditions before building the model (see feasibility).
+        
+        On failure, the result is set to Infeasible with the issues as its 'diagnosis'.
+        """
+        from feasibility import precheck, infeasible_result
+        issues = precheck(self)
+        if issues:
+            self.result = infeasible_result(self.solver_config, issues)
+            self.solution = None
+        return issues
+    
+    def diagnose_if_infeasible(self):
+        """With config['diagnose'], name the constraint families behind an Infeasible status."""
+        if self.result['status'] == 'Infeasible' and self.config.get('diagnose'):
+            from feasibility import diagnose
+            print("Diagnosing infeasibility...")
+            with self.instrumentation.phase('diagnose'):
+                self.result['diagnosis'] = diagnose(self, self.solver_config)
+    
+    def print_result(self):
+        """Print the solver status, objective, timings and gap of the last solve."""
+        result = self.result
+        print(f"Solve time: {result['wall_time']:.2f}s")
+        print("Solution status =", result['status'])
+        print("Solution value =", result['objective'])
+        if result['solver_time'] is not None:
+            print(f"Solver time ({result['solver']}): {result['solver_time']:.2f}s")
+        if result['gap'] is not None:
+            print(f"MIP gap: {result['gap']:.4%}")
+        if result.get('stopped'):
+            print("Stopped early at the current incumbent")
+        for stage in result.get('stages', []):
+            objective = '-' if stage['objective'] is None else f"{stage['objective']:g}"
+            print(f"Stage {stage['term']}: {stage['status']}, objective {objective} in {stage['wall_time']:.2f}s")
+        if result.get('terms'):
+            print("Objective terms:", ", ".join(f"{name} = {val:g}" for name, val in result['terms'].items()))
+        if result.get('lazy_rounds'):
+            print(f"Lazy rows added: {result['lazy_rows']} in {result['lazy_rounds']} rounds")
+        if result.get('windows'):
+            print(f"Rolling horizon: {result['windows']} windows, {result['repairs']} repairs")
+        if result.get('monolithic'):
+            print(f"Monolithic model: {result['monolithic']['status']}, objective {result['monolithic']['objective']}"
+                  f" in {result['monolithic']['wall_time']:.2f}s")
+        if result.get('horizon_gap') is not None:
+            print(f"Gap to the monolithic model: {result['horizon_gap']:.4%}")
+        if result.get('violations'):
+            print("Rows violated:", ", ".join(f"{family} {count}" for family, count in result['violations'].items()))
+        if result.get('diagnosis'):
+            from feasibility import format_issues
+            print("Infeasibility diagnosis:")
+            print(format_issues(result['diagnosis']))
+    
+    def repair(self, absences, roster=None, **options):
+        """Repair a roster (by default the last solution) after absences, a {agent: days} dict.
+        
+        Changes as few assignments as possible around the absences (see repair.RosterRepair,
+        options radius, change_weight and shortage_weight). The repair model is kept and reused by the next
+        calls on the same roster. Returns (result, solution), also kept as the last solution.
+        """
+        from repair import DEFAULT_OPTIONS, RosterRepair
+        
+        options = {**DEFAULT_OPTIONS, **options}
+        if roster is not None or self.roster_repair is None:
+            roster = self.solution if roster is None else roster
+            if roster is None:
+                raise ValueError("No roster to repair: solve first or pass a roster")
+            self.roster_repair = RosterRepair(self, roster, options['change_weight'], options['shortage_weight'])
+        self.result, solution = self.roster_repair.repair(absences, options['radius'])
+        if solution is not None:
+            self.solution = solution
+        return self.result, solution
+    
+    def cache_key(self):
+        """Key of this problem in the solution cache (see solution_cache.config_key)."""
+        from solution_cache import config_key
+        return config_key(type(self).__name__, self.config, composite_objective.__name__)
+    
     def solve_and_export(self):
-        """Solve the optimization problem and export results."""
+        """Solve the optimization problem and export results.
+        
+        With config['cache'] (True, a path or a SolutionCache), a problem already solved
+        is answered from the cache without building the model, and (None, None) is returned.
+        (None, None) is also returned when the pre-check proves the problem infeasible.
+        
+        The phases of the run are timed in self.instrumentation; with config['instrumentation']
+        (True, or the options of instrumentation.Instrumentation), they are printed at the end.
+        """
+        with self.instrumentation.run():
+            model, x = self._solve_and_export()
+            if self.result is not None:
+                self.count_result()
+        if self.config.get('instrumentation'):
+            self.print_instrumentation()
+        return model, x
+    
+    def _solve_and_export(self):
+        from solution_cache import get_cache
+        cache = get_cache(self.config.get('cache'))
+        if cache is not None:
+            key = self.cache_key()
+            hit = cache.get(key)
+            if hit is not None:
+                self.result, self.solution = hit
+                print("Cache hit:", key[:12])
+                self.print_result()
+                # An Infeasible hit has no roster: the last exported schedule is left as it is
+                if self.solution is not None:
+                    self.export(self.solution)
+                return None, None
+            print("Cache miss:", key[:12])
+        
+        if self.config.get('precheck', True):
+            with self.instrumentation.phase('precheck'):
+                issues = self.precheck()
+            if issues:
+                self.print_result()
+                return None, None
+        
+        if self.config.get('objective') and (self.config.get('rolling_horizon')
+                                             or self.config.get('builder', 'pulp') != 'pulp'):
+            raise ValueError("Objective terms (config['objective']) need the PuLP builder")
+        if self.config.get('rolling_horizon'):
+            model, x = self.solve_rolling_and_export()
+        elif self.config.get('builder', 'pulp') == 'matrix':
+            model, x = self.solve_matrix_and_export()
+        elif self.config.get('builder') == 'local_search':
+            model, x = self.solve_local_search_and_export()
+        else:
+            prob, x = self.solve_pulp_and_export()
+            model = prob
+        # Only proven outcomes are stored (see solution_cache.is_cacheable)
+        if cache is not None:
+            cache.put(key, type(self).__name__, self.result, self.solution)
+        return model, x
+    
+    def count_result(self):
+        """Set the counters of the last result: solve wall time, solver wall and CPU time, gap, objective."""
+        for name, key in (('solve_wall_time', 'wall_time'), ('solver_time', 'solver_time'),
+                          ('solver_cpu_time', 'cpu_time'), ('mip_gap', 'gap'), ('objective', 'objective')):
+            self.instrumentation.count(name, self.result.get(key))
+        self.instrumentation.count('status', self.result['status'])
+    
+    def print_instrumentation(self):
+        """Print the phase timings and counters of the last run, and its profile when enabled."""
+        print(self.instrumentation.format_report())
+        if self.instrumentation.profiler is not None:
+            print(self.instrumentation.profile_summary())
+            if isinstance(self.instrumentation.profile, str):
+                print("Profile written to", self.instrumentation.profile)
+    
+    def solve_pulp_and_export(self):
+        """Build the PuLP model, solve it and export results."""
+        start_time = time.perf_counter()
         prob, x = self.build_model()
+        build_time = time.perf_counter() - start_time
         
         # Print problem statistics
         print("Variables:", len(prob.variables()))
         print("Constraints:", len(prob.constraints))
         print("Total:", len(prob.variables()) + len(prob.constraints))
+        self.instrumentation.count('variables', len(prob.variables()))
+        self.instrumentation.count('constraints', len(prob.constraints))
+        print(f"Build time: {build_time:.2f}s")
+        print(format_stats(self.constraint_stats))
+        if lazy_families(self.config):
+            print("Lazy families:", ", ".join(lazy_families(self.config)))
         
         print("Solving...")
-        prob.solve()
+        self.solve(prob, x)
+        self.result['build_time'] = build_time
+        self.print_result()
+        
+        self.export(self.solution)
+        return prob, x
+    
+    def solve_matrix_and_export(self):
+        """Solve the matrix model with HiGHS and export results.
         
-        # Print results
-        print("Solution status =", LpStatus[prob.status])
-        print("Solution value =", value(prob.objective))
+        With config['base_pattern'], the model is restated on the columns of the cyclic base
+        pattern (see matrix_model.reduce_model) and the solution expanded back to every agent.
+        """
+        from matrix_model import (base_pattern_map, build_matrix_model, reduce_model, solve_matrix_model,
+                                  solve_matrix_model_lazy)
         
-        # Export to Excel
-        variable_names = [f"x{i},{j},{k}" for i in self.I for j in self.J for k in self.K]
-        values = [value(x[i, j, k]) for i in self.I for j in self.J for k in self.K]
+        lazy = lazy_families(self.config)
+        P = None
+        start = self.initial_assignment
+        with self.instrumentation.phase('build'):
+            model = build_matrix_model(self, eager_families(self.config))
+            family_stats = model.family_stats
+            for name, stats in family_stats.items():
+                self.instrumentation.add_time(name, stats['build_time'])
+            pool = build_matrix_model(self, lazy) if lazy else None
+            if self.config.get('base_pattern'):
+                P = base_pattern_map(self)
+                model = reduce_model(model, P)
+                pool = reduce_model(pool, P) if lazy else None
+                # Rows left per family once restated on the base pattern
+                family_stats = {name: dict(stats) for name, stats in family_stats.items()}
+                for name, stats in family_stats.items():
+                    first, last = model.families.get(name, (0, 0))
+                    stats['rows'] = last - first
+                if start is not None:
+                    start = P.T @ np.asarray(start, dtype=float).ravel() > 0
         
+        # Print problem statistics
+        print("Variables:", model.num_col)
+        print("Constraints:", model.num_row)
+        print("Total:", model.num_col + model.num_row)
+        self.instrumentation.count('variables', model.num_col)
+        self.instrumentation.count('constraints', model.num_row)
+        print(f"Build time: {model.build_time:.2f}s")
+        self.constraint_stats = family_stats
+        print(format_stats(self.constraint_stats))
+        if lazy:
+            print("Lazy families:", ", ".join(lazy))
+        
+        print("Solving...")
+        with self.instrumentation.phase('solve'):
+            if lazy:
+                self.result, solution = solve_matrix_model_lazy(model, pool, self.solver_config, start,
+                                                                self.on_progress, self.stop_event)
+            else:
+                self.result, solution = solve_matrix_model(model, solver_config=self.solver_config, start=start,
+                                                           progress=self.on_progress, stop=self.stop_event)
+        if solution is not None and P is not None:
+            solution = np.rint(P @ solution).astype(np.int8).reshape(len(self.I), len(self.J), len(self.K))
+        self.solution = solution
+        self.diagnose_if_infeasible()
+        self.print_result()
+        
+        x = {(i, j, k): int(solution[a, b, c]) if solution is not None else None
+             for a, i in enumerate(self.I) for b, j in enumerate(self.J) for c, k in enumerate(self.K)}
+        self.export(solution)
+        return model, x
+    
+    def solve_rolling_and_export(self):
+        """Solve the base pattern model window by window (see rolling_horizon) and export results.
+        
+        Options come from config['rolling_horizon'] (True for the defaults). No model is returned.
+        """
+        from rolling_horizon import rolling_horizon
+        
+        options = self.config['rolling_horizon']
+        print("Solving by rolling horizon...")
+        with self.instrumentation.phase('solve'):
+            self.result, self.solution = rolling_horizon(self, options if isinstance(options, dict) else None)
+        self.diagnose_if_infeasible()
+        self.print_result()
+        
+        x = {(i, j, k): int(self.solution[a, b, c]) if self.solution is not None else None
+             for a, i in enumerate(self.I) for b, j in enumerate(self.J) for c, k in enumerate(self.K)}
+        self.export(self.solution)
+        return None, x
+    
+    def solve_local_search_and_export(self):
+        """Search a roster without a solver (see local_search) and export the best one found.
+        
+        Options come from config['local_search']; the search starts from the initial
+        assignment when there is one. No model is returned.
+        """
+        from local_search import local_search
+        
+        print("Local search...")
+        with self.instrumentation.phase('solve'):
+            self.result, self.solution = local_search(self, self.config.get('local_search'),
+                                                      self.initial_assignment)
+        self.print_result()
+        print(f"Moves tried: {self.result['iterations']}")
+        
+        x = {(i, j, k): int(self.solution[a, b, c])
+             for a, i in enumerate(self.I) for b, j in enumerate(self.J) for c, k in enumerate(self.K)}
+        self.export(self.solution)
+        return None, x
+    
+    def export(self, solution):
+        """Export a solution (array or x dict) to the Excel schedule, and its statistics
+        to a JSON file next to it when config['export_stats'] is set.
+        
+        With config['export'] set to False, only the statistics are computed: openpyxl
+        is then never imported (solve-only runs, e.g. batch workers). With config['roster_file'],
+        the roster is also written to a binary .roster file (see roster_file).
+        Without a roster (None: the solve found no incumbent), nothing is written."""
+        if solution is None:
+            print("No roster to export")
+            self.statistics = None
+            return None
         os.makedirs("output", exist_ok=True)
         dest_path = os.path.join("output", self.dest_file)
-        export_schedule(values, variable_names, self.I, self.J, self.K, 
-                       self.part_time_I, self.nb_shifts, dest_path)
-        
-        return prob, x 
\ No newline at end of file
+        with self.instrumentation.phase('export'):
+            if self.config.get('export', True):
+                from excel_export import export_roster
+                self.statistics = export_roster(solution, self.I, self.J, self.K, 
+                                                self.part_time_I, self.nb_shifts, dest_path)
+            else:
+                self.statistics = RosterStatistics.from_solution(solution, self.I, self.J, self.K,
+                                                                 self.part_time_I, self.nb_shifts)
+            if self.config.get('export_stats'):
+                self.statistics.to_json(os.path.splitext(dest_path)[0] + ".json")
+            if self.config.get('roster_file'):
+                from roster_file import ROSTER_EXTENSION, roster_metadata, write_roster
+                write_roster(os.path.splitext(dest_path)[0] + ROSTER_EXTENSION, solution, self.I, self.J, self.K,
+                             self.part_time_I, self.nb_shifts,
+                             roster_metadata(type(self).__name__, self.config, self.result))
+        return self.statistics
\ No newline at end of file
@@ -0,0 +1,169 @@
+"""
+Persistent solution cache: solved rosters are stored in a SQLite file, keyed by a
+hash of the canonicalized scheduling configuration, the scheduler class and the
+objective, so that an identical problem is answered without solving it again.
+Least recently used entries are evicted beyond a size cap.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import zlib
+from contextlib import contextmanager
+import numpy as np
+
+
+DEFAULT_CACHE_PATH = os.environ.get(
+    'FAIRNESSNSP_CACHE', os.path.join(os.path.expanduser("~"), ".cache", "fairnessnsp", "solutions.sqlite"))
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Configuration entries that do not change the solution returned for a problem
+IGNORED_KEYS = {'dest_file', 'warm_start', 'export_stats', 'cache', 'precheck', 'lazy', 'instrumentation',
+                'progress', 'stop', 'export', 'roster_file'}
+IGNORED_SOLVER_KEYS = {'msg', 'threads'}
+
+# Proven outcomes, the only ones stored: an optimum (within the configured gaps), or infeasibility
+CACHED_STATUSES = ('Optimal', 'Infeasible')
+
+
+def _canonical(obj):
+    """JSON-compatible form of a config value: ranges and arrays become lists, dict keys are sorted."""
+    if isinstance(obj, dict):
+        return {str(key): _canonical(val) for key, val in sorted(obj.items(), key=lambda item: str(item[0]))}
+    if isinstance(obj, (list, tuple, range, np.ndarray)):
+        return [_canonical(val) for val in obj]
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, float) and obj.is_integer():
+        return int(obj)
+    return obj
+
+
+def config_key(scheduler_name, config, objective='composite_objective'):
+    """Hex SHA-256 of the canonical JSON of (scheduler class, objective, config)."""
+    config = {key: val for key, val in config.items() if key not in IGNORED_KEYS}
+    if config.get('solver'):
+        config['solver'] = {key: val for key, val in config['solver'].items() if key not in IGNORED_SOLVER_KEYS}
+    payload = json.dumps(_canonical({'scheduler': scheduler_name, 'objective': objective, 'config': config}),
+                         sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def is_cacheable(result):
+    """Whether a result is a proven outcome that can be stored: an Optimal or Infeasible
+    status from a solve that was not stopped. Incumbents of a time-limited or stopped solve
+    ('Feasible') and unsolved problems are solved again by the next identical request."""
+    return result.get('status') in CACHED_STATUSES and not result.get('stopped')
+
+
+def _pack(solution):
+    solution = np.asarray(solution, dtype=np.int8)
+    header = json.dumps(solution.shape).encode()
+    return header + b"\n" + zlib.compress(np.packbits(solution.ravel() != 0).tobytes())
+
+
+def _unpack(blob):
+    header, data = blob.split(b"\n", 1)
+    shape = tuple(json.loads(header))
+    bits = np.unpackbits(np.frombuffer(zlib.decompress(data), dtype=np.uint8), count=int(np.prod(shape)))
+    return bits.astype(np.int8).reshape(shape)
+
+
+class SolutionCache:
+    """SQLite-backed LRU cache of (result dict, solution array) entries.
+
+    The cache can be shared by several threads and processes: each call opens its own
+    connection. Hit and miss counts are kept in the file as well.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as db:
+            db.execute("""CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY, scheduler TEXT, status TEXT, result TEXT, solution BLOB,
+                size INTEGER, created REAL, last_access REAL)""")
+            db.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER)")
+
+    @contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def _count(self, db, name):
+        db.execute("INSERT INTO counters VALUES (?, 1) ON CONFLICT(name) DO UPDATE SET value = value + 1",
+                   (name,))
+
+    def get(self, key):
+        """(result dict, solution array or None) stored for a key, or None on a miss."""
+        with self._connect() as db:
+            row = db.execute(f"SELECT result, solution FROM entries WHERE key = ? AND status IN "
+                             f"({', '.join('?' * len(CACHED_STATUSES))})", (key, *CACHED_STATUSES)).fetchone()
+            if row is None:
+                self._count(db, 'misses')
+                return None
+            db.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._count(db, 'hits')
+        result = json.loads(row[0])
+        result['cached'] = True
+        return result, (_unpack(row[1]) if row[1] is not None else None)
+
+    def put(self, key, scheduler_name, result, solution):
+        """Store a result and its solution, then evict the least recently used entries beyond the size cap.
+
+        Only proven outcomes are stored (see is_cacheable), and the roster of an Optimal one
+        only: an Infeasible entry has no solution. Returns whether the result was stored.
+        """
+        if not is_cacheable(result):
+            return False
+        result = {name: val for name, val in result.items() if name not in ('dest_path', 'cached')}
+        blob = _pack(solution) if solution is not None and result['status'] == 'Optimal' else None
+        text = json.dumps(result, default=lambda val: val.item())
+        size = len(text) + (len(blob) if blob is not None else 0)
+        now = time.time()
+        with self._connect() as db:
+            db.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                       (key, scheduler_name, result.get('status'), text, blob, size, now, now))
+            self._evict(db)
+        return True
+
+    def _evict(self, db):
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in db.execute("SELECT key, size FROM entries ORDER BY last_access").fetchall():
+            db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._count(db, 'evictions')
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def stats(self):
+        """Number of entries, their total size in bytes, and the hit, miss and eviction counts."""
+        with self._connect() as db:
+            entries, size = db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+            counters = dict(db.execute("SELECT name, value FROM counters").fetchall())
+        return {'entries': entries, 'bytes': size, 'hits': counters.get('hits', 0),
+                'misses': counters.get('misses', 0), 'evictions': counters.get('evictions', 0)}
+
+    def clear(self):
+        """Remove every entry and reset the counters."""
+        with self._connect() as db:
+            db.execute("DELETE FROM entries")
+            db.execute("DELETE FROM counters")
+
+
+def get_cache(cache):
+    """SolutionCache from a config['cache'] value: True (default file), a path, or a SolutionCache."""
+    if not cache:
+        return None
+    if isinstance(cache, SolutionCache):
+        return cache
+    return SolutionCache(DEFAULT_CACHE_PATH if cache is True else cache)
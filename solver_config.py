@@ -0,0 +1,409 @@
+"""
+Solver configuration layer: picks the PuLP solver backend and its options
+(threads, time limit, gap tolerances, presolve) from the 'solver' entry of a
+scheduling configuration, and collects the solver's own timing and gap.
+
+A solve can also stream its progress (incumbent objective, bound, gap, nodes) to a
+callback and be stopped on request, keeping the best roster found so far: HiGHS
+reports through its MIP callbacks, CBC through its log, read while it runs.
+"""
+
+import os
+import re
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+from pulp import (PULP_CBC_CMD, HiGHS, LpMaximize, LpSolutionIntegerFeasible, LpSolutionOptimal, LpStatus,
+                  LpStatusOptimal, getSolver, listSolvers, value)
+
+
+DEFAULT_SOLVER_CONFIG = {
+    'name': 'CBC',        # CBC, HiGHS (in-process), HiGHS_DIRECT (in-process, in bulk), HiGHS_CMD, GUROBI, ...
+    'threads': None,      # None lets the solver decide
+    'time_limit': None,   # seconds
+    'gap_rel': None,      # relative MIP gap, e.g. 0.01 for 1%
+    'gap_abs': None,      # absolute MIP gap
+    'presolve': True,
+    'msg': True,
+}
+
+# Friendly names to PuLP solver class names
+SOLVER_ALIASES = {
+    'CBC': 'PULP_CBC_CMD',
+}
+
+# Statuses of a solve that found a roster (an incumbent)
+SOLVED_STATUSES = ('Optimal', 'Feasible')
+
+# Seconds between two progress events, new incumbents aside
+PROGRESS_INTERVAL = 0.5
+
+# CBC log lines: new incumbent (objective, nodes, seconds), and node log (nodes, incumbent, bound, seconds)
+CBC_INCUMBENT = re.compile(r"Cbc00(?:04|12)I Integer solution of (\S+) found .* and (\d+) nodes \(([\d.]+) seconds\)")
+CBC_NODES = re.compile(r"Cbc0010I After (\d+) nodes, \d+ on tree, (\S+) best solution, best possible (\S+) "
+                       r"\(([\d.]+) seconds\)")
+
+
+def progress_event(elapsed, objective, bound, nodes):
+    """Progress event dict of a MIP solve: elapsed seconds, incumbent objective and bound
+    (None until known, in the sense of the model), relative gap and explored nodes."""
+    gap = None
+    if objective is not None and bound is not None:
+        gap = abs(bound - objective) / max(abs(objective), 1e-9)
+    return {'time': elapsed, 'objective': objective, 'bound': bound, 'gap': gap, 'nodes': nodes}
+
+
+def highs_callback(progress=None, stop=None, sign=1):
+    """(callback, callback types) for Highs.setCallback/startCallback: report the progress
+    of a MIP to `progress`, and interrupt it once `stop` (a threading or multiprocessing
+    Event) is set and an incumbent exists. `sign` turns HiGHS' objective back into the
+    model's (-1 when a maximization was passed as a minimization)."""
+    import highspy
+
+    kinds = highspy.cb.HighsCallbackType
+    last = [-PROGRESS_INTERVAL]
+
+    def callback(callback_type, message, data_out, data_in, user_data):
+        found = abs(data_out.mip_primal_bound) < highspy.kHighsInf
+        improving = callback_type == kinds.kCallbackMipImprovingSolution
+        if progress is not None and (improving or data_out.running_time - last[0] >= PROGRESS_INTERVAL):
+            last[0] = data_out.running_time
+            bound = data_out.mip_dual_bound
+            progress(progress_event(data_out.running_time, sign * data_out.mip_primal_bound if found else None,
+                                    sign * bound if abs(bound) < highspy.kHighsInf else None,
+                                    int(data_out.mip_node_count)))
+        if stop is not None and found and not improving and stop.is_set():
+            data_in.user_interrupt = True
+
+    return callback, [kinds.kCallbackMipInterrupt, kinds.kCallbackMipImprovingSolution]
+
+
+def _interrupt_children():
+    """Send SIGINT to the child processes of this process (the CBC binary); False if none was found."""
+    try:
+        pids = subprocess.run(['pgrep', '-P', str(os.getpid())], capture_output=True, text=True).stdout.split()
+    except OSError:
+        return False
+    for pid in pids:
+        try:
+            os.kill(int(pid), signal.SIGINT)
+        except ProcessLookupError:
+            pass
+    return bool(pids)
+
+
+def _watch_cbc_output(terminal, log_path, sign, progress, stop, done):
+    """Thread copying the output of CBC to its log file while CBC runs: report its progress,
+    and interrupt CBC (which then returns its incumbent) once `stop` is set and an
+    incumbent exists. CBC writes to the pseudo-terminal `terminal`, so that its output is
+    line-buffered instead of arriving when it exits."""
+    import select
+
+    objective = bound = None
+    nodes, interrupted, pending = 0, False, ""
+    with open(log_path, 'w') as log:
+        while True:
+            ready, _, _ = select.select([terminal], [], [], 0.1)
+            chunk = ""
+            if ready:
+                try:
+                    chunk = os.read(terminal, 1 << 16).decode(errors='replace').replace("\r", "")
+                except OSError:
+                    # No writer left on the terminal
+                    time.sleep(0.1)
+            if not chunk:
+                if stop is not None and stop.is_set() and objective is not None and not interrupted:
+                    interrupted = _interrupt_children()
+                if done.is_set():
+                    break
+                continue
+            log.write(chunk)
+            lines = (pending + chunk).split("\n")
+            pending = lines.pop()
+            for line in lines:
+                incumbent = CBC_INCUMBENT.search(line)
+                node_log = CBC_NODES.search(line)
+                if incumbent:
+                    objective = sign * float(incumbent.group(1))
+                    nodes, elapsed = int(incumbent.group(2)), float(incumbent.group(3))
+                elif node_log:
+                    nodes, elapsed = int(node_log.group(1)), float(node_log.group(4))
+                    best, possible = float(node_log.group(2)), float(node_log.group(3))
+                    objective = sign * best if abs(best) < 1e49 else objective
+                    bound = sign * possible if abs(possible) < 1e49 else bound
+                else:
+                    continue
+                if progress is not None:
+                    progress(progress_event(elapsed, objective, bound, nodes))
+
+
+def _set_highs_start(lp):
+    """Pass the variables' initial values to the HiGHS model of a PuLP problem as a MIP start."""
+    import highspy
+
+    start = highspy.HighsSolution()
+    start.col_value = [var.varValue or 0.0 for var in lp.variables()]
+    start.value_valid = True
+    lp.solverModel.setSolution(start)
+
+
+class HiGHSWarmStart(HiGHS):
+    """PuLP's in-process HiGHS interface, passing the variables' initial values as a MIP start."""
+
+    def callSolver(self, lp):
+        _set_highs_start(lp)
+        super().callSolver(lp)
+
+
+class HiGHSDirect(HiGHS):
+    """In-process HiGHS passing the whole PuLP problem in a single passModel call.
+
+    PuLP's HiGHS interface adds the columns and rows one call at a time; here they are
+    gathered into CSR arrays in one pass over the constraints. The column values are
+    read back as one array (kept as lp.solution_values) and only assigned to the
+    variables, without the row slacks and duals.
+    """
+
+    def __init__(self, warm_start=False, **options):
+        super().__init__(**options)
+        self.warm_start = warm_start
+
+    def callSolver(self, lp):
+        if self.warm_start:
+            _set_highs_start(lp)
+        super().callSolver(lp)
+
+    def buildSolverModel(self, lp):
+        import highspy
+        import numpy as np
+        from pulp import LpInteger, LpMaximize
+
+        inf = highspy.kHighsInf
+        variables = lp.variables()
+        for index, var in enumerate(variables):
+            var.index = index
+        nb_col = len(variables)
+        obj_mult = -1 if lp.sense == LpMaximize else 1
+        starts, indices, values, row_lower, row_upper = [0], [], [], [], []
+        for index, constraint in enumerate(lp.constraints.values()):
+            constraint.index = index
+            for var, coef in constraint.items():
+                if coef != 0:
+                    indices.append(var.index)
+                    values.append(coef)
+            starts.append(len(indices))
+            lower, upper = constraint.getLb(), constraint.getUb()
+            row_lower.append(-inf if lower is None else lower)
+            row_upper.append(inf if upper is None else upper)
+
+        model = highspy.HighsLp()
+        model.num_col_ = nb_col
+        model.num_row_ = len(row_lower)
+        model.col_cost_ = np.array([obj_mult * lp.objective.get(var, 0.0) for var in variables])
+        model.col_lower_ = np.array([-inf if var.lowBound is None else var.lowBound for var in variables], dtype=float)
+        model.col_upper_ = np.array([inf if var.upBound is None else var.upBound for var in variables], dtype=float)
+        model.row_lower_ = np.array(row_lower, dtype=float)
+        model.row_upper_ = np.array(row_upper, dtype=float)
+        model.a_matrix_.format_ = highspy.MatrixFormat.kRowwise
+        model.a_matrix_.num_col_ = nb_col
+        model.a_matrix_.num_row_ = len(row_lower)
+        model.a_matrix_.start_ = np.array(starts, dtype=np.int32)
+        model.a_matrix_.index_ = np.array(indices, dtype=np.int32)
+        model.a_matrix_.value_ = np.array(values, dtype=float)
+        if self.mip:
+            model.integrality_ = [highspy.HighsVarType.kInteger if var.cat == LpInteger
+                                  else highspy.HighsVarType.kContinuous for var in variables]
+        lp.solverModel.passModel(model)
+        if self.callbackTuple:
+            lp.solverModel.setCallback(*self.callbackTuple)
+        for callback_type in self.callbacksToActivate or []:
+            lp.solverModel.startCallback(callback_type)
+
+    def findSolutionValues(self, lp):
+        import highspy
+        import numpy as np
+        from pulp import constants
+
+        status = lp.solverModel.getModelStatus()
+        has_solution = lp.solverModel.getInfo().primal_solution_status == 2
+        statuses = {
+            highspy.HighsModelStatus.kOptimal: constants.LpStatusOptimal,
+            highspy.HighsModelStatus.kInfeasible: constants.LpStatusInfeasible,
+            highspy.HighsModelStatus.kUnboundedOrInfeasible: constants.LpStatusInfeasible,
+            highspy.HighsModelStatus.kUnbounded: constants.LpStatusUnbounded,
+        }
+        # As in PuLP's interface, a limit reached with a solution reports Optimal (see solve_status)
+        lp_status = statuses.get(status, constants.LpStatusOptimal if has_solution else constants.LpStatusNotSolved)
+        lp.solution_values = np.asarray(lp.solverModel.getSolution().col_value) if has_solution else None
+        if lp.solution_values is not None:
+            for var, val in zip(lp.variables(), lp.solution_values.tolist()):
+                var.varValue = val
+        if status == highspy.HighsModelStatus.kOptimal:
+            return lp_status, constants.LpSolutionOptimal
+        return lp_status, constants.LpSolutionIntegerFeasible if has_solution else constants.LpSolutionNoSolutionFound
+
+
+def available_solvers():
+    """Names of the solvers installed on this machine, in the friendly form used by the config."""
+    reverse = {v: k for k, v in SOLVER_ALIASES.items()}
+    names = [reverse.get(name, name) for name in listSolvers(onlyAvailable=True)]
+    return names + ['HiGHS_DIRECT'] if 'HiGHS' in names else names
+
+
+def merge_solver_config(solver_config=None):
+    """Complete a (possibly partial) solver configuration with the defaults."""
+    return {**DEFAULT_SOLVER_CONFIG, **(solver_config or {})}
+
+
+def get_solver(solver_config=None, warm_start=False):
+    """Create the PuLP solver object described by a solver configuration.
+
+    With `warm_start`, the initial values of the variables (see LpVariable.setInitialValue)
+    are passed to the solver as a MIP start when the backend supports it.
+    """
+    solver_config = merge_solver_config(solver_config)
+    name = SOLVER_ALIASES.get(solver_config['name'], solver_config['name'])
+    options = {'msg': solver_config['msg']}
+    if solver_config['threads'] is not None:
+        options['threads'] = int(solver_config['threads'])
+    if solver_config['time_limit'] is not None:
+        options['timeLimit'] = float(solver_config['time_limit'])
+    if solver_config['gap_rel'] is not None:
+        options['gapRel'] = float(solver_config['gap_rel'])
+    if solver_config['gap_abs'] is not None:
+        options['gapAbs'] = float(solver_config['gap_abs'])
+    if name == 'PULP_CBC_CMD':
+        options['presolve'] = bool(solver_config['presolve'])
+    elif name in ('HiGHS', 'HiGHS_DIRECT'):
+        options['presolve'] = 'on' if solver_config['presolve'] else 'off'
+    if name == 'HiGHS_DIRECT':
+        return HiGHSDirect(warm_start, **options)
+    if warm_start and name == 'HiGHS':
+        return HiGHSWarmStart(**options)
+    if warm_start:
+        try:
+            return getSolver(name, warmStart=True, **options)
+        except TypeError:
+            print(f"Solver {solver_config['name']} does not support warm starts, solving from scratch")
+    return getSolver(name, **options)
+
+
+def highs_options(solver_config=None):
+    """HiGHS option values equivalent to a solver configuration (for direct highspy use)."""
+    solver_config = merge_solver_config(solver_config)
+    options = {
+        'output_flag': bool(solver_config['msg']),
+        'presolve': 'on' if solver_config['presolve'] else 'off',
+    }
+    if solver_config['threads'] is not None:
+        options['threads'] = int(solver_config['threads'])
+    if solver_config['time_limit'] is not None:
+        options['time_limit'] = float(solver_config['time_limit'])
+    if solver_config['gap_rel'] is not None:
+        options['mip_rel_gap'] = float(solver_config['gap_rel'])
+    if solver_config['gap_abs'] is not None:
+        options['mip_abs_gap'] = float(solver_config['gap_abs'])
+    return options
+
+
+def _parse_cbc_log(log_path):
+    """Extract the gap and the solver's own timings from a CBC log file."""
+    with open(log_path) as f:
+        log = f.read()
+    info = {'log': log}
+    gap = re.search(r"^Gap:\s+([-\d.eE+]+)", log, re.MULTILINE)
+    if gap:
+        info['gap'] = abs(float(gap.group(1)))
+    elif "Result - Optimal solution found" in log:
+        info['gap'] = 0.0
+    times = re.search(r"Total time \(CPU seconds\):\s+([\d.]+)\s+\(Wallclock seconds\):\s+([\d.]+)", log)
+    if times:
+        info['cpu_time'] = float(times.group(1))
+        info['solver_time'] = float(times.group(2))
+    return info
+
+
+def solve_status(prob):
+    """Status of a solved PuLP problem: 'Optimal' only for a proven optimum (within the
+    configured gaps), 'Feasible' when the solver stopped on a limit or a stop request with
+    an incumbent, 'Not Solved' when it stopped without one.
+
+    PuLP reports Optimal in both stopped cases, the solution status telling them apart."""
+    if prob.status != LpStatusOptimal or prob.sol_status == LpSolutionOptimal:
+        return LpStatus[prob.status]
+    return 'Feasible' if prob.sol_status == LpSolutionIntegerFeasible else 'Not Solved'
+
+
+def solve(prob, solver_config=None, warm_start=False, progress=None, stop=None):
+    """Solve a PuLP problem with the configured solver and return a result dict.
+
+    The result holds the status (see solve_status), the objective value, the wall-clock
+    time of the call, and the solver's own time, CPU time and relative MIP gap when the
+    backend reports them. Without an incumbent, the objective and the gap are None.
+
+    `progress` is called with a progress_event dict as the solve goes (HiGHS and CBC).
+    Once `stop` (a threading or multiprocessing Event) is set, the solver stops at its
+    current incumbent, and the result is marked 'stopped'; stopping CBC needs `pgrep`.
+    """
+    solver_config = merge_solver_config(solver_config)
+    solver = get_solver(solver_config, warm_start)
+    sign = -1 if prob.sense == LpMaximize else 1
+    if isinstance(solver, HiGHS) and (progress is not None or stop is not None):
+        callback, solver.callbacksToActivate = highs_callback(progress, stop, sign)
+        solver.callbackTuple = (callback, None)
+
+    # CBC only reports its gap and timings in its log, so route it to a file
+    log_path = None
+    if isinstance(solver, PULP_CBC_CMD) and solver.optionsDict.get('logPath') is None:
+        fd, log_path = tempfile.mkstemp(suffix='.log')
+        os.close(fd)
+        solver.optionsDict['logPath'] = log_path
+        solver.msg = False
+
+    watcher = None
+    if log_path is not None and (progress is not None or stop is not None) and os.name == 'posix':
+        import pty
+        terminal, terminal_slave = pty.openpty()
+        solver.optionsDict['logPath'] = os.ttyname(terminal_slave)
+        done = threading.Event()
+        watcher = threading.Thread(target=_watch_cbc_output, args=(terminal, log_path, sign, progress, stop, done),
+                                   daemon=True)
+        watcher.start()
+    start_time = time.perf_counter()
+    try:
+        prob.solve(solver)
+    finally:
+        if watcher is not None:
+            done.set()
+            watcher.join()
+            os.close(terminal_slave)
+            os.close(terminal)
+    wall_time = time.perf_counter() - start_time
+
+    result = {
+        'solver': solver_config['name'],
+        'status': solve_status(prob),
+        'objective': value(prob.objective),
+        'wall_time': wall_time,
+        'solver_time': prob.solutionTime,
+        'cpu_time': prob.solutionCpuTime,
+        'gap': None,
+    }
+    if log_path is not None:
+        info = _parse_cbc_log(log_path)
+        os.remove(log_path)
+        log = info.pop('log')
+        if solver_config['msg']:
+            print(log)
+        result.update(info)
+    elif isinstance(solver, HiGHS):
+        result['gap'] = prob.solverModel.getInfo().mip_gap
+        result['solver_time'] = prob.solverModel.getRunTime()
+    if result['status'] not in SOLVED_STATUSES:
+        # The values left in the variables are not a roster (e.g. the LP relaxation)
+        result.update(objective=None, gap=None)
+    if stop is not None and stop.is_set():
+        result['stopped'] = True
+    return result
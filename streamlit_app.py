@@ -8,9 +8,16 @@ import pandas as pd
 import os
 import tempfile
 from pathlib import Path
-from nurse_scheduler import NurseScheduler
-from caregiver_scheduler import CaregiverScheduler
-from config_manager import get_nurse_config, get_caregiver_config
+from config_manager import get_nurse_config, get_caregiver_config, get_solver_config
+from solver_config import SOLVED_STATUSES, available_solvers
+from jobs import JobManager, QueueFullError, QUEUED, RUNNING, DONE, FAILED, FINISHED
+from solution_cache import SolutionCache, DEFAULT_CACHE_PATH
+
+
+# Solve jobs shared by all the sessions of the server
+MAX_WORKERS = int(os.environ.get('FAIRNESSNSP_MAX_WORKERS', 2))
+MAX_QUEUED_JOBS = int(os.environ.get('FAIRNESSNSP_MAX_QUEUED_JOBS', 8))
+CACHE_MAX_MB = int(os.environ.get('FAIRNESSNSP_CACHE_MAX_MB', 64))
 
 
 # Language translations
@@ -65,7 +72,57 @@ TRANSLATIONS = {
         'help_evening_weekend': 'Minimum nurses required for evening shift on weekends',
         'help_day_weekend': 'Minimum nurses required for day shift on weekends',
         'help_caregivers': 'Total number of caregivers (full-time + part-time)',
-        'help_part_time_caregivers': 'Number of caregivers working part-time (80% workload)'
+        'help_part_time_caregivers': 'Number of caregivers working part-time (80% workload)',
+        'solver_settings': '⚙️ Solver Settings',
+        'solver': 'Solver',
+        'threads': 'Threads',
+        'time_limit': 'Time Limit (s, 0 = none)',
+        'gap_rel': 'Relative MIP Gap (%)',
+        'gap_abs': 'Absolute MIP Gap',
+        'presolve': 'Presolve',
+        'base_pattern': 'Symmetry-reduced model',
+        'help_solver': 'Installed solver backend used for the optimization',
+        'help_threads': 'Number of CPU threads the solver may use',
+        'help_time_limit': 'Stop the solver after this many seconds and keep the best schedule found',
+        'help_gap_rel': 'Stop when the best schedule is proven within this percentage of the optimum',
+        'help_gap_abs': 'Stop when the best schedule is proven within this absolute value of the optimum',
+        'help_base_pattern': 'Build the model over the cyclic base pattern only (same schedules, much smaller model)',
+        'warm_start': 'Warm start from last schedule',
+        'help_warm_start': 'Start the solver (or the quick preview) from the last schedule generated with the same number of agents and weeks',
+        'quick_preview': '⚡ Quick preview (local search)',
+        'help_quick_preview': 'Search a schedule in a few seconds without the solver: it is not proven optimal and may break some constraints',
+        'search_time': 'Search Time (s)',
+        'help_search_time': 'Time given to the local search of the quick preview',
+        'preview_violations': 'This preview breaks some constraints ({rows}): run the solver for a valid schedule.',
+        'solver_time': 'Solver Time',
+        'mip_gap': 'MIP Gap',
+        'total_shifts': 'Total Shifts',
+        'worked_days': 'Worked Days (full-time)',
+        'weekends_worked': 'Week-ends Worked (full-time)',
+        'roster_statistics': '📊 Roster Statistics',
+        'download_statistics': '📥 Download Statistics (JSON)',
+        'job_queued': '⏳ Job {job_id} is queued (position {position})',
+        'job_running': '⚙️ Job {job_id} is running ({elapsed:.0f}s)',
+        'job_cancelled': 'Job {job_id} was cancelled.',
+        'cancel_job': '✖ Cancel',
+        'accept_incumbent': '✔ Accept current schedule',
+        'help_accept_incumbent': 'Stop the solver and export the best schedule found so far',
+        'incumbent': 'Best Schedule',
+        'bound': 'Bound',
+        'nodes': 'Nodes',
+        'stopped_early': 'Solver stopped early: this schedule may not be optimal (see the MIP gap).',
+        'no_valid_schedule': '⚠️ No valid schedule found (status: {status}). Try a longer time limit.',
+        'queue_full': 'The server is busy ({limit} jobs waiting or running). Please try again later.',
+        'solution_cache': '🗄️ Solution Cache',
+        'cache_hits': 'Hits',
+        'cache_misses': 'Misses',
+        'cache_entries': '{entries} schedules stored ({size:.1f} MB)',
+        'from_cache': '(from cache)',
+        'run_profile': '⏱️ Run Profile',
+        'phase': 'Phase',
+        'wall_time': 'Wall Time (s)',
+        'cpu_time': 'CPU Time (s)',
+        'infeasible': '❌ No schedule satisfies all the constraints with these parameters.'
     },
     'fr': {
         'title': '🏥 FairnessNSP - Planification du Personnel Hospitalier',
@@ -117,7 +174,57 @@ TRANSLATIONS = {
         'help_evening_weekend': 'Nombre minimum d\'infirmiers requis pour l\'équipe du soir le weekend',
         'help_day_weekend': 'Nombre minimum d\'infirmiers requis pour l\'équipe de jour le weekend',
         'help_caregivers': 'Nombre total d\'aides-soignants (temps plein + temps partiel)',
-        'help_part_time_caregivers': 'Nombre d\'aides-soignants travaillant à temps partiel (80% de charge)'
+        'help_part_time_caregivers': 'Nombre d\'aides-soignants travaillant à temps partiel (80% de charge)',
+        'solver_settings': '⚙️ Paramètres du Solveur',
+        'solver': 'Solveur',
+        'threads': 'Threads',
+        'time_limit': 'Limite de Temps (s, 0 = aucune)',
+        'gap_rel': 'Écart MIP Relatif (%)',
+        'gap_abs': 'Écart MIP Absolu',
+        'presolve': 'Présolve',
+        'base_pattern': 'Modèle réduit par symétrie',
+        'help_solver': 'Solveur installé utilisé pour l\'optimisation',
+        'help_threads': 'Nombre de threads CPU utilisables par le solveur',
+        'help_time_limit': 'Arrêter le solveur après ce nombre de secondes et garder le meilleur planning trouvé',
+        'help_gap_rel': 'Arrêter lorsque le meilleur planning est prouvé à ce pourcentage de l\'optimum',
+        'help_gap_abs': 'Arrêter lorsque le meilleur planning est prouvé à cette valeur absolue de l\'optimum',
+        'help_base_pattern': 'Construire le modèle sur le motif cyclique de base uniquement (mêmes plannings, modèle bien plus petit)',
+        'warm_start': 'Démarrer depuis le dernier planning',
+        'help_warm_start': 'Démarrer le solveur (ou l\'aperçu rapide) depuis le dernier planning généré avec le même nombre d\'agents et de semaines',
+        'quick_preview': '⚡ Aperçu rapide (recherche locale)',
+        'help_quick_preview': 'Chercher un planning en quelques secondes sans le solveur : il n\'est pas prouvé optimal et peut enfreindre des contraintes',
+        'search_time': 'Temps de Recherche (s)',
+        'help_search_time': 'Temps accordé à la recherche locale de l\'aperçu rapide',
+        'preview_violations': 'Cet aperçu enfreint des contraintes ({rows}) : lancez le solveur pour un planning valide.',
+        'solver_time': 'Temps Solveur',
+        'mip_gap': 'Écart MIP',
+        'total_shifts': 'Total des Équipes',
+        'worked_days': 'Jours Travaillés (temps plein)',
+        'weekends_worked': 'Week-ends Travaillés (temps plein)',
+        'roster_statistics': '📊 Statistiques du Planning',
+        'download_statistics': '📥 Télécharger les Statistiques (JSON)',
+        'job_queued': '⏳ La tâche {job_id} est en attente (position {position})',
+        'job_running': '⚙️ La tâche {job_id} est en cours ({elapsed:.0f}s)',
+        'job_cancelled': 'La tâche {job_id} a été annulée.',
+        'cancel_job': '✖ Annuler',
+        'accept_incumbent': '✔ Accepter le planning actuel',
+        'help_accept_incumbent': 'Arrêter le solveur et exporter le meilleur planning trouvé jusqu\'ici',
+        'incumbent': 'Meilleur Planning',
+        'bound': 'Borne',
+        'nodes': 'Nœuds',
+        'stopped_early': 'Solveur arrêté avant la fin : ce planning peut ne pas être optimal (voir l\'écart MIP).',
+        'no_valid_schedule': '⚠️ Aucun planning valide trouvé (statut : {status}). Essayez une limite de temps plus longue.',
+        'queue_full': 'Le serveur est occupé ({limit} tâches en attente ou en cours). Veuillez réessayer plus tard.',
+        'solution_cache': '🗄️ Cache des Solutions',
+        'cache_hits': 'Succès',
+        'cache_misses': 'Échecs',
+        'cache_entries': '{entries} plannings enregistrés ({size:.1f} Mo)',
+        'from_cache': '(depuis le cache)',
+        'run_profile': '⏱️ Profil d\'Exécution',
+        'phase': 'Phase',
+        'wall_time': 'Temps Réel (s)',
+        'cpu_time': 'Temps CPU (s)',
+        'infeasible': '❌ Aucun planning ne respecte toutes les contraintes avec ces paramètres.'
     }
 }
 
@@ -128,6 +235,91 @@ def get_text(key):
     return TRANSLATIONS[lang].get(key, key)
 
 
+def solver_settings_form():
+    """Sidebar form for the solver configuration shared by both tabs."""
+    with st.sidebar.expander(get_text('solver_settings'), expanded=False):
+        solvers = available_solvers()
+        st.session_state.solver_name = st.selectbox(
+            get_text('solver'),
+            solvers,
+            index=solvers.index('CBC') if 'CBC' in solvers else 0,
+            help=get_text('help_solver')
+        )
+        st.session_state.solver_threads = st.number_input(
+            get_text('threads'),
+            min_value=1,
+            max_value=os.cpu_count() or 1,
+            value=1,
+            help=get_text('help_threads')
+        )
+        st.session_state.solver_time_limit = st.number_input(
+            get_text('time_limit'),
+            min_value=0,
+            value=0,
+            help=get_text('help_time_limit')
+        )
+        st.session_state.solver_gap_rel = st.number_input(
+            get_text('gap_rel'),
+            min_value=0.0,
+            max_value=100.0,
+            value=0.0,
+            help=get_text('help_gap_rel')
+        )
+        st.session_state.solver_gap_abs = st.number_input(
+            get_text('gap_abs'),
+            min_value=0.0,
+            value=0.0,
+            help=get_text('help_gap_abs')
+        )
+        st.session_state.solver_presolve = st.checkbox(get_text('presolve'), value=True)
+        st.session_state.base_pattern = st.checkbox(
+            get_text('base_pattern'),
+            value=False,
+            help=get_text('help_base_pattern')
+        )
+        st.session_state.warm_start = st.checkbox(
+            get_text('warm_start'),
+            value=True,
+            help=get_text('help_warm_start')
+        )
+        st.session_state.quick_preview = st.checkbox(
+            get_text('quick_preview'),
+            value=False,
+            help=get_text('help_quick_preview')
+        )
+        st.session_state.search_time = st.number_input(
+            get_text('search_time'),
+            min_value=0.1,
+            value=1.0,
+            step=0.5,
+            disabled=not st.session_state.quick_preview,
+            help=get_text('help_search_time')
+        )
+
+
+def create_solver_config_from_form():
+    """Create solver configuration from the sidebar inputs."""
+    return get_solver_config(
+        name=st.session_state.solver_name,
+        threads=st.session_state.solver_threads,
+        time_limit=st.session_state.solver_time_limit or None,
+        gap_rel=st.session_state.solver_gap_rel / 100 or None,
+        gap_abs=st.session_state.solver_gap_abs or None,
+        presolve=st.session_state.solver_presolve,
+        msg=False
+    )
+
+
+def create_builder_options_from_form():
+    """Builder options from the sidebar: the local search for a quick preview, the solver otherwise."""
+    if not st.session_state.quick_preview:
+        return {}
+    return {
+        'builder': 'local_search',
+        'local_search': {'time_limit': st.session_state.search_time}
+    }
+
+
 def create_nurse_config_from_form():
     """Create nurse configuration from form inputs."""
     return {
@@ -149,7 +341,12 @@ def create_nurse_config_from_form():
             st.session_state.evening_weekend,
             st.session_state.day_weekend
         ],
-        'dest_file': "nurses_schedule.xlsx"
+        'dest_file': "nurses_schedule.xlsx",
+        'solver': create_solver_config_from_form(),
+        'base_pattern': st.session_state.base_pattern,
+        'diagnose': True,
+        'instrumentation': True,
+        **create_builder_options_from_form()
     }
 
 
@@ -164,46 +361,217 @@ def create_caregiver_config_from_form():
         'part_time_I': range(1, st.session_state.nb_part_time_agents + 1),
         'full_time_I': [i for i in range(1, st.session_state.nb_agents + 1) 
                        if i > st.session_state.nb_part_time_agents],
-        'dest_file': "caregivers_schedule.xlsx"
+        'staffing_rules': get_caregiver_config()['staffing_rules'],
+        'dest_file': "caregivers_schedule.xlsx",
+        'solver': create_solver_config_from_form(),
+        'base_pattern': st.session_state.base_pattern,
+        'diagnose': True,
+        'instrumentation': True,
+        **create_builder_options_from_form()
     }
 
 
-def run_scheduler(agent_type):
-    """Run the scheduler for the specified agent type."""
+@st.cache_resource
+def get_job_manager():
+    """Job manager shared by all the sessions of this server."""
+    cache = SolutionCache(DEFAULT_CACHE_PATH, max_bytes=CACHE_MAX_MB * 1024 * 1024) if CACHE_MAX_MB > 0 else None
+    return JobManager(max_workers=MAX_WORKERS, max_queued=MAX_QUEUED_JOBS, cache=cache)
+
+
+def cache_stats_sidebar():
+    """Hit and miss counts of the solution cache, in the sidebar."""
+    cache = get_job_manager().cache
+    if cache is None:
+        return
+    stats = cache.stats()
+    with st.sidebar.expander(get_text('solution_cache'), expanded=False):
+        col1, col2 = st.columns(2)
+        col1.metric(get_text('cache_hits'), stats['hits'])
+        col2.metric(get_text('cache_misses'), stats['misses'])
+        st.caption(get_text('cache_entries').format(entries=stats['entries'], size=stats['bytes'] / 2 ** 20))
+
+
+def current_job(agent_type):
+    """The last job submitted by this session for the agent type, if any."""
+    job_id = st.session_state.setdefault('jobs', {}).get(agent_type)
+    return get_job_manager().get(job_id) if job_id is not None else None
+
+
+def submit_scheduler(agent_type):
+    """Submit a background solve job for the specified agent type."""
+    if agent_type == "Nurses":
+        config, kind = create_nurse_config_from_form(), 'nurse'
+    else:  # Caregivers
+        config, kind = create_caregiver_config_from_form(), 'caregiver'
+    
+    # Create a temporary file for the output
+    with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp_file:
+        config['dest_file'] = tmp_file.name
+    
+    # Warm start from the last schedule (the worker ignores it if the shape changed)
+    last_solution = None
+    if st.session_state.warm_start:
+        last_solution = st.session_state.setdefault('last_solutions', {}).get(agent_type)
+    
+    manager = get_job_manager()
     try:
-        if agent_type == "Nurses":
-            config = create_nurse_config_from_form()
-            scheduler = NurseScheduler(config)
-        else:  # Caregivers
-            config = create_caregiver_config_from_form()
-            scheduler = CaregiverScheduler(config)
-        
-        # Create a temporary file for the output
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp_file:
-            config['dest_file'] = tmp_file.name
-        
-        # Run the scheduler
-        prob, x = scheduler.build_model()
-        
-        # Solve
-        prob.solve()
-        
-        # Export
-        variable_names = [f"x{i},{j},{k}" for i in config['I'] for j in config['J'] for k in config['K']]
-        values = [x[i, j, k].value() for i in config['I'] for j in config['J'] for k in config['K']]
-        
-        os.makedirs("output", exist_ok=True)
-        dest_path = os.path.join("output", config['dest_file'])
-        
-        from excel_export import export_schedule
-        export_schedule(values, variable_names, config['I'], config['J'], config['K'], 
-                       config['part_time_I'], config['nb_shifts'], dest_path)
-        
-        return dest_path, prob.status, prob.objective.value()
+        job_id = manager.submit(kind, config, last_solution)
+    except QueueFullError:
+        st.warning(get_text('queue_full').format(limit=manager.max_queued))
+        return
+    previous = st.session_state['jobs'].get(agent_type)
+    if previous is not None:
+        manager.forget(previous)
+    st.session_state['jobs'][agent_type] = job_id
+
+
+@st.fragment(run_every=1)
+def show_job_progress(agent_type):
+    """Status of a queued or running job, refreshed every second without blocking the page."""
+    job = current_job(agent_type)
+    if job is None or job.status in FINISHED:
+        # Render the outcome with the rest of the page
+        st.rerun()
+    if job.status == QUEUED:
+        st.info(get_text('job_queued').format(job_id=job.id, position=job.queue_position or 1))
+    else:
+        st.info(get_text('job_running').format(job_id=job.id, elapsed=job.elapsed))
+        show_solver_progress(job.progress)
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button(get_text('cancel_job'), key=f"cancel_{agent_type}"):
+            get_job_manager().cancel(job.id)
+            st.rerun()
+    with col2:
+        has_incumbent = any(event['objective'] is not None for event in job.progress)
+        if st.button(get_text('accept_incumbent'), key=f"accept_{agent_type}", disabled=not has_incumbent,
+                     help=get_text('help_accept_incumbent')):
+            get_job_manager().accept(job.id)
+
+
+def show_solver_progress(progress):
+    """Latest incumbent, bound, gap and node count of a running solve, with their chart over time."""
+    if not progress:
+        return
+    latest = progress[-1]
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric(get_text('incumbent'), "-" if latest['objective'] is None else f"{latest['objective']:.1f}")
+    with col2:
+        st.metric(get_text('bound'), "-" if latest['bound'] is None else f"{latest['bound']:.1f}")
+    with col3:
+        st.metric(get_text('mip_gap'), "-" if latest['gap'] is None else f"{latest['gap']:.2%}")
+    with col4:
+        st.metric(get_text('nodes'), "-" if latest['nodes'] is None else latest['nodes'])
+    chart = pd.DataFrame([
+        {'time': event['time'], get_text('incumbent'): event['objective'], get_text('bound'): event['bound']}
+        for event in progress
+    ]).set_index('time')
+    st.line_chart(chart)
+
+
+def show_job(agent_type, file_name, success_key, download_key):
+    """Progress of the current job of the tab, or its outcome once finished."""
+    job = current_job(agent_type)
+    if job is None:
+        return
+    if job.status in (QUEUED, RUNNING):
+        show_job_progress(agent_type)
+    elif job.status == DONE:
+        result = job.result
+        solved = result['status'] in SOLVED_STATUSES
+        if solved:
+            st.session_state.setdefault('last_solutions', {})[agent_type] = job.solution
+            st.success(get_text(success_key) + (" " + get_text('from_cache') if result.get('cached') else ""))
+            if result.get('stopped'):
+                st.warning(get_text('stopped_early'))
+        elif result['status'] != 'Infeasible':
+            # Infeasible is explained by show_diagnosis
+            st.warning(get_text('no_valid_schedule').format(status=result['status']))
+        if result.get('violations'):
+            rows = ", ".join(f"{family}: {count}" for family, count in result['violations'].items())
+            st.warning(get_text('preview_violations').format(rows=rows))
+        show_result_metrics(result, file_name)
+        show_diagnosis(result)
+        if job.statistics is not None:
+            show_roster_statistics(job.statistics, file_name)
+        show_run_profile(job.instrumentation)
         
-    except Exception as e:
-        st.error(f"Error during scheduling: {str(e)}")
-        return None, None, None
+        # Download button, for a valid roster only
+        if solved and result.get('dest_path'):
+            with open(result['dest_path'], "rb") as file:
+                st.download_button(
+                    label=get_text(download_key),
+                    data=file.read(),
+                    file_name=file_name,
+                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                )
+    elif job.status == FAILED:
+        st.error(get_text('failed_generate'))
+        st.error(f"Error during scheduling: {job.error.strip().splitlines()[-1]}")
+    else:
+        st.warning(get_text('job_cancelled').format(job_id=job.id))
+
+
+def show_result_metrics(result, file_name):
+    """Display the status, objective, solver timing and gap of a solve."""
+    col1, col2, col3, col4, col5 = st.columns(5)
+    with col1:
+        st.metric(get_text('status'), result['status'])
+    with col2:
+        st.metric(get_text('objective_value'), "-" if result['objective'] is None else f"{result['objective']:.1f}")
+    with col3:
+        st.metric(get_text('solver_time'), "-" if result['solver_time'] is None else f"{result['solver_time']:.2f}s")
+    with col4:
+        st.metric(get_text('mip_gap'), "-" if result['gap'] is None else f"{result['gap']:.2%}")
+    with col5:
+        st.metric(get_text('output_file'), file_name if result.get('dest_path') else "-")
+
+
+def show_diagnosis(result):
+    """Explain an Infeasible status with the constraint families found by the pre-check or the diagnosis."""
+    if result['status'] != 'Infeasible':
+        return
+    st.error(get_text('infeasible'))
+    for issue in result.get('diagnosis') or []:
+        st.markdown(f"- **{issue['families']}**: {issue['message']}")
+
+
+def show_roster_statistics(statistics, file_name):
+    """Display the coverage statistics of the roster, with a JSON download."""
+    summary = statistics.summary()
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric(get_text('total_shifts'), summary['total_shifts'])
+    with col2:
+        st.metric(get_text('worked_days'), f"{summary['min_worked_days']} - {summary['max_worked_days']}")
+    with col3:
+        st.metric(get_text('weekends_worked'), f"{summary['min_weekends']} - {summary['max_weekends']}")
+    
+    with st.expander(get_text('roster_statistics')):
+        agents = pd.DataFrame(statistics.to_dict()['agents']).set_index('name')
+        shifts = pd.DataFrame(agents.pop('shifts').tolist(), index=agents.index)
+        st.dataframe(pd.concat([agents.drop(columns=['agent', 'part_time']), shifts], axis=1))
+        st.download_button(
+            label=get_text('download_statistics'),
+            data=statistics.to_json(),
+            file_name=file_name.replace('.xlsx', '.json'),
+            mime="application/json"
+        )
+
+
+def show_run_profile(report):
+    """Wall and CPU time of each phase of the run that produced the roster (none from the cache)."""
+    if not report:
+        return
+    with st.expander(get_text('run_profile')):
+        phases = pd.DataFrame([
+            {get_text('phase'): name, get_text('wall_time'): record['wall_time'],
+             get_text('cpu_time'): record['cpu_time']}
+            for name, record in report['phases'].items()
+        ]).set_index(get_text('phase'))
+        st.dataframe(phases.round(3))
+        st.json(report['counters'], expanded=False)
 
 
 def main():
@@ -230,6 +598,8 @@ def main():
             st.rerun()
     
     st.markdown(get_text('description'))
+    solver_settings_form()
+    cache_stats_sidebar()
     
     # Initialize session state
     if 'nb_agents' not in st.session_state:
@@ -336,32 +706,11 @@ def main():
             )
         
         # Run button
-        if st.button(get_text('generate_nurse'), type="primary"):
-            with st.spinner(get_text('optimizing_nurse')):
-                output_path, status, objective = run_scheduler("Nurses")
-                
-                if output_path and os.path.exists(output_path):
-                    st.success(get_text('success_nurse'))
-                    
-                    # Display results
-                    col1, col2, col3 = st.columns(3)
-                    with col1:
-                        st.metric(get_text('status'), status)
-                    with col2:
-                        st.metric(get_text('objective_value'), f"{objective:.1f}")
-                    with col3:
-                        st.metric(get_text('output_file'), "nurses_schedule.xlsx")
-                    
-                    # Download button
-                    with open(output_path, "rb") as file:
-                        st.download_button(
-                            label=get_text('download_nurse'),
-                            data=file.read(),
-                            file_name="nurses_schedule.xlsx",
-                            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                        )
-                else:
-                    st.error(get_text('failed_generate'))
+        job = current_job("Nurses")
+        busy = job is not None and job.status in (QUEUED, RUNNING)
+        if st.button(get_text('generate_nurse'), type="primary", disabled=busy):
+            submit_scheduler("Nurses")
+        show_job("Nurses", "nurses_schedule.xlsx", 'success_nurse', 'download_nurse')
     
     with tab2:
         st.header(get_text('caregiver_header'))
@@ -411,32 +760,11 @@ def main():
             st.info(get_text('caregiver_info'))
         
         # Run button
-        if st.button(get_text('generate_caregiver'), type="primary"):
-            with st.spinner(get_text('optimizing_caregiver')):
-                output_path, status, objective = run_scheduler("Caregivers")
-                
-                if output_path and os.path.exists(output_path):
-                    st.success(get_text('success_caregiver'))
-                    
-                    # Display results
-                    col1, col2, col3 = st.columns(3)
-                    with col1:
-                        st.metric(get_text('status'), status)
-                    with col2:
-                        st.metric(get_text('objective_value'), f"{objective:.1f}")
-                    with col3:
-                        st.metric(get_text('output_file'), "caregivers_schedule.xlsx")
-                    
-                    # Download button
-                    with open(output_path, "rb") as file:
-                        st.download_button(
-                            label=get_text('download_caregiver'),
-                            data=file.read(),
-                            file_name="caregivers_schedule.xlsx",
-                            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                        )
-                else:
-                    st.error(get_text('failed_generate'))
+        job = current_job("Caregivers")
+        busy = job is not None and job.status in (QUEUED, RUNNING)
+        if st.button(get_text('generate_caregiver'), type="primary", disabled=busy):
+            submit_scheduler("Caregivers")
+        show_job("Caregivers", "caregivers_schedule.xlsx", 'success_caregiver', 'download_caregiver')
     
     # Footer
     st.markdown("---")
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Parameter sweep for staffing what-if analysis: solves the schedule for every
+combination of headcount, part-time headcount, horizon and staffing levels over a
+process pool, and collects the outcomes in one table.
+
+Dominated points are not solved: once a headcount is feasible, larger headcounts with
+the same other parameters are skipped, and once staffing levels are infeasible,
+higher staffing levels with the same headcount and horizon are skipped (nurses only,
+whose staffing rules are all lower bounds). With several workers, a dominated point may
+already be running when the point dominating it is settled: it is solved anyway, and
+flagged like the skipped ones in the dominated_by column.
+"""
+
+import argparse
+import itertools
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+
+AGENT_TYPES = ('nurse', 'caregiver')
+COLUMNS = ['nb_agents', 'nb_part_time_agents', 'nb_weeks', 'staffing_week', 'staffing_weekend',
+           'status', 'objective', 'solve_time', 'gap', 'dominated_by']
+SKIPPED = 'Skipped'
+# Statuses proving a point feasible ('Feasible': a roster found within a time limit, or by the local search)
+FEASIBLE = ('Optimal', 'Feasible')
+
+
+def sweep_points(agent_type, nb_agents, nb_part_time_agents, nb_weeks, staffing_week=(None,),
+                 staffing_weekend=(None,)):
+    """Every combination of the given values, as dicts of resize_config arguments.
+
+    Staffing levels are tuples (one level per shift), None keeping those of the
+    configuration. Combinations with more part-time agents than agents are left out.
+    """
+    if agent_type == 'caregiver' and any(v is not None for v in (*staffing_week, *staffing_weekend)):
+        raise ValueError("Caregiver staffing rules are not configurable, sweep nurses instead")
+    points = []
+    for n, p, w, week, weekend in itertools.product(nb_agents, nb_part_time_agents, nb_weeks,
+                                                    staffing_week, staffing_weekend):
+        if p <= n:
+            points.append({'nb_agents': n, 'nb_part_time_agents': p, 'nb_weeks': w,
+                           'staffing_week': None if week is None else tuple(week),
+                           'staffing_weekend': None if weekend is None else tuple(weekend)})
+    return points
+
+
+def point_config(agent_type, point, solver=None, **options):
+    """Scheduling configuration of a sweep point."""
+    from config_manager import get_caregiver_config, get_nurse_config, resize_config
+
+    base = get_nurse_config(solver, **options) if agent_type == 'nurse' else get_caregiver_config(solver, **options)
+    return resize_config(base, **point)
+
+
+def _limit_threads(threads):
+    # Keep the numerical libraries of each worker within its share of the cores
+    for name in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+        os.environ[name] = str(threads)
+
+
+def solve_point(agent_type, config):
+    """Worker: pre-check, build and solve one configuration, without exporting it.
+
+    Returns the status, objective, solve time and gap.
+    """
+    from jobs import make_scheduler
+
+    start_time = time.perf_counter()
+    scheduler = make_scheduler(agent_type, config)
+    if not scheduler.precheck():
+        if config.get('builder', 'pulp') == 'matrix':
+            from matrix_model import base_pattern_map, reduce_model, solve_matrix_model
+            model = scheduler.build_matrix_model()
+            if config.get('base_pattern'):
+                model = reduce_model(model, base_pattern_map(scheduler))
+            scheduler.result, _ = solve_matrix_model(model, solver_config=scheduler.solver_config)
+        elif config.get('builder') == 'local_search':
+            from local_search import local_search
+            scheduler.result, _ = local_search(scheduler, config.get('local_search'))
+        else:
+            prob, x = scheduler.build_model()
+            scheduler.solve(prob)
+    result = scheduler.result
+    solved = result['status'] in FEASIBLE
+    return {'status': result['status'], 'objective': result['objective'] if solved else None,
+            'solve_time': time.perf_counter() - start_time, 'gap': result['gap'] if solved else None}
+
+
+def _group(point):
+    """Points of a group only differ by their headcount."""
+    return tuple((key, val) for key, val in point.items() if key != 'nb_agents')
+
+
+def _dominates(infeasible, point):
+    """Whether an infeasible point proves `point` infeasible: same headcounts and horizon,
+    and staffing levels at least as high on every shift."""
+    if any(infeasible[key] != point[key] for key in ('nb_agents', 'nb_part_time_agents', 'nb_weeks')):
+        return False
+    for key in ('staffing_week', 'staffing_weekend'):
+        if infeasible[key] != point[key] and (
+                infeasible[key] is None or point[key] is None
+                or any(a > b for a, b in zip(infeasible[key], point[key]))):
+            return False
+    return True
+
+
+def _dominating(points, rows, index):
+    """Index of a solved point settling points[index]: a feasible one with fewer agents in
+    its group, or an infeasible one dominating it. None if there is none."""
+    for other, row in enumerate(rows):
+        if other == index:
+            continue
+        if (row['status'] in FEASIBLE and _group(points[other]) == _group(points[index])
+                and points[other]['nb_agents'] < points[index]['nb_agents']):
+            return other
+        if row['status'] == 'Infeasible' and _dominates(points[other], points[index]):
+            return other
+    return None
+
+
+def _label(point):
+    return ", ".join(f"{key}={val}" for key, val in point.items() if val is not None)
+
+
+def run_sweep(agent_type, points, solver=None, workers=None, threads=None, prune=True, **options):
+    """Solve the sweep points over a pool of `workers` processes and return the result table.
+
+    The solver of each worker gets `threads` // `workers` threads (`threads` defaults to
+    the number of cores). With `prune`, dominated points are skipped (see the module
+    docstring). Returns a DataFrame with one row per point, in the order of `points`; the
+    dominated points have the point settling them in 'dominated_by', whether they were
+    skipped or already running.
+    """
+    import pandas as pd
+
+    workers = workers or min(len(points), os.cpu_count() or 1) or 1
+    worker_threads = max(1, (threads or os.cpu_count() or 1) // workers)
+    solver = {**(solver or {}), 'threads': worker_threads, 'msg': False}
+
+    rows = [{**point, 'status': None, 'objective': None, 'solve_time': None, 'gap': None,
+             'dominated_by': None} for point in points]
+    # Groups are solved by increasing headcount, so that a feasible one prunes the larger ones
+    groups = {}
+    for index in sorted(range(len(points)), key=lambda index: points[index]['nb_agents']):
+        groups.setdefault(_group(points[index]), []).append(index)
+    infeasible = []
+    running = {}
+
+    def skip(index, by):
+        rows[index]['status'] = SKIPPED
+        rows[index]['dominated_by'] = _label(points[by])
+
+    def next_point():
+        # The group with the fewest points in progress goes first
+        busy = {key: 0 for key in groups}
+        for index in running.values():
+            busy[_group(points[index])] += 1
+        for key in sorted(groups, key=busy.get):
+            while groups[key]:
+                index = groups[key].pop(0)
+                by = next((other for other in infeasible if _dominates(points[other], points[index])), None)
+                if prune and by is not None:
+                    skip(index, by)
+                    continue
+                return index
+        return None
+
+    with ProcessPoolExecutor(workers, initializer=_limit_threads, initargs=(worker_threads,),
+                             mp_context=multiprocessing.get_context('spawn')) as pool:
+        while True:
+            while len(running) < workers:
+                index = next_point()
+                if index is None:
+                    break
+                config = point_config(agent_type, points[index], solver, **options)
+                running[pool.submit(solve_point, agent_type, config)] = index
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = running.pop(future)
+                rows[index].update(future.result())
+                print(f"{_label(points[index])}: {rows[index]['status']} ({rows[index]['solve_time']:.1f}s)")
+                if not prune:
+                    continue
+                if rows[index]['status'] == 'Infeasible':
+                    infeasible.append(index)
+                elif rows[index]['status'] in FEASIBLE:
+                    # Larger headcounts are dominated, including those already in progress
+                    group = groups[_group(points[index])]
+                    for other in group:
+                        skip(other, index)
+                    group.clear()
+                    for other_future, other in running.items():
+                        if (_group(points[other]) == _group(points[index])
+                                and points[other]['nb_agents'] > points[index]['nb_agents']
+                                and other_future.cancel()):
+                            skip(other, index)
+                    running = {f: i for f, i in running.items() if not f.cancelled()}
+    if prune:
+        # Points already running when they were settled could not be cancelled
+        for index, row in enumerate(rows):
+            if row['status'] != SKIPPED:
+                by = _dominating(points, rows, index)
+                if by is not None:
+                    row['dominated_by'] = _label(points[by])
+    return pd.DataFrame(rows, columns=COLUMNS)
+
+
+def minimum_headcount(table):
+    """Smallest feasible headcount for each combination of the other sweep parameters."""
+    feasible = table[table['status'].isin(FEASIBLE)]
+    keys = COLUMNS[1:5]
+    return (feasible.assign(**{key: feasible[key].map(str) for key in keys[2:]})
+            .groupby(keys)['nb_agents'].min().reset_index())
+
+
+def parse_values(text):
+    """Integer values from '9,10,12', a range '9-14' or a stepped range '8-16:2'."""
+    values = []
+    for part in text.split(','):
+        span, _, step = part.partition(':')
+        first, _, last = span.partition('-')
+        values.extend(range(int(first), int(last or first) + 1, int(step or 1)))
+    return values
+
+
+def parse_levels(text):
+    """Staffing levels per shift, e.g. '3,2,1'."""
+    return tuple(int(level) for level in text.split(','))
+
+
+def parse_args(argv=None):
+    """Parse the command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Solve the schedule over ranges of headcounts, horizons and staffing levels.",
+        epilog="Example: sweep.py nurse --agents 8-14 --part-time 1-3 --weeks 12,26 --week 3,2,1 --week 4,2,1"
+    )
+    parser.add_argument('agent_type', choices=AGENT_TYPES, help="Agents to schedule")
+    parser.add_argument('--agents', type=parse_values, required=True, help="Headcounts, e.g. 8-14")
+    parser.add_argument('--part-time', type=parse_values, help="Part-time headcounts (default: parameter file)")
+    parser.add_argument('--weeks', type=parse_values, help="Horizons in weeks, e.g. 12,26 (default: parameter file)")
+    parser.add_argument('--week', type=parse_levels, action='append',
+                        help="Week-day staffing levels per shift, e.g. 3,2,1 (repeatable, nurses only)")
+    parser.add_argument('--weekend', type=parse_levels, action='append',
+                        help="Week-end staffing levels per shift, e.g. 3,2,0 (repeatable, nurses only)")
+    parser.add_argument('--workers', type=int, help="Number of worker processes (default: number of cores)")
+    parser.add_argument('--threads', type=int, help="Solver threads shared by the workers (default: number of cores)")
+    parser.add_argument('--solver', dest='name', help="Solver backend, e.g. CBC or HiGHS (default: CBC)")
+    parser.add_argument('--time-limit', type=float, help="Solver time limit in seconds, per point")
+    parser.add_argument('--base-pattern', action='store_true', help="Use the symmetry-reduced base pattern model")
+    parser.add_argument('--no-prune', dest='prune', action='store_false', help="Solve the dominated points too")
+    parser.add_argument('--out', default=os.path.join("output", "sweep.csv"),
+                        help="Result table, .csv or .xlsx (default: output/sweep.csv)")
+    return parser.parse_args(argv)
+
+
+def main():
+    """Main function with command line interface."""
+    from config_manager import get_caregiver_config, get_nurse_config
+
+    args = parse_args()
+    config = get_nurse_config() if args.agent_type == 'nurse' else get_caregiver_config()
+    points = sweep_points(args.agent_type, args.agents,
+                          args.part_time or [len(config['part_time_I'])],
+                          args.weeks or [config['nb_weeks']],
+                          args.week or [None], args.weekend or [None])
+    solver = {key: val for key, val in (('name', args.name), ('time_limit', args.time_limit)) if val is not None}
+    print(f"Sweeping {len(points)} points")
+    table = run_sweep(args.agent_type, points, solver, workers=args.workers, threads=args.threads,
+                      prune=args.prune, base_pattern=args.base_pattern)
+    print(table.to_string(index=False))
+    print("\nMinimum headcount:")
+    print(minimum_headcount(table).to_string(index=False))
+
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    if args.out.endswith('.xlsx'):
+        table.to_excel(args.out, index=False)
+    else:
+        table.to_csv(args.out, index=False)
+    print(f"Results written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+import pytest
+from config_manager import get_caregiver_config, get_nurse_config
+from jobs import make_scheduler
+from scheduler_core import _ReducedProblem
+
+
+def row_keys(prob):
+    return {(frozenset((var.name, coef) for var, coef in row.items() if coef != 0), row.sense, row.constant)
+            for row in prob.constraints.values()}
+
+
+@pytest.mark.parametrize('agent_type, get_config', [('nurse', get_nurse_config), ('caregiver', get_caregiver_config)])
+def test_base_pattern_rows_match_every_agent_rows(agent_type, get_config):
+    config = get_config()
+    config['base_pattern'] = True
+    scheduler = make_scheduler(agent_type, config)
+    prob, x = scheduler.build_model()
+    # Every agent's rows on the same base pattern variables, once each
+    full = _ReducedProblem(type(prob)())
+    scheduler.add_constraints(full, x)
+    assert row_keys(prob) == row_keys(full.prob)
@@ -0,0 +1,38 @@
+import os
+
+import numpy as np
+from openpyxl import load_workbook
+from excel_export import export_roster
+
+# Written by the pandas + openpyxl export that write_workbook replaced, for small_roster()
+FORMER_EXPORT = os.path.join(os.path.dirname(__file__), 'data', 'former_export.xlsx')
+
+
+def small_roster():
+    """Two weeks, three agents (the first part-time with pinned days) and three shifts."""
+    I, J, K, part_time_I, nb_shifts = [1, 2, 3], list(range(1, 13)), list(range(1, 7)), [1], 3
+    solution = np.zeros((len(I), len(J), len(K)), dtype=np.int8)
+    for a in range(len(I)):
+        for d in range(len(J)):
+            shift = (5 * a + d) % 4
+            if shift:
+                solution[a, d, shift - 1] = 1
+                if a == 0 and d % 6 == 2:
+                    solution[a, d, shift - 1 + nb_shifts] = 1
+    return solution, I, J, K, part_time_I, nb_shifts
+
+
+def cell_styles(path):
+    ws = load_workbook(path).active
+    cells = {cell.coordinate: (cell.value, cell.font.b, cell.font.i, cell.fill.fill_type, cell.fill.start_color.rgb,
+                               cell.border.left.style, cell.border.right.style, cell.border.top.style,
+                               cell.border.bottom.style, cell.alignment.horizontal, cell.alignment.vertical)
+             for row in ws.iter_rows() for cell in row}
+    widths = {column: dimension.width for column, dimension in ws.column_dimensions.items()}
+    return cells, sorted(map(str, ws.merged_cells.ranges)), widths
+
+
+def test_export_matches_the_former_export(tmp_path):
+    dest_path = str(tmp_path / 'schedule.xlsx')
+    export_roster(*small_roster(), dest_path=dest_path)
+    assert cell_styles(dest_path) == cell_styles(FORMER_EXPORT)
@@ -0,0 +1,46 @@
+import io
+import json
+
+from config_manager import get_nurse_config, resize_config
+from instrumentation import Instrumentation, JsonLinesSink, count, openmetrics, phase
+from jobs import make_scheduler
+
+
+def test_nested_phases_add_up_and_reach_the_callbacks():
+    events = []
+    instrumentation = Instrumentation([events.append], labels={'ward': 'A'})
+    with phase('ignored'):
+        count('ignored', 1)
+    with instrumentation.run():
+        for _ in range(2):
+            with phase('build'):
+                with phase('constraints'):
+                    count('rows', 10)
+        instrumentation.add_time('C5', 0.5)
+    assert list(instrumentation.phases) == ['build', 'build/constraints', 'C5']
+    assert [record['calls'] for record in instrumentation.phases.values()] == [2, 2, 1]
+    assert instrumentation.phases['build']['wall_time'] >= instrumentation.phases['build/constraints']['wall_time']
+    assert instrumentation.counters == {'rows': 10}
+    expected = ['run_start'] + ['counter', 'phase', 'phase'] * 2 + ['phase', 'run_end']
+    assert [event['event'] for event in events] == expected
+    assert all(event['ward'] == 'A' for event in events)
+    assert events[-1]['counters'] == {'rows': 10}
+
+
+def test_scheduler_run_reports_its_phases_as_json_lines_and_openmetrics(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    stream = io.StringIO()
+    config = resize_config(get_nurse_config({'name': 'HiGHS', 'msg': False}), nb_agents=12, nb_part_time_agents=3,
+                           nb_weeks=4)
+    config.update(export=False, instrumentation={'callbacks': [JsonLinesSink(stream)]})
+    scheduler = make_scheduler('nurse', config)
+    scheduler.solve_and_export()
+
+    events = [json.loads(line) for line in stream.getvalue().splitlines()]
+    report = events[-1]
+    assert (events[0]['event'], report['event'], report['scheduler']) == ('run_start', 'run_end', 'NurseScheduler')
+    assert {'build', 'build/constraints', 'solve', 'export'} <= set(report['phases'])
+    assert report['phases'] == scheduler.instrumentation.report()['phases']
+    text = openmetrics([({'scheduler': 'NurseScheduler'}, report)])
+    assert 'fairnessnsp_phase_seconds{phase="solve",scheduler="NurseScheduler"}' in text
+    assert text.endswith("# EOF\n")
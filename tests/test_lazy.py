@@ -0,0 +1,35 @@
+import time
+
+import pytest
+
+from config_manager import get_nurse_config
+from jobs import make_scheduler
+from matrix_model import build_matrix_model
+
+
+def lazy_scheduler(solver, builder='pulp'):
+    config = get_nurse_config({'name': 'HiGHS', 'msg': False, **solver})
+    config.update(lazy=True, builder=builder, export=False)
+    return make_scheduler('nurse', config)
+
+
+@pytest.mark.parametrize('builder', ['pulp', 'matrix'])
+def test_lazy_solve_is_optimal_for_the_full_model(builder):
+    scheduler = lazy_scheduler({}, builder)
+    scheduler.solve_and_export()
+    assert scheduler.result['status'] == 'Optimal' and scheduler.result['lazy_rows'] > 0
+    assert round(scheduler.result['objective']) == 363
+    assert not build_matrix_model(scheduler).violated_rows(scheduler.solution).size
+
+
+@pytest.mark.parametrize('builder', ['pulp', 'matrix'])
+def test_time_limited_lazy_solve_only_accepts_full_model_rosters(builder):
+    scheduler = lazy_scheduler({'time_limit': 0.5}, builder)
+    start_time = time.perf_counter()
+    scheduler.solve_and_export()
+    # The limit holds for all the rounds together (model building and export aside)
+    assert time.perf_counter() - start_time < 0.5 + 1.5
+    if scheduler.solution is None:
+        assert scheduler.result['status'] == 'Not Solved' and scheduler.result['objective'] is None
+    else:
+        assert not build_matrix_model(scheduler).violated_rows(scheduler.solution).size
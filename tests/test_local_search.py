@@ -0,0 +1,13 @@
+import pytest
+
+from config_manager import get_caregiver_config, get_nurse_config
+from jobs import make_scheduler
+from local_search import local_search
+
+
+@pytest.mark.parametrize('agent_type, get_config', [('nurse', get_nurse_config), ('caregiver', get_caregiver_config)])
+def test_default_local_search_finds_a_feasible_roster(agent_type, get_config):
+    scheduler = make_scheduler(agent_type, get_config())
+    result, _ = local_search(scheduler)
+    assert result['status'] == 'Feasible' and result['violations'] == {}
+    assert result['solver_time'] < 1.5
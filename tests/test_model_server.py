@@ -0,0 +1,44 @@
+import threading
+
+import pytest
+from model_server import ModelClient, ModelStore, make_server
+
+WARD = {'agent_type': 'nurse', 'nb_agents': 12, 'nb_part_time_agents': 3, 'nb_weeks': 4}
+
+
+@pytest.fixture
+def client():
+    server = make_server(port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield ModelClient(f"http://127.0.0.1:{server.server_address[1]}", timeout=60)
+    server.shutdown()
+    server.server_close()
+
+
+def test_kept_model_solves_new_staffing_levels_like_a_fresh_one(client):
+    first = client.solve(**WARD)
+    assert first['status'] == 'Optimal' and not first['cached']
+    assert first['codes'].shape == (12, 24)
+    # Four agents on the first shift every week day: the kept model's staffing rows are updated
+    raised = client.solve(**WARD, staffing_week=[4, 2, 1])
+    assert raised['cached'] and raised['build_time'] == 0.0 and raised['key'] == first['key']
+    assert raised['status'] == ModelStore().solve({**WARD, 'staffing_week': [4, 2, 1]})['status'] == 'Infeasible'
+    again = client.solve(**WARD)
+    assert (again['status'], again['objective']) == ('Optimal', first['objective'])
+    model, = client.models()
+    assert (model['key'], model['hits']) == (first['key'], 3)
+
+
+def test_fixed_assignments_are_imposed_then_released(client):
+    free = client.solve(**WARD)
+    assert free['codes'][0, 0] != 0
+    rest = client.solve(**WARD, fix=[[1, 1, shift, 0] for shift in range(1, 7)])
+    assert rest['status'] == 'Optimal' and rest['codes'][0, 0] == 0
+    released = client.solve(**WARD)
+    assert released['cached'] and released['objective'] == free['objective']
+
+
+def test_bad_requests_are_reported(client):
+    with pytest.raises(RuntimeError, match="unknown keys"):
+        client.solve(**WARD, colour='blue')
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+from config_manager import get_nurse_config, resize_config
+from jobs import make_scheduler
+
+
+def solve_nurse(terms, disabled, mode='weighted'):
+    config = resize_config(get_nurse_config({'name': 'HiGHS', 'msg': False, 'time_limit': 60}), nb_weeks=2)
+    config['constraints'] = dict.fromkeys(disabled, False)
+    config['objective'] = {'mode': mode, 'terms': terms}
+    scheduler = make_scheduler('nurse', config)
+    result = scheduler.solve(*scheduler.build_model())
+    assert result['status'] == 'Optimal'
+    return scheduler, result
+
+
+def shift_spread(scheduler):
+    counts = scheduler.solution[[scheduler.I.index(i) for i in scheduler.full_time_I]][:, :, :scheduler.nb_shifts]
+    counts = counts.sum(axis=1)
+    return counts.max(axis=0) - counts.min(axis=0)
+
+
+def weekends_worked(scheduler):
+    weekends = [scheduler.J.index(j) for j in scheduler.J if j % 6 == 0]
+    return scheduler.solution[:, weekends, :scheduler.nb_shifts].sum(axis=(1, 2))
+
+
+def test_shift_balance_evens_the_shifts_without_c12():
+    composite, _ = solve_nurse(['composite'], ['C12', 'C13'])
+    balanced, result = solve_nurse({'composite': 1, 'shift_balance': 5}, ['C12', 'C13'])
+    assert shift_spread(composite).sum() > 0
+    assert not shift_spread(balanced).any()
+    assert result['terms']['shift_balance'] == 0
+
+
+def test_weekend_spread_evens_the_weekends_without_c7():
+    composite, _ = solve_nurse(['composite'], ['C7', 'C12', 'C13'])
+    balanced, result = solve_nurse({'composite': 1, 'weekend_spread': 5}, ['C7', 'C12', 'C13'])
+    assert np.ptp(weekends_worked(composite)) > 0
+    assert np.ptp(weekends_worked(balanced)) == 0
+    assert result['terms']['weekend_spread'] == 0
+
+
+def test_lexicographic_keeps_each_stage_optimum():
+    _, result = solve_nurse(['composite', 'shift_balance'], ['C12', 'C13'], mode='lexicographic')
+    composite = result['stages'][0]['objective']
+    assert composite == round(composite)
+    assert result['terms'] == {'composite': composite, 'shift_balance': 0}
+
+
+@pytest.mark.parametrize('term, overrides', [('shift_balance', {}), ('shift_balance', {'base_pattern': True}),
+                                            ('weekend_spread', {'constraints': {'C12': False, 'C13': False}})])
+def test_constant_terms_are_rejected(term, overrides):
+    config = {**get_nurse_config(), **overrides}
+    config['objective'] = {'terms': ['composite', term]}
+    with pytest.raises(ValueError, match=term):
+        make_scheduler('nurse', config).build_model()
@@ -0,0 +1,38 @@
+import numpy as np
+from config_manager import get_nurse_config, resize_config
+from jobs import make_scheduler
+
+
+def solved_nurses():
+    config = resize_config(get_nurse_config({'name': 'HiGHS', 'msg': False}), nb_agents=12, nb_part_time_agents=3,
+                           nb_weeks=4)
+    scheduler = make_scheduler('nurse', config)
+    assert scheduler.solve(*scheduler.build_model())['status'] == 'Optimal'
+    return scheduler
+
+
+def test_repair_keeps_the_days_away_from_the_absence():
+    scheduler = solved_nurses()
+    roster = scheduler.solution.copy()
+    result, solution = scheduler.repair({3: [14, 15]}, radius=2)
+
+    agent, days = scheduler.I.index(3), [scheduler.J.index(day) for day in (14, 15)]
+    assert not solution[agent, days].any()
+    kept = np.ones(len(scheduler.J), dtype=bool)
+    kept[days[0] - result['radius']:days[-1] + result['radius'] + 1] = False
+    assert np.array_equal(solution[:, kept], roster[:, kept])
+    assert result['changes'] and all(change[1] in range(14 - result['radius'], 16 + result['radius'])
+                                     for change in result['changes'])
+
+
+def test_next_repair_starts_from_the_repaired_roster():
+    scheduler = solved_nurses()
+    scheduler.repair({3: [14]})
+    repaired = scheduler.solution.copy()
+    result, solution = scheduler.repair({5: [3]})
+    assert result['build_time'] == 0.0
+    # The first absence still holds, and the roster only changed around the second one
+    assert not solution[scheduler.I.index(3), scheduler.J.index(14)].any()
+    assert all(abs(day - 3) <= result['radius'] for _, day, _, _ in result['changes'])
+    after = scheduler.J.index(3) + result['radius'] + 1
+    assert np.array_equal(solution[:, after:], repaired[:, after:])
@@ -0,0 +1,22 @@
+import pytest
+from config_manager import get_caregiver_config, get_nurse_config
+from jobs import make_scheduler
+from rolling_horizon import rolling_horizon
+
+
+@pytest.mark.parametrize('agent_type, get_config', [('nurse', get_nurse_config), ('caregiver', get_caregiver_config)])
+def test_windows_build_a_roster_of_the_whole_model(agent_type, get_config):
+    scheduler = make_scheduler(agent_type, get_config({'name': 'HiGHS', 'msg': False}))
+    result, solution = rolling_horizon(scheduler, {'window': 4, 'step': 2, 'compare': True})
+    assert result['status'] == 'Feasible'
+    assert result['windows'] == len(range(0, scheduler.nb_weeks - 4 + 2, 2))
+    assert scheduler.build_matrix_model().violated_rows(solution).size == 0
+    # No better than the monolithic base pattern model
+    assert result['monolithic']['status'] == 'Optimal'
+    assert result['objective'] <= result['monolithic']['objective'] + 1e-6
+
+
+def test_step_longer_than_the_window_is_rejected():
+    scheduler = make_scheduler('nurse', get_nurse_config({'name': 'HiGHS', 'msg': False}))
+    with pytest.raises(ValueError, match="step"):
+        rolling_horizon(scheduler, {'window': 2, 'step': 3})
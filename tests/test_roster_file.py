@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+from config_manager import get_nurse_config, resize_config
+from jobs import make_scheduler
+from roster_file import load_roster, scan_rosters
+
+
+def test_exported_roster_file_loads_back_the_solution(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    config = resize_config(get_nurse_config({'name': 'HiGHS', 'msg': False}), nb_agents=12, nb_part_time_agents=3,
+                           nb_weeks=4)
+    config.update(export=False, roster_file=True)
+    scheduler = make_scheduler('nurse', config)
+    result = scheduler.solve(*scheduler.build_model())
+    statistics = scheduler.export(scheduler.solution)
+
+    roster = load_roster(tmp_path / 'output' / 'nurses_schedule.roster')
+    assert roster.header['status'] == 'Optimal'
+    assert roster.header['objective'] == result['objective']
+    assert np.array_equal(roster.solution(), scheduler.solution)
+    assert roster.statistics().to_dataframe().equals(statistics.to_dataframe())
+    assert [found.path for found in scan_rosters([str(tmp_path)])] == [str(roster.path)]
+
+
+def test_other_files_are_rejected(tmp_path):
+    path = tmp_path / 'schedule.roster'
+    path.write_bytes(b"not a roster")
+    with pytest.raises(ValueError, match="not a roster file"):
+        load_roster(path)
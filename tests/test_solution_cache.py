@@ -0,0 +1,40 @@
+import os
+
+import numpy as np
+
+from config_manager import get_nurse_config
+from feasibility import infeasible_result
+from nurse_scheduler import NurseScheduler
+from solution_cache import SolutionCache
+
+
+def test_only_proven_outcomes_are_stored(tmp_path):
+    cache = SolutionCache(str(tmp_path / "solutions.sqlite"))
+    roster = np.ones((2, 6, 3), dtype=np.int8)
+    assert cache.put('optimal', 'NurseScheduler', {'status': 'Optimal', 'objective': 12}, roster)
+    assert not cache.put('incumbent', 'NurseScheduler', {'status': 'Feasible', 'objective': 10}, roster)
+    assert not cache.put('stopped', 'NurseScheduler', {'status': 'Optimal', 'stopped': True}, roster)
+    assert not cache.put('unsolved', 'NurseScheduler', {'status': 'Not Solved', 'objective': None}, roster)
+    assert cache.put('infeasible', 'NurseScheduler', {'status': 'Infeasible', 'objective': 0}, roster)
+
+    result, solution = cache.get('optimal')
+    assert result['cached'] and (solution == roster).all()
+    assert cache.get('incumbent') is None and cache.get('stopped') is None and cache.get('unsolved') is None
+    result, solution = cache.get('infeasible')
+    assert result['status'] == 'Infeasible' and solution is None
+
+
+def test_infeasible_cache_hit_keeps_the_exported_schedule(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    config = get_nurse_config({'msg': False})
+    config['cache'] = str(tmp_path / "solutions.sqlite")
+    scheduler = NurseScheduler(config)
+    SolutionCache(config['cache']).put(scheduler.cache_key(), 'NurseScheduler', infeasible_result(None, []), None)
+    os.makedirs("output")
+    with open(os.path.join("output", scheduler.dest_file), 'w') as f:
+        f.write("previous schedule")
+
+    assert scheduler.solve_and_export() == (None, None)
+    assert scheduler.result['status'] == 'Infeasible' and scheduler.solution is None
+    with open(os.path.join("output", scheduler.dest_file)) as f:
+        assert f.read() == "previous schedule"
@@ -0,0 +1,48 @@
+import os
+
+from pulp import LpBinary, LpMaximize, LpProblem, LpVariable, lpSum
+from pulp.constants import LpSolutionIntegerFeasible, LpSolutionNoSolutionFound, LpSolutionOptimal, LpStatusOptimal
+
+from caregiver_scheduler import CaregiverScheduler
+from config_manager import get_caregiver_config
+from solver_config import solve, solve_status
+
+
+def test_solve_status_tells_proven_optima_from_incumbents():
+    prob = LpProblem("status", LpMaximize)
+    prob.assignStatus(LpStatusOptimal, LpSolutionOptimal)
+    assert solve_status(prob) == 'Optimal'
+    prob.assignStatus(LpStatusOptimal, LpSolutionIntegerFeasible)
+    assert solve_status(prob) == 'Feasible'
+    prob.assignStatus(LpStatusOptimal, LpSolutionNoSolutionFound)
+    assert solve_status(prob) == 'Not Solved'
+
+
+def test_solve_proves_optimum():
+    prob = LpProblem("knapsack", LpMaximize)
+    x = [LpVariable(f"x{i}", cat=LpBinary) for i in range(4)]
+    prob += lpSum((i + 1) * var for i, var in enumerate(x))
+    prob += lpSum(x) <= 2
+    result = solve(prob, {'msg': False})
+    assert result['status'] == 'Optimal'
+    assert result['objective'] == 7
+
+
+def test_time_limited_solve_is_not_optimal():
+    # The shipped caregiver model is not proven optimal within half a second
+    scheduler = CaregiverScheduler(get_caregiver_config({'msg': False, 'time_limit': 0.5}))
+    prob, x = scheduler.build_model()
+    result = solve(prob, scheduler.solver_config)
+    assert result['status'] in ('Feasible', 'Not Solved')
+    if result['status'] == 'Feasible':
+        assert result['objective'] is not None and result['gap'] > 0
+
+
+def test_solve_without_incumbent_has_no_objective_nor_roster(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    scheduler = CaregiverScheduler(get_caregiver_config({'msg': False, 'time_limit': 0.01}))
+    scheduler.solve_and_export()
+    assert scheduler.result['status'] == 'Not Solved'
+    assert scheduler.result['objective'] is None and scheduler.result['gap'] is None
+    assert scheduler.solution is None and scheduler.statistics is None
+    assert not os.path.exists(os.path.join("output", scheduler.dest_file))
@@ -0,0 +1,25 @@
+import sys
+
+from streamlit.testing.v1 import AppTest
+
+
+def job_page(status, objective):
+    from types import SimpleNamespace
+
+    import streamlit_app
+    from jobs import DONE
+
+    result = {'status': status, 'objective': objective, 'solver_time': 1.0, 'gap': None, 'dest_path': None}
+    job = SimpleNamespace(status=DONE, result=result, solution=None, statistics=None, instrumentation=None)
+    streamlit_app.current_job = lambda agent_type: job
+    streamlit_app.show_job("Nurses", "nurses_schedule.xlsx", 'success_nurse', 'download_nurse')
+
+
+def test_job_without_a_roster_shows_a_warning_and_no_download(monkeypatch):
+    # AppTest leaves its script as __main__, which the spawned workers of later tests would run
+    monkeypatch.setitem(sys.modules, '__main__', sys.modules['__main__'])
+    page = AppTest.from_function(job_page, args=('Not Solved', None)).run()
+    assert not page.exception
+    assert not page.success and len(page.warning) == 1
+    assert [metric.value for metric in page.metric][:2] == ['Not Solved', '-']
+    assert not page.get('download_button')
@@ -0,0 +1,17 @@
+from sweep import _label, point_config, run_sweep, solve_point, sweep_points
+
+
+def test_solve_point_with_the_matrix_builder():
+    point, = sweep_points('nurse', [12], [3], [4])
+    config = point_config('nurse', point, {'name': 'HiGHS', 'msg': False}, builder='matrix')
+    row = solve_point('nurse', config)
+    assert row['status'] == 'Optimal'
+    assert row['objective'] == 168
+
+
+def test_pruning_flags_the_dominated_points_solved_by_other_workers():
+    points = sweep_points('nurse', [12, 13], [3], [4])
+    table = run_sweep('nurse', points, {'name': 'HiGHS'}, workers=2, builder='matrix')
+    assert list(table['status']) in (['Optimal', 'Optimal'], ['Optimal', 'Skipped'])
+    assert table['dominated_by'].isna().tolist() == [True, False]
+    assert table['dominated_by'][1] == _label(points[0])
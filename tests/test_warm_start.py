@@ -0,0 +1,12 @@
+import pytest
+
+from config_manager import get_caregiver_config, get_nurse_config
+from jobs import make_scheduler
+from warm_start import check_assignment, greedy_assignment
+
+
+@pytest.mark.parametrize('agent_type, get_config', [('nurse', get_nurse_config), ('caregiver', get_caregiver_config)])
+def test_greedy_assignment_meets_the_rules_beyond_staffing(agent_type, get_config):
+    scheduler = make_scheduler(agent_type, get_config())
+    violations = check_assignment(scheduler, greedy_assignment(scheduler))
+    assert {family: count for family, count in violations.items() if count and family != 'C1-C4'} == {}
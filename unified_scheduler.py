@@ -3,58 +3,185 @@
 Unified scheduler that can handle both nurse and caregiver scheduling.
 """
 
-from nurse_scheduler import NurseScheduler
-from caregiver_scheduler import CaregiverScheduler
-from config_manager import get_nurse_config, get_caregiver_config
+import argparse
+from config_manager import get_nurse_config, get_caregiver_config, get_solver_config
 
 
 class UnifiedScheduler:
     """Unified scheduler for both nurse and caregiver scheduling."""
-    
+
     @staticmethod
-    def schedule_nurses():
+    def schedule_nurses(solver=None, **options):
         """Schedule nurses using the nurse-specific constraints."""
-        config = get_nurse_config()
+        from nurse_scheduler import NurseScheduler
+        config = get_nurse_config(solver, **options)
         scheduler = NurseScheduler(config)
         return scheduler.solve_and_export()
-    
+
     @staticmethod
-    def schedule_caregivers():
+    def schedule_caregivers(solver=None, **options):
         """Schedule caregivers using the caregiver-specific constraints."""
-        config = get_caregiver_config()
+        from caregiver_scheduler import CaregiverScheduler
+        config = get_caregiver_config(solver, **options)
         scheduler = CaregiverScheduler(config)
         return scheduler.solve_and_export()
-    
+
     @staticmethod
-    def schedule_all():
+    def schedule_all(solver=None, **options):
         """Schedule both nurses and caregivers."""
         print("=== Scheduling Nurses ===")
-        UnifiedScheduler.schedule_nurses()
+        UnifiedScheduler.schedule_nurses(solver, **options)
         print("\n=== Scheduling Caregivers ===")
-        UnifiedScheduler.schedule_caregivers()
+        UnifiedScheduler.schedule_caregivers(solver, **options)
+
+
+AGENT_TYPES = {
+    'nurse': 'nurse', 'nurses': 'nurse', 'inf': 'nurse',
+    'caregiver': 'caregiver', 'caregivers': 'caregiver', 'as': 'caregiver',
+    'all': 'all', 'both': 'all',
+}
+
+
+def parse_args(argv=None):
+    """Parse the command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Schedule nurses and/or caregivers.",
+        epilog="nurse/nurses/inf: nurses only, caregiver/caregivers/as: caregivers only, all/both: both (default)"
+    )
+    parser.add_argument('agent_type', nargs='?', default='all', type=str.lower, choices=sorted(AGENT_TYPES),
+                        metavar='{nurse,caregiver,all}', help="Agents to schedule (default: all)")
+    solver = parser.add_argument_group("solver")
+    solver.add_argument('--solver', dest='name', help="Solver backend, e.g. CBC or HiGHS (default: CBC)")
+    solver.add_argument('--threads', type=int, help="Number of solver threads")
+    solver.add_argument('--time-limit', type=float, help="Solver time limit in seconds")
+    solver.add_argument('--gap-rel', type=float, help="Relative MIP gap tolerance, e.g. 0.01")
+    solver.add_argument('--gap-abs', type=float, help="Absolute MIP gap tolerance")
+    solver.add_argument('--no-presolve', dest='presolve', action='store_false', default=None,
+                        help="Disable the solver presolve")
+    solver.add_argument('--quiet', dest='msg', action='store_false', default=None, help="Hide the solver log")
+    solver.add_argument('--progress', action='store_true',
+                        help="Print the incumbent, bound, gap and nodes while solving (CBC and HiGHS)")
+    model = parser.add_argument_group("model")
+    model.add_argument('--base-pattern', action='store_true', help="Use the symmetry-reduced base pattern model")
+    model.add_argument('--builder', choices=['pulp', 'matrix', 'local_search'], default='pulp',
+                       help="Model builder: PuLP expressions, sparse matrices passed to HiGHS, "
+                            "or a solver-free local search")
+    model.add_argument('--warm-start', metavar='SOURCE',
+                       help="MIP start: 'greedy', 'local_search', a previously exported .xlsx schedule, "
+                            "a .roster file or a saved .npy solution")
+    model.add_argument('--search-time', type=float, metavar='SECONDS',
+                       help="Time given to the local search (--builder local_search, --warm-start local_search)")
+    model.add_argument('--disable', nargs='+', default=[], metavar='FAMILY',
+                       help="Leave out constraint families, e.g. --disable C8 C11 (see constraints.py)")
+    model.add_argument('--lazy', action='store_true',
+                       help="Add the sliding-window families C8, C9, C11 and C17 only where the solution violates them")
+    model.add_argument('--rolling', type=int, metavar='WEEKS',
+                       help="Solve the base pattern by rolling windows of WEEKS weeks (long horizons, needs HiGHS)")
+    model.add_argument('--rolling-step', type=int, metavar='WEEKS',
+                       help="Weeks fixed after each rolling window (default: 4)")
+    model.add_argument('--compare-monolithic', action='store_true',
+                       help="With --rolling, also solve the whole model and report the gap")
+    model.add_argument('--no-precheck', dest='precheck', action='store_false',
+                       help="Skip the capacity pre-check run before building the model")
+    model.add_argument('--diagnose', action='store_true',
+                       help="On an Infeasible status, name a minimal set of conflicting constraint families")
+    objective = parser.add_argument_group("objective")
+    objective.add_argument('--objective', nargs='+', type=parse_term, metavar='TERM[:WEIGHT]',
+                           help="Objective terms, e.g. composite shift_balance:5 weekend_spread "
+                                "(see objectives.py; default: composite_objective)")
+    objective.add_argument('--lexicographic', action='store_true',
+                           help="Optimize the --objective terms one after the other, in the order given")
+    objective.add_argument('--tolerance', type=float,
+                           help="Relative slack left on each lexicographic stage's optimum (default: 0)")
+    output = parser.add_argument_group("output")
+    output.add_argument('--cache', nargs='?', const=True, metavar='PATH',
+                        help="Reuse solutions of identical problems from a SQLite cache "
+                             "(default file: ~/.cache/fairnessnsp/solutions.sqlite)")
+    output.add_argument('--no-export', dest='export', action='store_false',
+                        help="Solve only: skip the Excel schedule (and never load openpyxl)")
+    output.add_argument('--roster-file', action='store_true',
+                        help="Also write the roster to a binary .roster file (with --no-export, instead of Excel)")
+    output.add_argument('--stats', dest='export_stats', action='store_true',
+                        help="Also write the roster statistics to a .json file next to the Excel schedule")
+    profiling = parser.add_argument_group("profiling")
+    profiling.add_argument('--timings', action='store_true',
+                           help="Print the wall and CPU time of each phase (build, constraint families, solve, "
+                                "extraction, export) and the run counters")
+    profiling.add_argument('--profile', nargs='?', const=True, metavar='PATH',
+                           help="Run under cProfile and print the slowest functions; with PATH, also write the stats")
+    profiling.add_argument('--trace-memory', action='store_true',
+                           help="Also record the peak Python memory of each phase (tracemalloc, slower)")
+    profiling.add_argument('--metrics', metavar='PATH',
+                           help="Write the phase and counter events to PATH: OpenMetrics text for a .prom or .om "
+                                "file, JSON lines otherwise")
+    return parser.parse_args(argv)
+
+
+def parse_term(text):
+    """Objective term argument TERM or TERM:WEIGHT as (term, weight)."""
+    name, _, weight = text.partition(':')
+    try:
+        return name, float(weight) if weight else 1.0
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected TERM or TERM:WEIGHT, got {text!r}") from None
+
+
+def objective_options(args):
+    """config['objective'] of the objective arguments, None when no term is given."""
+    if not args.objective:
+        return None
+    options = {'mode': 'lexicographic' if args.lexicographic else 'weighted', 'terms': dict(args.objective)}
+    if args.tolerance is not None:
+        options['tolerance'] = args.tolerance
+    return options
+
+
+def instrumentation_options(args):
+    """config['instrumentation'] of the profiling arguments, None when none is given."""
+    if not (args.timings or args.profile or args.trace_memory or args.metrics):
+        return None
+    callbacks = []
+    if args.metrics:
+        from instrumentation import JsonLinesSink, OpenMetricsSink
+        openmetrics = args.metrics.endswith(('.prom', '.om'))
+        callbacks.append(OpenMetricsSink(args.metrics) if openmetrics else JsonLinesSink(args.metrics))
+    return {'callbacks': callbacks, 'profile': args.profile, 'trace_memory': args.trace_memory}
+
+
+def print_progress(event):
+    """Print a solver progress event (see solver_config.progress_event)."""
+    objective = '-' if event['objective'] is None else f"{event['objective']:g}"
+    bound = '-' if event['bound'] is None else f"{event['bound']:g}"
+    gap = '-' if event['gap'] is None else f"{event['gap']:.2%}"
+    print(f"[{event['time']:7.1f}s] incumbent {objective}, bound {bound}, gap {gap}, nodes {event['nodes']}")
 
 
 def main():
     """Main function with command line interface."""
-    import sys
-    
-    if len(sys.argv) > 1:
-        agent_type = sys.argv[1].lower()
-        if agent_type in ['nurse', 'nurses', 'inf']:
-            UnifiedScheduler.schedule_nurses()
-        elif agent_type in ['caregiver', 'caregivers', 'as']:
-            UnifiedScheduler.schedule_caregivers()
-        elif agent_type in ['all', 'both']:
-            UnifiedScheduler.schedule_all()
-        else:
-            print("Usage: python unified_scheduler.py [nurse|caregiver|all]")
-            print("  nurse/nurses/inf: Schedule nurses only")
-            print("  caregiver/caregivers/as: Schedule caregivers only")
-            print("  all/both: Schedule both (default)")
+    args = parse_args()
+    solver = get_solver_config(name=args.name, threads=args.threads, time_limit=args.time_limit,
+                               gap_rel=args.gap_rel, gap_abs=args.gap_abs, presolve=args.presolve, msg=args.msg)
+    options = {'base_pattern': args.base_pattern, 'builder': args.builder, 'warm_start': args.warm_start,
+               'constraints': {family: False for family in args.disable}, 'lazy': args.lazy,
+               'precheck': args.precheck, 'diagnose': args.diagnose,
+               'export': args.export, 'export_stats': args.export_stats, 'roster_file': args.roster_file,
+               'cache': args.cache,
+               'instrumentation': instrumentation_options(args), 'objective': objective_options(args),
+               'progress': print_progress if args.progress else None}
+    if args.rolling:
+        options['rolling_horizon'] = {key: val for key, val in (('window', args.rolling), ('step', args.rolling_step),
+                                                                ('compare', args.compare_monolithic)) if val is not None}
+    if args.search_time is not None:
+        options['local_search'] = {'time_limit': args.search_time}
+
+    agent_type = AGENT_TYPES[args.agent_type]
+    if agent_type == 'nurse':
+        UnifiedScheduler.schedule_nurses(solver, **options)
+    elif agent_type == 'caregiver':
+        UnifiedScheduler.schedule_caregivers(solver, **options)
     else:
-        # Default: schedule both
-        UnifiedScheduler.schedule_all()
+        UnifiedScheduler.schedule_all(solver, **options)
 
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
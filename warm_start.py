@@ -0,0 +1,192 @@
+"""
+Initial assignments for warm-starting the solver (MIP start): a previous roster
+read back from an exported .xlsx file or a saved array, a fast greedy
+construction of the cyclic base pattern, or the best roster of the local search.
+"""
+
+import numpy as np
+
+
+# Day of the greedy base pattern off, or not filled yet
+REST, UNSET = -1, -2
+
+# Days the greedy construction may go back on before giving up on the rules it skips
+MAX_BACKTRACKS = 10000
+
+
+def staffing_targets(scheduler):
+    """Minimum and maximum number of agents per (day, shift), derived from the staffing rules."""
+    J, K = list(scheduler.J), list(scheduler.K)
+    nb_shifts = scheduler.nb_shifts
+    demand = np.zeros((len(J), nb_shifts))
+    cap = np.full((len(J), nb_shifts), np.inf)
+    for day_type, shifts, sense, rhs, overlay in scheduler.staffing_rules():
+        days = [J.index(j) for j in scheduler.staffing_days(day_type)]
+        s = [K.index(k) for k in shifts]
+        if len(s) == 1:
+            if sense in ('>=', '=='):
+                demand[days, s[0]] = np.maximum(demand[days, s[0]], rhs)
+            if sense in ('<=', '=='):
+                cap[days, s[0]] = np.minimum(cap[days, s[0]], rhs)
+        elif sense in ('>=', '=='):
+            # Put what the single-shift rules do not already cover on the first shift
+            extra = rhs - demand[np.ix_(days, s)].sum(axis=1)
+            demand[days, s[0]] += np.maximum(extra, 0)
+    return demand, cap
+
+
+def greedy_assignment(scheduler, max_backtracks=MAX_BACKTRACKS):
+    """Build an (agent, day, shift) 0/1 array with a greedy pass over the cyclic base pattern.
+
+    Days of the base pattern are filled in order with the shift covering the largest staffing
+    deficit over all its rotations (C12), skipping choices that break C6 to C11 or C17 given
+    the days already filled, cyclically since the rotations wrap around the base pattern. A
+    day left without an allowed choice sends the search back to the previous day, up to
+    `max_backtracks` times. One pinned day per week is then put on the working weekday with
+    the largest surplus for the part-time overlay (C13, C15).
+    C5 to C17 hold unless the backtracking gives up, but the staffing rules (C1-C4) are only
+    aimed at: the solver repairs the roster or discards it.
+    """
+    I, J = list(scheduler.I), list(scheduler.J)
+    nI, nJ, nK = len(I), len(J), len(scheduler.K)
+    nb_shifts = scheduler.nb_shifts
+    demand, cap = staffing_targets(scheduler)
+    weekend = np.array(J) % 6 == 0
+    # C7: the base pattern works every other week-end
+    weekend_off = weekend & (np.arange(nJ) // 6 % 2 == 1)
+    budget = (~weekend).sum() + 2 * weekend.sum() - (9 * (scheduler.nb_weeks / 4)) + 1
+    morning, evening = 0, 1 if nb_shifts > 1 else None
+
+    # base[d] is the shift index worked on day d of the base pattern, REST for rest and UNSET
+    # until filled; agent a works day d of the base pattern on day (d + 6a) of the horizon
+    base = np.full(nJ, UNSET)
+    coverage = np.zeros((nJ, nb_shifts))
+    used = 0
+
+    def allowed(d, shift):
+        # The rows of an agent wrap around the end of the base pattern, so the sequences
+        # are checked cyclically, on both sides of d; week-ends off (C7) are known in advance
+        def at(offset):
+            day = (d + offset) % nJ
+            return REST if base[day] == UNSET and weekend_off[day] else base[day]
+
+        if shift >= 0:
+            if used + 1 + weekend[d] > budget:
+                return False
+            # C9: at most 4 working days in 5
+            if any(all(at(o) >= 0 for o in range(first, first + 5) if o) for first in range(-4, 1)):
+                return False
+            # C6: no morning after an evening
+            if (shift == morning and at(-1) == evening) or (shift == evening and at(1) == morning):
+                return False
+            # C11: no evening, rest, morning
+            if ((shift == morning and at(-2) == evening and at(-1) == REST)
+                    or (shift == evening and at(2) == morning and at(1) == REST)):
+                return False
+            # C8: no working day between two days off
+            if at(-1) == REST and at(1) == REST:
+                return False
+            if (coverage[(d + 6 * np.arange(nI)) % nJ, shift] + 1 > cap[(d + 6 * np.arange(nI)) % nJ, shift]).any():
+                return False
+        else:
+            # C17: at most 3 days off in a row
+            if any(all(at(o) == REST for o in range(first, first + 4) if o) for first in range(-3, 1)):
+                return False
+            # C8: no working day between two days off
+            if (at(-1) >= 0 and at(-2) == REST) or (at(1) >= 0 and at(2) == REST):
+                return False
+            # C11: no evening, rest, morning
+            if at(-1) == evening and at(1) == morning:
+                return False
+        return True
+
+    def candidates(d):
+        rotated = (d + 6 * np.arange(nI)) % nJ
+        deficit = np.maximum(demand[rotated] - coverage[rotated], 0).sum(axis=0)
+        order = list(np.argsort(-deficit))
+        if weekend_off[d]:
+            return [REST]
+        if weekend[d]:
+            return order
+        return [s for s in order if deficit[s] > 0] + [REST] + [s for s in order if deficit[s] <= 0]
+
+    def place(d, choice, sign=1):
+        nonlocal used
+        if choice >= 0:
+            coverage[(d + 6 * np.arange(nI)) % nJ, choice] += sign
+            used += sign * (1 + weekend[d])
+        base[d] = choice if sign > 0 else UNSET
+
+    # Depth-first over the days: a day left without an allowed choice sends the search back
+    # to the previous day's next choice. Past max_backtracks, such a day takes its preferred
+    # choice anyway and the solver repairs the roster
+    pending = [[s for s in candidates(0) if allowed(0, s)]]
+    backtracks = 0
+    d = 0
+    while d < nJ:
+        if pending[d] or backtracks >= max_backtracks or d == 0:
+            place(d, pending[d].pop(0) if pending[d] else candidates(d)[0])
+            d += 1
+            if d < nJ:
+                pending.append([s for s in candidates(d) if allowed(d, s)])
+        else:
+            pending.pop()
+            d -= 1
+            place(d, base[d], -1)
+            backtracks += 1
+
+    # Part-time overlay: one pinned working weekday per week (C15), rotated like the agents (C13)
+    part_time = np.arange(len(scheduler.part_time_I))
+    pinned_base = np.zeros(nJ, dtype=bool)
+    pinned = np.zeros((nJ, nb_shifts))
+    if len(part_time):
+        for w in range(scheduler.nb_weeks):
+            days = [d for d in range(6 * w, 6 * w + 5) if base[d] >= 0]
+            if not days:
+                continue
+            surplus = [(coverage[(d + 6 * part_time) % nJ, base[d]] - demand[(d + 6 * part_time) % nJ, base[d]]
+                        - pinned[(d + 6 * part_time) % nJ, base[d]]).min() for d in days]
+            d = days[int(np.argmax(surplus))]
+            pinned_base[d] = True
+            pinned[(d + 6 * part_time) % nJ, base[d]] += 1
+
+    # Expand the base pattern to every agent
+    solution = np.zeros((nI, nJ, nK), dtype=np.int8)
+    rotation = (np.arange(nJ)[None, :] - 6 * np.arange(nI)[:, None]) % nJ
+    shifts = base[rotation]
+    agents, days = np.nonzero(shifts >= 0)
+    solution[agents, days, shifts[agents, days]] = 1
+    for p in part_time:
+        a = I.index(scheduler.part_time_I[p])
+        days = np.flatnonzero(pinned_base[(np.arange(nJ) - 6 * p) % nJ] & (shifts[a] >= 0))
+        solution[a, days, nb_shifts + shifts[a, days]] = 1
+    return solution
+
+
+def check_assignment(scheduler, solution):
+    """Number of rows violated by an assignment, per constraint family (needs scipy)."""
+    return scheduler.build_matrix_model().violations(solution)
+
+
+def load_initial_assignment(scheduler, source):
+    """Initial assignment from 'greedy', 'local_search', an exported .xlsx schedule, a .roster file
+    or a saved .npy array."""
+    if isinstance(source, np.ndarray):
+        return source
+    if source == 'greedy':
+        return greedy_assignment(scheduler)
+    if source == 'local_search':
+        from local_search import local_search
+        result, solution = local_search(scheduler, scheduler.config.get('local_search'))
+        print(f"Local search start: {result['status']}, objective {result['objective']:g}")
+        return solution
+    if str(source).endswith('.xlsx'):
+        from excel_export import read_schedule
+        return read_schedule(scheduler.I, scheduler.J, scheduler.K, scheduler.nb_shifts, source)
+    if str(source).endswith('.roster'):
+        from roster_file import load_roster
+        return load_roster(source).solution()
+    if str(source).endswith('.npy'):
+        return np.load(source)
+    raise ValueError(f"Unknown initial assignment source: {source} "
+                     f"(expected 'greedy', 'local_search', .xlsx, .roster or .npy)")